@@ -0,0 +1,165 @@
+"""Load test of the HTTP API (`phonepe_pulse.api`): requests/s and latency.
+
+The API is started in its own process and driven by `--concurrency`
+clients over every endpoint, every quarter and every state:
+
+    cold        each distinct URL once, right after start: every request queries
+    warm        random URLs for `--seconds`: bodies come from the cache
+    gzip        as warm, with Accept-Encoding: gzip
+    revalidate  as warm, with the ETag from the last response: 304s
+
+The client runs on the same machine, so on few cores the numbers are a
+lower bound of what the server alone can do.
+
+    python -m benchmarks.api [--concurrency 1 8 32] [--seconds 5] [--engine sqlite]
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode
+
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+
+from phonepe_pulse.dimensions import STATES
+from phonepe_pulse.insights import INSIGHTS
+from phonepe_pulse.topn import METRICS
+
+
+YEARS = range(2018, 2024)
+QUARTERS = [(year, qua) for year in YEARS for qua in range(1, 5)]
+SECTIONS = ["transactions", "users", "insurance"]
+
+
+def api_paths():
+    """Every distinct request path of the dashboard's quarters and states."""
+    paths = ["/api/v1/insights"] + [f"/api/v1/insights/{table}" for table in INSIGHTS]
+    for year, qua in QUARTERS:
+        when = {"year": year, "quarter": qua}
+        paths.append(f"/api/v1/transactions/categories?{urlencode(when)}")
+        for section in SECTIONS:
+            paths.append(f"/api/v1/{section}/totals?{urlencode(when)}")
+            paths.append(f"/api/v1/{section}/states?{urlencode(when)}")
+            paths += [f"/api/v1/{section}/top/{level}?{urlencode(when)}"
+                      for level in ["states", "districts", "pincodes"]]
+            paths += [f"/api/v1/{section}/districts?{urlencode({'state': state[0], **when})}"
+                      for state in STATES]
+        for metric, m in METRICS.items():
+            paths += [f"/api/v1/rankings?{urlencode({'metric': metric, 'level': level, 'years': year, 'quarter': qua})}"
+                      for level in m.levels]
+    return paths
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, engine):
+    """Starts the API and waits until it answers."""
+    process = subprocess.Popen([sys.executable, "-m", "phonepe_pulse.api", "--port", str(port),
+                                "--address", "localhost", "--engine", engine],
+                               stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("localhost", port), timeout=1):
+                return process
+        except OSError:
+            if process.poll() is not None:
+                raise SystemExit("the API exited")
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit("the API did not start")
+
+
+async def load(base, paths, concurrency, seconds=None, gzip=False, etags=None):
+    """Requests `paths` in order (or at random for `seconds`) from
+    `concurrency` clients. Returns (latencies ms, statuses, bytes, elapsed s).
+
+    With `etags` ({path: ETag}) requests are conditional; the ETag of each
+    200 response is stored in it.
+    """
+    client = AsyncHTTPClient(force_instance=True, max_clients=concurrency)
+    headers = {"Accept-Encoding": "gzip"} if gzip else {}
+    latencies, statuses, sizes = [], [], []
+    pending = iter(paths)
+    start = time.perf_counter()
+    deadline = start + seconds if seconds else None
+
+    async def worker(rng):
+        while True:
+            if deadline is None:
+                path = next(pending, None)
+                if path is None:
+                    return
+            elif time.perf_counter() < deadline:
+                path = rng.choice(paths)
+            else:
+                return
+            request_headers = dict(headers)
+            if etags is not None and path in etags:
+                request_headers["If-None-Match"] = etags[path]
+            sent = time.perf_counter()
+            try:
+                response = await client.fetch(base + path, headers=request_headers,
+                                              decompress_response=False, raise_error=False)
+            except HTTPClientError as e:
+                response = e.response
+            latencies.append((time.perf_counter() - sent) * 1000)
+            statuses.append(response.code)
+            sizes.append(len(response.body or b""))
+            if etags is not None and response.code == 200:
+                etags[path] = response.headers["Etag"]
+
+    await asyncio.gather(*(worker(random.Random(i)) for i in range(concurrency)))
+    client.close()
+    return latencies, statuses, sizes, time.perf_counter() - start
+
+
+def report(phase, concurrency, result):
+    latencies, statuses, sizes, elapsed = result
+    latencies.sort()
+    codes = ",".join(f"{code}" for code in sorted(set(statuses)))
+    print(f"{phase:<12}{concurrency:>6}{len(latencies):>9}{len(latencies) / elapsed:>9.0f}"
+          f"{statistics.median(latencies):>9.2f}{latencies[int(len(latencies) * 0.95)]:>9.2f}"
+          f"{statistics.mean(sizes) / 1024:>8.1f}  {codes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--engine", default=os.environ.get("PULSE_ENGINE", "sqlite"))
+    args = parser.parse_args()
+
+    paths = api_paths()
+    random.Random(0).shuffle(paths)
+    port = free_port()
+    base = f"http://localhost:{port}"
+    server = start_server(port, args.engine)
+    try:
+        print(f"{len(paths)} distinct requests, {args.engine}")
+        print(f"{'phase':<12}{'conc.':>6}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'KB':>8}  status")
+        report("cold", max(args.concurrency), asyncio.run(load(base, paths, max(args.concurrency))))
+        for concurrency in args.concurrency:
+            report("warm", concurrency, asyncio.run(load(base, paths, concurrency, args.seconds)))
+        for concurrency in args.concurrency:
+            report("gzip", concurrency, asyncio.run(load(base, paths, concurrency, args.seconds, gzip=True)))
+        etags = {}
+        asyncio.run(load(base, paths, max(args.concurrency), etags=etags))
+        for concurrency in args.concurrency:
+            report("revalidate", concurrency, asyncio.run(load(base, paths, concurrency, args.seconds, etags=etags)))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""The ten Insights questions on the SQLite and DuckDB engines.
+
+The questions are the aggregates the loader materializes (see
+`phonepe_pulse.insights`), i.e. what an Insights answer costs to compute
+at load time; the page itself only reads the summary tables.
+
+Every Data/*.csv file is repeated `--scale` times into a scratch folder,
+then loaded both ways: SQLite gets the full `build_database` copy
+(tables, indexes, rollups), DuckDB gets Parquet copies it reads in place.
+Setup time is reported once per engine, query times are the median of
+`--repeat` runs; "reads" is the total for reading all ten summary tables.
+
+    python -m benchmarks.engines [--scale 1 10 100] [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+from phonepe_pulse.engines import create_engine
+from phonepe_pulse.insights import INSIGHTS
+from phonepe_pulse.loader import DATA_DIR, TABLES, build_database, file_sha256, fingerprint
+from phonepe_pulse.storage import write_dataset
+
+
+def insights_queries():
+    """The Insights questions: (sql, params) of every INSIGHTS entry."""
+    return [(insight.sql, insight.params) for insight in INSIGHTS.values()]
+
+
+def insights_reads():
+    """What the Insights page runs instead: reads of the summary tables."""
+    return [(f"SELECT * FROM {table} ORDER BY Rank", ()) for table in INSIGHTS]
+
+
+def scale_data(data_dir, out_dir, scale):
+    """Writes every CSV repeated `scale` times, plus its Parquet copy."""
+    rows = 0
+    for table, csv in TABLES.items():
+        df = pd.read_csv(os.path.join(data_dir, csv))
+        df = pd.concat([df] * scale, ignore_index=True)
+        path = os.path.join(out_dir, csv)
+        df.to_csv(path, index=False)
+        write_dataset(table, df, file_sha256(path), os.path.join(out_dir, "parquet"))
+        rows += len(df)
+    return rows
+
+
+def time_queries(engine, queries, repeat):
+    """Median milliseconds per query."""
+    times = []
+    for sql, params in queries:
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            engine.execute(sql, params)
+            runs.append((time.perf_counter() - start) * 1000)
+        times.append(statistics.median(runs))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DATA_DIR)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    queries = insights_queries()
+    reads = insights_reads()
+    for scale in args.scale:
+        with tempfile.TemporaryDirectory() as tmp:
+            rows = scale_data(args.data, tmp, scale)
+            db_path = os.path.join(tmp, "pulse.db")
+
+            start = time.perf_counter()
+            build_database(db_path, tmp, fingerprint(tmp))
+            sqlite = create_engine("sqlite", db_path=db_path)
+            sqlite_setup = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            duckdb = create_engine("duckdb", data_dir=tmp)
+            duckdb_setup = (time.perf_counter() - start) * 1000
+
+            sqlite_ms = time_queries(sqlite, queries, args.repeat)
+            duckdb_ms = time_queries(duckdb, queries, args.repeat)
+            sqlite_reads = time_queries(sqlite, reads, args.repeat)
+            duckdb_reads = time_queries(duckdb, reads, args.repeat)
+
+        print(f"\nx{scale}: {rows} rows")
+        print(f"{'':<8}{'sqlite ms':>12}{'duckdb ms':>12}")
+        print(f"{'setup':<8}{sqlite_setup:>12.1f}{duckdb_setup:>12.1f}")
+        for i, (s, d) in enumerate(zip(sqlite_ms, duckdb_ms), 1):
+            print(f"{'Q' + str(i):<8}{s:>12.2f}{d:>12.2f}")
+        print(f"{'total':<8}{sum(sqlite_ms):>12.2f}{sum(duckdb_ms):>12.2f}")
+        print(f"{'reads':<8}{sum(sqlite_reads):>12.2f}{sum(duckdb_reads):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
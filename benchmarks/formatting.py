@@ -0,0 +1,117 @@
+"""Vectorized formatting vs. the per-value formatters the app used before.
+
+Times the old `format_num` and `format_currency` and those of
+`phonepe_pulse.formatting` on a district/pincode-sized Series. Their
+output is checked by `python -m phonepe_pulse.formatting`, in CI.
+
+    python -m benchmarks.formatting [--rows 100000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from phonepe_pulse.formatting import format_currency, format_num
+
+
+# The formatters from git_PhonePe_pulse.py before they were vectorized
+def old_format_num(number):
+    """Formats a number to indian number format with commas and decimal places.
+
+    Args:
+        number: the number to be fomrated.
+    
+    Returns:
+        A string representing the formatted number.
+    """
+    number_str = str(number)
+    sep = ","
+    reversed_num = number_str[::-1]
+    thousand = reversed_num[:3]
+    bal = reversed_num[3:]
+    if len(bal) == 0:
+        formatted_num = f"{thousand}"[::-1]
+    elif len(bal) < 3:
+        formatted_num = f"{thousand},{bal}"[::-1]
+    else:
+        formatted_int = sep.join(bal[i:i+2] for i in range(0, len(bal), 2))
+        formatted_num = f"{thousand},{formatted_int}"[::-1]
+    return formatted_num
+
+
+def old_format_currency(number):
+    """Formats a number in Indian currency format with commas and two decimal places.
+
+    Args:
+        number: The number to be formatted.
+
+    Returns:
+        A string representing the formatted number in Indian currency format.
+    """
+    number_str = str(number)
+    sep = ","
+    
+    # Check for presence of decimel places
+    has_decimal = "." in number_str
+
+    # Integer and decimel parts separation
+    if has_decimal:
+        integer, decimal = number_str.split(".")
+        reversed_num = integer[::-1]
+        thousand = reversed_num[:3]
+        bal = reversed_num[3:]
+        if len(bal) == 0:
+            formatted_num = f"₹{thousand[::-1]}.{decimal[:2]} Cr"
+        elif len(bal) < 3:
+            formatted_int = thousand + "," + bal
+            formatted_num = f"₹{formatted_int[::-1]}.{decimal[:2]} Cr"
+        else:
+            hundreds = sep.join(bal[i:i+2] for i in range(0, len(bal), 2))
+            formatted_int = thousand + "," + hundreds
+            formatted_num = f"₹{formatted_int[::-1]}.{decimal[:2]} Cr"
+    else:
+        integer = number_str
+        reversed_num = integer[::-1]
+        thousand = reversed_num[:3]
+        bal = reversed_num[3:]
+        if len(bal) == 0:
+            formatted_num = f"₹{thousand[::-1]} Cr"
+        elif len(bal) < 3:
+            formatted_int = thousand + "," + bal
+            formatted_num = f"₹{formatted_int[::-1]} Cr"
+        else:
+            hundreds = sep.join(bal[i:i+2] for i in range(0, len(bal), 2))
+            formatted_int = thousand + "," + hundreds
+            formatted_num = f"₹{formatted_int[::-1]} Cr"
+    return formatted_num
+
+
+def timed(fn, repeat=5):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - start) * 1000)
+    return min(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    counts = pd.Series(rng.integers(0, 10**10, args.rows))
+    amounts = pd.Series(rng.uniform(0, 10**13, args.rows))
+    print(f"{args.rows} rows          old ms    new ms")
+    old = timed(lambda: counts.apply(lambda x: old_format_num(x)))
+    new = timed(lambda: format_num(counts))
+    print(f"format_num      {old:>10.1f}{new:>10.1f}")
+    old = timed(lambda: amounts.apply(lambda x: old_format_currency(x/10000000)))
+    new = timed(lambda: format_currency(amounts))
+    print(f"format_currency {old:>10.1f}{new:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Per-process memory of the nine tables, as read from CSV and compacted.
+
+For each `--scale` the tables are generated by `benchmarks.synthetic`,
+then two fresh processes each hold them in a "memory" engine
+(`phonepe_pulse.engines.MemoryEngine`) and run a sample of the dashboard
+paths of `benchmarks.suite`:
+
+    objects   pd.read_csv frames: object strings and int64, as the app used to hold them
+    compact   `phonepe_pulse.model.load_model`: dictionary codes and narrow ints
+
+Per process it reports the load time, the bytes of the frames, the RSS
+after the queries (and its growth over a process with only the imports)
+and the peak RSS, plus the p50 ms of the sampled paths. The bytes count
+each string of the objects frames once per row, although the CSV parser
+shares repeated ones; the RSS is what the process really holds.
+
+    python -m benchmarks.model [--scale 1 100] [--sample 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.suite import path_calls
+from benchmarks.synthetic import generate
+from phonepe_pulse import db
+from phonepe_pulse.cache import QueryCache
+from phonepe_pulse.engines import MemoryEngine
+from phonepe_pulse.loader import DATA_DIR, TABLES
+from phonepe_pulse.model import load_model, memory_usage
+
+
+VARIANTS = ["objects", "compact"]
+# Sampled paths and their column labels
+PATHS = {"all-india/transactions": "all-india", "top-10/districts": "top-10", "districts": "districts",
+         "trends": "trends", "top-n": "top-n"}
+
+
+def status_mb(field):
+    """A /proc/self/status field (VmRSS, VmHWM) in MB."""
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    raise KeyError(field)
+
+
+def run_variant(variant, data_dir, sample):
+    """Loads the tables one way, queries them; returns the measurements."""
+    rss_imports = status_mb("VmRSS")
+    start = time.perf_counter()
+    if variant == "objects":
+        model = {table: pd.read_csv(os.path.join(data_dir, csv)) for table, csv in TABLES.items()}
+    else:
+        model = load_model(data_dir)
+    engine = MemoryEngine(data_dir, model=model)
+    load_s = time.perf_counter() - start
+    calls = path_calls()
+    times = {}
+    for path in PATHS:
+        times[path] = []
+        for fn, args in calls[path][::sample]:
+            with db.bind(engine, variant, QueryCache(0), QueryCache(0)):
+                start = time.perf_counter()
+                fn(*args)
+                times[path].append((time.perf_counter() - start) * 1000)
+    rss = status_mb("VmRSS")
+    return {"load_s": load_s, "frames_mb": sum(memory_usage(model).values()) / 2**20,
+            "rss_mb": rss, "rss_growth_mb": rss - rss_imports, "peak_mb": status_mb("VmHWM"),
+            "p50": {path: statistics.median(t) for path, t in times.items()}}
+
+
+def measure(variant, data_dir, sample):
+    """run_variant in a fresh process."""
+    out = subprocess.run([sys.executable, "-m", "benchmarks.model", "--worker", variant,
+                          "--data", data_dir, "--sample", str(sample)],
+                         capture_output=True, text=True)
+    if out.returncode:
+        raise SystemExit(f"{variant}: worker failed\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DATA_DIR)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--sample", type=int, default=10, help="run every n-th call of each path")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_variant(args.worker, args.data, args.sample)))
+        return
+
+    for scale in args.scale:
+        with tempfile.TemporaryDirectory() as tmp:
+            rows = generate(args.data, tmp, scale)
+            results = {variant: measure(variant, tmp, args.sample) for variant in VARIANTS}
+        print(f"\nx{scale}: {rows} rows")
+        print(f"{'':<10}{'load s':>8}{'frames MB':>11}{'RSS MB':>8}{'+MB':>8}{'peak MB':>9}"
+              + "".join(f"{label:>12}" for label in PATHS.values()))
+        for variant, r in results.items():
+            print(f"{variant:<10}{r['load_s']:>8.2f}{r['frames_mb']:>11.1f}{r['rss_mb']:>8.0f}"
+                  f"{r['rss_growth_mb']:>8.0f}{r['peak_mb']:>9.0f}"
+                  + "".join(f"{r['p50'][path]:>12.2f}" for path in PATHS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Stepping through quarters on the Explore Data page, with and without prefetch.
+
+A fresh process (cold query cache) walks the All India and the district
+year/quarter selectors through consecutive quarters with streamlit's
+AppTest, waiting for the prefetcher between steps as a user's think time
+would. It reports the median time per step and the query cache counters;
+prefetching is turned off with PULSE_PREFETCH_MB=0.
+
+    python -m benchmarks.prefetch [--script git_PhonePe_pulse.py]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+QUARTERS = ["Q1 (Jan-Mar)", "Q2 (Apr-Jun)", "Q3 (Jul-Sep)", "Q4 (Oct-Dec)"]
+# (widget, value): 2023 Q1 -> Q4, 2022 Q4 -> Q1, 2021 Q1 -> Q4
+WALK = ([("quarter", q) for q in QUARTERS[1:]] + [("year", "2022")]
+        + [("quarter", q) for q in QUARTERS[2::-1]] + [("year", "2021")]
+        + [("quarter", q) for q in QUARTERS[1:]])
+
+
+def walk(script):
+    """Runs the walk in this process and returns the timings and cache stats."""
+    import streamlit_option_menu
+    from streamlit.testing.v1 import AppTest
+
+    from benchmarks.reruns import FragmentRuns
+    from phonepe_pulse.prefetch import Prefetcher
+
+    # st.cache_resource only caches inside a script run, so keep a handle on
+    # the app's prefetcher (and through it, its query and figure caches)
+    prefetchers = []
+    original_init = Prefetcher.__init__
+
+    def __init__(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        prefetchers.append(self)
+
+    Prefetcher.__init__ = __init__
+    streamlit_option_menu.option_menu = lambda *args, **kwargs: "Explore Data"
+    runs = FragmentRuns()
+    app = AppTest.from_file(script, default_timeout=120)
+    app.run()
+    widgets = {
+        "All India": {"year": lambda app: app.selectbox[1], "quarter": lambda app: app.selectbox[2]},
+        "District": {"year": lambda app: app.selectbox(key="year-dist"),
+                     "quarter": lambda app: app.selectbox(key="qua-dist")},
+    }
+    result = {}
+    for panel, find in widgets.items():
+        times = []
+        for widget, value in WALK:
+            prefetchers[0].wait()
+            _, ms = runs.change(app, find[widget], value)
+            times.append(ms)
+        result[panel] = statistics.median(times)
+    prefetcher = prefetchers[0]
+    prefetcher.wait()
+    queries, figures = prefetcher.caches
+    result.update(queries.stats(), **prefetcher.stats())
+    result.update({"figure_" + k: v for k, v in figures.stats().items()})
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", default="git_PhonePe_pulse.py")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(walk(args.script)))
+        return
+
+    print(f"{'prefetch':<10}{'All India ms':>14}{'District ms':>13}{'misses':>8}"
+          f"{'prefetched':>12}{'used':>6}{'hit rate':>10}")
+    for label, budget in [("off", "0"), ("on", os.environ.get("PULSE_PREFETCH_MB", "32"))]:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.prefetch", "--child", "--script", args.script],
+                             check=True, capture_output=True, text=True,
+                             env=dict(os.environ, PULSE_PREFETCH_MB=budget)).stdout
+        r = json.loads(out.splitlines()[-1])
+        print(f"{label:<10}{r['All India']:>14.1f}{r['District']:>13.1f}{r['misses']:>8}"
+              f"{r['prefetched']:>12}{r['prefetch_hits']:>6}{r['prefetch_hit_rate']:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
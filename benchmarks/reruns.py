@@ -0,0 +1,119 @@
+"""Rerun time per widget change on the Explore Data page.
+
+Each widget is flipped between its default and another value `--runs`
+times with streamlit's AppTest, and the median script time is reported
+together with the kind of rerun the change triggers: "app" for a full
+script run, "fragment" when the widget lives in an `st.fragment` and only
+that fragment is rerun.
+
+    python -m benchmarks.reruns [--script git_PhonePe_pulse.py] [--runs 10]
+
+AppTest itself always reruns the whole script, so the script runner is
+patched to do what the browser does: keep the fragments across runs and
+send a changed widget's fragment id with the rerun request.
+"""
+import argparse
+import statistics
+import time
+
+import streamlit_option_menu
+from streamlit.runtime.fragment import MemoryFragmentStorage
+from streamlit.runtime.scriptrunner import RerunData
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+
+# (widget, how to find it in the AppTest tree, default value, other value)
+CHANGES = [
+    ("All India section", lambda app: app.selectbox[0], "Transactions", "Users"),
+    ("All India insurance", lambda app: app.selectbox[0], "Transactions", "Insurance"),
+    ("All India year", lambda app: app.selectbox[1], "2023", "2022"),
+    ("All India quarter", lambda app: app.selectbox[2], "Q1 (Jan-Mar)", "Q2 (Apr-Jun)"),
+    ("District state", lambda app: app.selectbox(key="state-dist"), "Tamil Nadu", "Karnataka"),
+    ("District section", lambda app: app.selectbox(key="sec-dist"), "Transactions", "Users"),
+    ("District insurance", lambda app: app.selectbox(key="sec-dist"), "Transactions", "Insurance"),
+    ("District attribute", lambda app: app.selectbox(key="T_att-dist"), "Transaction Count", "Transaction Amount"),
+    ("District year", lambda app: app.selectbox(key="year-dist"), "2023", "2022"),
+    ("District quarter", lambda app: app.selectbox(key="qua-dist"), "Q1 (Jan-Mar)", "Q2 (Apr-Jun)"),
+    ("District chart", lambda app: app.selectbox(key="chart-dist"), "bar", "line"),
+    ("Trend section", lambda app: app.selectbox(key="sec-trend"), "Transactions", "Users"),
+    ("Trend insurance", lambda app: app.selectbox(key="sec-trend"), "Transactions", "Insurance"),
+    ("Trend state", lambda app: app.selectbox(key="state-trend"), "All States", "Tamil Nadu"),
+    ("Trend measure", lambda app: app.selectbox(key="measure-trend"), "Value", "YoY growth"),
+]
+
+
+class FragmentRuns:
+    """Patches AppTest's script runner to support fragment-scoped reruns."""
+
+    def __init__(self):
+        self.storage = MemoryFragmentStorage()
+        self.fragment_id = None
+        self.widget_fragments = {}  # widget id -> fragment id, from the last full run
+        original_init = local_script_runner.LocalScriptRunner.__init__
+        original_run = local_script_runner.LocalScriptRunner.run
+
+        def __init__(runner, *args, **kwargs):
+            original_init(runner, *args, **kwargs)
+            runner._fragment_storage = self.storage
+
+        def run(runner, *args, **kwargs):
+            tree = original_run(runner, *args, **kwargs)
+            if not self.fragment_id:
+                self.widget_fragments = {}
+                for msg in runner.forward_msgs():
+                    element = msg.delta.new_element
+                    kind = element.WhichOneof("type") if msg.HasField("delta") else None
+                    widget_id = getattr(getattr(element, kind), "id", None) if kind else None
+                    if widget_id and msg.delta.fragment_id:
+                        self.widget_fragments[widget_id] = msg.delta.fragment_id
+            return tree
+
+        local_script_runner.LocalScriptRunner.__init__ = __init__
+        local_script_runner.LocalScriptRunner.run = run
+        local_script_runner.RerunData = lambda **kwargs: RerunData(fragment_id=self.fragment_id, **kwargs)
+
+    def change(self, app, find, value):
+        """Sets a widget and reruns like the browser would; returns (kind, ms)."""
+        widget = find(app).set_value(value)
+        self.fragment_id = self.widget_fragments.get(widget.id)
+        kind = "fragment" if self.fragment_id else "app"
+        start = time.perf_counter()
+        app.run()
+        elapsed = (time.perf_counter() - start) * 1000
+        if app.exception:
+            raise SystemExit(f"{find}: {app.exception[0].value}")
+        if self.fragment_id:
+            # The browser merges a fragment's elements into the page; AppTest
+            # replaces its tree with them, so rebuild the full tree (untimed)
+            # from the widget values already in session state
+            self.fragment_id = None
+            app._run()
+        return kind, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", default="git_PhonePe_pulse.py")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    streamlit_option_menu.option_menu = lambda *args, **kwargs: "Explore Data"
+    runs = FragmentRuns()
+    app = AppTest.from_file(args.script, default_timeout=120)
+    app.run()
+    if app.exception:
+        raise SystemExit(app.exception[0].value)
+
+    print(f"{'widget':<22}{'rerun':>10}{'ms':>10}")
+    for name, find, default, other in CHANGES:
+        times = []
+        for i in range(args.runs):
+            kind, ms = runs.change(app, find, [other, default][i % 2])
+            times.append(ms)
+        if args.runs % 2:
+            runs.change(app, find, default)
+        print(f"{name:<22}{kind:>10}{statistics.median(times):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
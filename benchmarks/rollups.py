@@ -0,0 +1,79 @@
+"""Headline panel queries: base-table scans vs. quarterly rollups.
+
+Builds a scratch database from Data/*.csv and times the All India
+Transactions, Categories, Users and state-map queries for every
+(Year, Quater), with the old scan queries and the rollup lookups.
+
+    python -m benchmarks.rollups [--repeat 20]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+from phonepe_pulse.loader import DATA_DIR, build_database
+
+
+BEFORE = {
+    "transactions": """SELECT SUM(Transaction_count), SUM(Transaction_amount) FROM Agg_Trans
+                       WHERE Year = ? AND Quater = ?""",
+    "categories": """SELECT Transaction_type, SUM(Transaction_count) FROM Agg_Trans
+                     WHERE Year = ? AND Quater = ? GROUP BY Transaction_type""",
+    "trans_map": """SELECT State, Year, Quater, Transaction_count, Transaction_amount FROM Map_Trans
+                    WHERE Year = ? AND Quater = ? GROUP BY State ORDER BY State""",
+    "users": """SELECT SUM(Registered_users), SUM(App_opens) FROM Agg_Users
+                WHERE Year = ? AND Quater = ? GROUP BY Year, Quater""",
+    "users_map": """SELECT State, Registered_users, App_opens FROM Map_Users
+                    WHERE Year = ? AND Quater = ? GROUP BY State ORDER BY State""",
+}
+
+AFTER = {
+    "transactions": "SELECT Transaction_count, Transaction_amount FROM Trans_Quarter WHERE Year = ? AND Quater = ?",
+    "categories": """SELECT Transaction_type, Transaction_count FROM Trans_Type_Quarter
+                     WHERE Year = ? AND Quater = ? ORDER BY Transaction_type""",
+    "trans_map": """SELECT State, Year, Quater, Transaction_count, Transaction_amount FROM Trans_State_Quarter
+                    WHERE Year = ? AND Quater = ? ORDER BY State""",
+    "users": "SELECT Registered_users, App_opens FROM Users_Quarter WHERE Year = ? AND Quater = ?",
+    "users_map": """SELECT State, Registered_users, App_opens FROM Users_State_Quarter
+                    WHERE Year = ? AND Quater = ? ORDER BY State""",
+}
+
+
+def time_panel(connection, sql, quarters, repeat):
+    """Median ms to run `sql` and build its DataFrame, over all quarters."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for params in quarters:
+            cur = connection.execute(sql, params)
+            pd.DataFrame(cur.fetchall(), columns=[d[0] for d in cur.description])
+        runs.append((time.perf_counter() - start) * 1000 / len(quarters))
+    runs.sort()
+    return runs[len(runs) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DATA_DIR)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        build_database(db_path, args.data)
+        connection = sqlite3.connect(db_path)
+        quarters = connection.execute("SELECT DISTINCT Year, Quater FROM Agg_Trans ORDER BY 1, 2").fetchall()
+
+        print(f"{'panel':<14}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+        for panel in BEFORE:
+            before = time_panel(connection, BEFORE[panel], quarters, args.repeat)
+            after = time_panel(connection, AFTER[panel], quarters, args.repeat)
+            print(f"{panel:<14}{before:>12.3f}{after:>12.3f}{before / after:>9.1f}x")
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
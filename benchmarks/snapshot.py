@@ -0,0 +1,155 @@
+"""Memory of N app processes holding the tables, private or memory-mapped.
+
+For each `--scale` the tables are generated by `benchmarks.synthetic` and
+published as a snapshot (`phonepe_pulse.snapshot`). Then, for each number
+of `--workers`, that many processes start together, each with one engine,
+and run a sample of the dashboard paths of `benchmarks.suite`:
+
+    memory     `MemoryEngine`: each process reads its own compact copy
+    snapshot   `SnapshotEngine`: each process maps the published snapshot
+
+Every process reports its /proc/self/smaps_rollup once the paths ran and
+stays alive until all of them have, so shared pages are counted while
+they are shared. Per variant it prints the engine start time, the mean
+RSS of a process, the sum of the PSS (shared pages split between the
+processes that map them, i.e. what the processes hold together) and the
+sum of their private memory, plus the p50 ms of the sampled paths.
+
+Last, it times a publish: one row is added to a CSV file, the new version
+is written and CURRENT swapped, and a reader opens it.
+
+    python -m benchmarks.snapshot [--scale 1 100] [--workers 1 2 4] [--sample 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.model import PATHS
+from benchmarks.suite import path_calls
+from benchmarks.synthetic import generate
+from phonepe_pulse import db
+from phonepe_pulse.cache import QueryCache
+from phonepe_pulse.engines import MemoryEngine, SnapshotEngine
+from phonepe_pulse.loader import DATA_DIR, TABLES
+from phonepe_pulse.snapshot import current_version, open_snapshot, snapshot_dir, write_snapshot
+
+
+VARIANTS = ["memory", "snapshot"]
+
+
+def smaps_mb():
+    """{field: MB} of /proc/self/smaps_rollup."""
+    fields = {}
+    with open("/proc/self/smaps_rollup", encoding="ascii") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                fields[name] = int(value.split()[0]) / 1024
+    return fields
+
+
+def run_worker(variant, data_dir, sample):
+    """Starts one engine, runs the sampled paths; returns the measurements."""
+    start = time.perf_counter()
+    if variant == "memory":
+        engine = MemoryEngine(data_dir)
+    else:
+        engine = SnapshotEngine(data_dir)
+    start_s = time.perf_counter() - start
+    calls = path_calls()
+    times = {}
+    for path in PATHS:
+        times[path] = []
+        for fn, args in calls[path][::sample]:
+            with db.bind(engine, variant, QueryCache(0), QueryCache(0)):
+                start = time.perf_counter()
+                fn(*args)
+                times[path].append((time.perf_counter() - start) * 1000)
+    smaps = smaps_mb()
+    private = smaps["Private_Clean"] + smaps["Private_Dirty"]
+    return {"start_s": start_s, "rss_mb": smaps["Rss"], "pss_mb": smaps["Pss"], "private_mb": private,
+            "p50": {path: statistics.median(t) for path, t in times.items()}}
+
+
+def measure(variant, data_dir, workers, sample):
+    """run_worker in `workers` processes alive at the same time."""
+    procs = [subprocess.Popen([sys.executable, "-m", "benchmarks.snapshot", "--worker", variant,
+                               "--data", data_dir, "--sample", str(sample)],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+             for _ in range(workers)]
+    results = []
+    for proc in procs:
+        line = proc.stdout.readline()
+        if not line:
+            raise SystemExit(f"{variant}: worker failed\n{proc.stderr.read()}")
+        results.append(json.loads(line))
+    # Everyone has measured; let them exit
+    for proc in procs:
+        proc.stdin.close()
+        proc.wait()
+    return {"start_s": statistics.mean(r["start_s"] for r in results),
+            "rss_mb": statistics.mean(r["rss_mb"] for r in results),
+            "pss_mb": sum(r["pss_mb"] for r in results),
+            "private_mb": sum(r["private_mb"] for r in results),
+            "p50": {path: statistics.median(r["p50"][path] for r in results) for path in PATHS}}
+
+
+def time_publish(data_dir):
+    """Seconds to publish a changed CSV file and to open the new version."""
+    root = snapshot_dir(data_dir)
+    old = current_version(root)
+    path = os.path.join(data_dir, TABLES["Agg_Trans"])
+    with open(path, "rb") as f:
+        last = f.read().rstrip(b"\n").rsplit(b"\n", 1)[-1]
+    with open(path, "ab") as f:
+        f.write(last + b"\n")
+    start = time.perf_counter()
+    version = write_snapshot(data_dir)
+    publish_s = time.perf_counter() - start
+    assert version != old and current_version(root) == version
+    start = time.perf_counter()
+    open_snapshot(version, root)
+    return publish_s, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DATA_DIR)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--sample", type=int, default=10, help="run every n-th call of each path")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.data, args.sample)), flush=True)
+        sys.stdin.read()
+        return
+
+    for scale in args.scale:
+        with tempfile.TemporaryDirectory() as tmp:
+            rows = generate(args.data, tmp, scale)
+            start = time.perf_counter()
+            write_snapshot(tmp)
+            write_s = time.perf_counter() - start
+            version_dir = os.path.join(snapshot_dir(tmp), current_version(snapshot_dir(tmp)))
+            size = sum(entry.stat().st_size for entry in os.scandir(version_dir)) / 2**20
+            results = {(variant, workers): measure(variant, tmp, workers, args.sample)
+                       for workers in args.workers for variant in VARIANTS}
+            publish_s, open_ms = time_publish(tmp)
+        print(f"\nx{scale}: {rows} rows, snapshot {size:.1f} MB written in {write_s:.2f} s")
+        print(f"{'':<10}{'procs':>6}{'start s':>9}{'RSS MB':>8}{'PSS MB':>8}{'private MB':>12}"
+              + "".join(f"{label:>12}" for label in PATHS.values()))
+        for (variant, workers), r in results.items():
+            print(f"{variant:<10}{workers:>6}{r['start_s']:>9.2f}{r['rss_mb']:>8.0f}{r['pss_mb']:>8.0f}"
+                  f"{r['private_mb']:>12.0f}" + "".join(f"{r['p50'][path]:>12.2f}" for path in PATHS))
+        print(f"publish: new version written and swapped in {publish_s:.2f} s, opened in {open_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
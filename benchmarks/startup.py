@@ -0,0 +1,106 @@
+"""Import time and per-interaction script time for each dashboard page.
+
+Each page is measured in a fresh process with streamlit's AppTest:
+
+- import: time spent importing modules during the first run (the
+  dashboard's own dependencies; streamlit itself is already loaded)
+- first run: the first script run, including page imports and cold queries
+- rerun: median of plain reruns (widget state unchanged)
+- interaction: median rerun after changing a widget on the page
+- plotly: whether plotly.express was imported at all
+
+    python -m benchmarks.startup [--script git_PhonePe_pulse.py] [--runs 10]
+
+The option_menu component cannot be clicked in AppTest, so it is patched
+to return the page under test.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from phonepe_pulse.pages import PAGES
+
+
+CASE = r"""
+import json, statistics, sys, time
+import streamlit, streamlit_option_menu
+from streamlit.testing.v1 import AppTest
+
+script, page, runs = sys.argv[1], sys.argv[2], int(sys.argv[3])
+streamlit_option_menu.option_menu = lambda *args, **kwargs: page
+app = AppTest.from_file(script, default_timeout=120)
+
+
+def timed(action=None):
+    if action:
+        action()
+    start = time.perf_counter()
+    app.run()
+    if app.exception:
+        raise SystemExit(f"{page}: {app.exception[0].value}")
+    return (time.perf_counter() - start) * 1000
+
+
+def interact(i):
+    if page == "Explore Data":
+        app.selectbox[1].set_value(["2022", "2023"][i % 2])
+    elif page == "Insights":
+        box = app.selectbox[0]
+        box.set_value(box.options[i % 2])
+
+
+print(MARK, file=sys.stderr, flush=True)
+first = timed()
+print(MARK, file=sys.stderr, flush=True)
+reruns = [timed() for _ in range(runs)]
+interactions = [timed(lambda: interact(i)) for i in range(runs)]
+print(json.dumps({
+    "first run": first,
+    "rerun": statistics.median(reruns),
+    "interaction": statistics.median(interactions),
+    "plotly": "plotly.express" in sys.modules,
+}))
+"""
+MARK = "-- first run --"
+
+
+def first_run_imports(stderr):
+    """Milliseconds of top-level imports between the two MARK lines of -X importtime output."""
+    section = stderr.split(MARK)[1]
+    total = 0
+    for line in section.splitlines():
+        # "import time:  self [us] | cumulative | imported package"; nested
+        # imports are indented and already counted in their parent
+        parts = line.split("|")
+        if line.startswith("import time:") and len(parts) == 3 and not parts[2].startswith("  "):
+            total += int(parts[1])
+    return total / 1000
+
+
+def run_page(script, page, runs):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"MARK = {MARK!r}\n" + CASE,
+                           os.path.abspath(script), page, str(runs)],
+                          check=True, capture_output=True, text=True, cwd=os.getcwd(),
+                          env=dict(os.environ, PYTHONPATH=os.getcwd()))
+    result = json.loads(proc.stdout.splitlines()[-1])
+    result["import"] = first_run_imports(proc.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", default="git_PhonePe_pulse.py")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'page':<14}{'import ms':>11}{'first run':>11}{'rerun':>9}{'interaction':>13}{'plotly':>8}")
+    for page in PAGES:
+        r = run_page(args.script, page, args.runs)
+        print(f"{page:<14}{r['import']:>11.0f}{r['first run']:>11.0f}{r['rerun']:>9.1f}"
+              f"{r['interaction']:>13.1f}{'yes' if r['plotly'] else 'no':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""CSV vs. Parquet load time and peak RSS.
+
+Each case runs in a fresh subprocess so peak RSS is not shared between
+cases. `--scale N` repeats every row N times before writing the files.
+
+    python -m benchmarks.storage [--scale 100] [--dataset Map_Trans]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from phonepe_pulse.loader import DATA_DIR
+from phonepe_pulse.storage import write_dataset
+
+
+CASE = r"""
+import resource, sys, time
+import pandas as pd
+from phonepe_pulse.storage import read_dataset
+kind, path, dataset = sys.argv[1:4]
+start = time.perf_counter()
+if kind == "csv":
+    df = pd.read_csv(path)
+elif kind == "csv-filtered":
+    df = pd.read_csv(path, usecols=["State", "District", "Year", "Quater", "Transaction_amount"])
+    df = df[(df.Year == 2023) & (df.Quater == 1)]
+elif kind == "parquet":
+    df = read_dataset(dataset, parquet_dir=path)
+else:
+    df = read_dataset(dataset, columns=["State", "District", "Year", "Quater", "Transaction_amount"],
+                      filters=[("Year", "=", 2023), ("Quater", "=", 1)], parquet_dir=path)
+ms = (time.perf_counter() - start) * 1000
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(f"{ms:.1f} {rss:.1f} {df.memory_usage(deep=True).sum() / 2**20:.1f}")
+"""
+
+
+def run_case(kind, path, dataset):
+    out = subprocess.run([sys.executable, "-c", CASE, kind, path, dataset], check=True,
+                         capture_output=True, text=True, cwd=os.getcwd()).stdout.split()
+    return [float(x) for x in out]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DATA_DIR)
+    parser.add_argument("--dataset", default="Map_Trans")
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args()
+
+    df = pd.read_csv(os.path.join(args.data, f"{args.dataset}.csv"))
+    df = pd.concat([df] * args.scale, ignore_index=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, f"{args.dataset}.csv")
+        df.to_csv(csv_path, index=False)
+        write_dataset(args.dataset, df, parquet_dir=tmp)
+
+        print(f"{args.dataset} x{args.scale}: {len(df)} rows")
+        print(f"{'case':<18}{'load ms':>10}{'peak RSS MB':>14}{'frame MB':>10}")
+        for kind, path in [("csv", csv_path), ("parquet", tmp),
+                           ("csv-filtered", csv_path), ("parquet-filtered", tmp)]:
+            ms, rss, frame = run_case(kind, path, args.dataset)
+            print(f"{kind:<18}{ms:>10.1f}{rss:>14.1f}{frame:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Headless benchmark of every dashboard data path at growing data volume.
+
+For each `--scale` the nine tables are generated by `benchmarks.synthetic`
+into a scratch folder and loaded with `build_database`. Then each path
+below runs in a fresh process, so its peak RSS is its own, with the page
+code bound to the engine by `phonepe_pulse.db.bind`. Every call gets an
+empty query cache, so the times are what a cache miss costs. Figures are
+not built: they are drawn from the same small frames at every scale.
+
+Explore Data, for every (year, quarter), state and section:
+    all-india/*           the All India totals, categories and state map rows
+    top-10/*              the Top 10 States, Districts and Postal Codes tabs
+    districts             the District explorer
+    trends                the Trends panel, All States and every state
+Insights:
+    insights              the ten summary tables
+    top-n                 every metric and level, every quarter, All India and every state
+
+Scales above FULL_SCALE generate only the LARGE_SCALE_YEARS rows and run
+the paths over those quarters alone: x1000 in full is ~60M rows, whose
+load does not fit the 5 GB machine the baseline is recorded on, while one
+year at x1000 (~12M rows) keeps the per-quarter row density, which is
+what the indexed Explore Data queries pay for. Trends, Insights and
+Top N read rollups, whose size does not grow with the scale. `--years`
+overrides this for every scale.
+
+Paths of fewer than MIN_SAMPLES calls are run again until they have
+that many timings. Per path it reports the calls, p50/p95 milliseconds, the p50 rows fetched
+and the peak RSS; per scale, the build time and the database size. The
+results are compared with `--baseline`. A path regresses when its p95 is
+more than `--tolerance` slower, and by at least `--floor` ms, or when its
+peak RSS grows by more than `--tolerance`. `--save` stores the results as
+the new baseline.
+
+    python -m benchmarks.suite [--scale 1 10 100 1000] [--engine sqlite] [--save]
+
+Exits non-zero if any path regressed.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import generate
+from phonepe_pulse.engines import ENGINES
+from phonepe_pulse.loader import DATA_DIR, build_database, fingerprint
+
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+YEARS = range(2018, 2024)
+QUARTERS = [(year, qua) for year in YEARS for qua in range(1, 5)]
+# Larger scales only generate (and query) these years: the last one every
+# table covers in full (Agg_Users ends in 2022 Q1, insurance starts in 2020 Q2)
+FULL_SCALE = 100
+LARGE_SCALE_YEARS = [2021]
+SECTIONS = ["Transactions", "Users", "Insurance"]
+# Short paths are repeated until they have this many timings, for a steadier p95
+MIN_SAMPLES = 200
+
+
+def path_calls(years=None):
+    """path -> [(function, args)], for every path the dashboard draws from.
+
+    With `years`, the per-quarter calls only cover those years' quarters.
+    """
+    from phonepe_pulse.dimensions import STATES
+    from phonepe_pulse.insights import INSIGHTS
+    from phonepe_pulse.pages import explore, insights
+    from phonepe_pulse.topn import METRICS
+
+    states = [state[0] for state in STATES]
+    quarters = [q for q in QUARTERS if years is None or q[0] in years]
+    return {
+        "all-india/transactions": [(explore.transactions_data, q) for q in quarters],
+        "all-india/users": [(explore.users_data, q) for q in quarters],
+        "all-india/insurance": [(explore.insurance_data, q) for q in quarters],
+        "top-10/states": [(explore.top_states_data, (s, *q)) for s in SECTIONS for q in quarters],
+        "top-10/districts": [(explore.top_districts_data, (s, *q)) for s in SECTIONS for q in quarters],
+        "top-10/postal-codes": [(explore.top_postal_codes_data, (s, *q)) for s in SECTIONS for q in quarters],
+        "districts": [(explore.district_data, (s, state, *q))
+                      for s in SECTIONS for state in states for q in quarters],
+        "trends": [(explore.trend_data, (s, next(iter(explore.ATTRIBUTES[s])), state))
+                   for s in SECTIONS for state in [None] + states],
+        "insights": [(insights.insight_data, (table,)) for table in INSIGHTS],
+        "top-n": [(insights.top_n_data, (metric, level, (year, year), qua, state, 10, False))
+                  for metric, m in METRICS.items() for level in m.levels
+                  for year, qua in quarters for state in [None] + states],
+    }
+
+
+def peak_rss_mb():
+    """This process's peak RSS. ru_maxrss carries over the peak of the
+    process that forked it on Linux, so VmHWM is read where there is one."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_path(path, db_path, data_dir, engine, years=None):
+    """Runs one path's calls in this process; returns its measurements."""
+    from phonepe_pulse import db, tracing
+    from phonepe_pulse.cache import QueryCache
+    from phonepe_pulse.engines import create_engine
+
+    query_engine = create_engine(engine, db_path=db_path, data_dir=data_dir)
+    calls = path_calls(years)[path]
+    rss_before = peak_rss_mb()
+    times, rows = [], []
+    for fn, args in calls * -(-MIN_SAMPLES // len(calls)):
+        with db.bind(query_engine, "suite", QueryCache(0), QueryCache(0)):
+            with tracing.trace(path, enabled=True) as run:
+                fn(*args)
+        times.append(run.ms)
+        rows.append(sum(s.attrs.get("rows", 0) for s in run.trace.spans if s.name == "fetchall"))
+    times.sort()
+    result = {"calls": len(calls), "p50": statistics.median(times),
+              "p95": times[min(len(times) - 1, int(len(times) * 0.95))],
+              "rows": statistics.median(rows), "rss_mb": peak_rss_mb(), "rss_delta_mb": peak_rss_mb() - rss_before}
+    return {key: round(value, 3) for key, value in result.items()}
+
+
+def measure(path, db_path, data_dir, engine, years=None):
+    """run_path in a fresh process."""
+    env = dict(os.environ, PULSE_ENGINE=engine, PULSE_PREFETCH_MB="0")
+    out = subprocess.run([sys.executable, "-m", "benchmarks.suite", "--worker", path, "--db", db_path,
+                          "--data", data_dir, "--engine", engine]
+                         + (["--years", *map(str, years)] if years else []),
+                         env=env, capture_output=True, text=True)
+    if out.returncode:
+        raise SystemExit(f"{path}: worker failed\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run_scale(scale, args):
+    """Generates, loads and benchmarks one scale."""
+    years = args.years or (LARGE_SCALE_YEARS if scale > FULL_SCALE else None)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        rows = generate(args.data, tmp, scale, args.seed, parquet=args.engine != "sqlite", years=years)
+        generate_s = time.perf_counter() - start
+        db_path = os.path.join(tmp, "pulse.db")
+        start = time.perf_counter()
+        build_database(db_path, tmp, fingerprint(tmp))
+        build_s = time.perf_counter() - start
+        db_mb = round(os.path.getsize(db_path) / 2**20, 1)
+        paths = {}
+        for path in path_calls():
+            if args.paths and path not in args.paths:
+                continue
+            paths[path] = measure(path, db_path, tmp, args.engine, years)
+            print(f"  {path}: {paths[path]['p95']:.2f} ms p95", file=sys.stderr, flush=True)
+    return {"rows": rows, "years": years, "generate_s": round(generate_s, 2), "build_s": round(build_s, 2), "db_mb": db_mb,
+            "paths": paths}
+
+
+def compare(current, base, args):
+    """The p95 ratio of `current` to `base`, or "REGRESSED ..." with why."""
+    if base is None:
+        return "new"
+    slower = current["p95"] - base["p95"]
+    if slower > args.floor and current["p95"] > base["p95"] * (1 + args.tolerance):
+        return f"REGRESSED p95 x{current['p95'] / base['p95']:.2f}"
+    if current["rss_mb"] > base["rss_mb"] * (1 + args.tolerance):
+        return f"REGRESSED rss x{current['rss_mb'] / base['rss_mb']:.2f}"
+    return f"x{current['p95'] / base['p95']:.2f}" if base["p95"] else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DATA_DIR)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--engine", default="sqlite", choices=ENGINES)
+    parser.add_argument("--paths", nargs="+", help="only these paths")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--years", type=int, nargs="+",
+                        help=f"only these years' rows and quarters (default: all, {LARGE_SCALE_YEARS} above x{FULL_SCALE})")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--floor", type=float, default=2.0, help="ignore p95 changes below this many ms")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_path(args.worker, args.db, args.data, args.engine, args.years)))
+        return
+
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+    base_results = baseline.get("results", {}).get(args.engine, {})
+
+    results = {}
+    regressed = 0
+    for scale in args.scale:
+        print(f"x{scale}...", file=sys.stderr, flush=True)
+        result = results[f"x{scale}"] = run_scale(scale, args)
+        base = base_results.get(f"x{scale}", {}).get("paths", {})
+        years = f" of {', '.join(map(str, result['years']))}" if result["years"] else ""
+        print(f"\nx{scale}: {result['rows']} rows{years}, database {result['db_mb']:.1f} MB, "
+              f"generated in {result['generate_s']:.1f} s, built in {result['build_s']:.1f} s")
+        print(f"{'path':<24}{'calls':>7}{'p50 ms':>9}{'p95 ms':>9}{'rows':>9}{'RSS MB':>9}{'+MB':>7}  baseline p95")
+        for path, r in result["paths"].items():
+            status = compare(r, base.get(path), args)
+            regressed += status.startswith("REGRESSED")
+            print(f"{path:<24}{r['calls']:>7}{r['p50']:>9.2f}{r['p95']:>9.2f}{r['rows']:>9.0f}"
+                  f"{r['rss_mb']:>9.0f}{r['rss_delta_mb']:>7.0f}  {status}")
+
+    if args.save:
+        baseline.setdefault("results", {}).setdefault(args.engine, {}).update(results)
+        baseline["machine"] = {"python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+                               "platform": platform.platform(), "cpus": os.cpu_count()}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"\nsaved {args.baseline}")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Synthetic Pulse data at a multiple of the bundled row counts.
+
+Every row of the nine Data/*.csv tables is split into `scale` rows with
+the same key columns (State, District, Pincode, Year, Quater,
+Transaction_type, Device_Brand). The measure columns are divided between
+them in random, seeded shares that add up to the original value. So the
+schemas, the key cardinalities and every per-key total are those of the
+bundled data; only the number of rows behind each key grows, as in a feed
+reported at a finer grain than a quarter. Rollups, Insights answers and
+rankings therefore come out the same at every scale. `--years` keeps only
+the rows of those years, for scales too large to generate in full; every
+table must have rows in them (Agg_Users ends in 2022).
+
+    python -m benchmarks.synthetic --scale 100 --out /tmp/pulse-x100 [--parquet] [--years 2021]
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from phonepe_pulse.loader import DATA_DIR, TABLES, file_sha256
+
+
+KEYS = {"State", "District", "Pincode", "Year", "Quater", "Transaction_type", "Device_Brand"}
+# Rows generated per block, to bound memory at large scales
+BLOCK_ROWS = 2_000_000
+
+
+def split_rows(df, scale, rng):
+    """Each row of `df` as `scale` rows whose measures add up to the row's."""
+    if scale == 1:
+        return df
+    shares = rng.dirichlet(np.ones(scale), size=len(df))
+    out = df.iloc[np.repeat(np.arange(len(df)), scale)].reset_index(drop=True)
+    for column in df.columns:
+        if column in KEYS:
+            continue
+        values = df[column].to_numpy()
+        if np.issubdtype(values.dtype, np.integer):
+            # floor(value * share), with the remainder given out one by one
+            parts = np.floor(values[:, None] * shares).astype(np.int64)
+            remainder = values - parts.sum(axis=1)
+            parts += np.arange(scale) < remainder[:, None]
+        else:
+            parts = values[:, None] * shares
+        out[column] = parts.ravel()
+    return out
+
+
+def write_table(table, data_dir, out_dir, scale, seed=0, years=None):
+    """Writes one table's synthetic CSV; returns (path, rows)."""
+    df = pd.read_csv(os.path.join(data_dir, TABLES[table]))
+    if years is not None:
+        df = df[df["Year"].isin(years)]
+        if df.empty:
+            raise ValueError(f"{table} has no rows in {', '.join(map(str, years))}; "
+                             "pick years every table covers")
+    rng = np.random.default_rng([seed, list(TABLES).index(table)])
+    path = os.path.join(out_dir, TABLES[table])
+    block = max(1, BLOCK_ROWS // scale)
+    for start in range(0, max(len(df), 1), block):
+        split_rows(df.iloc[start:start + block], scale, rng).to_csv(
+            path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    return path, len(df) * scale
+
+
+def generate(data_dir, out_dir, scale, seed=0, parquet=False, years=None):
+    """Writes all nine tables `scale` times over into `out_dir`.
+
+    With parquet=True the Parquet copies the DuckDB engine reads are
+    written too; with `years`, only the rows of those years.
+
+    Returns:
+        The total number of rows written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rows = 0
+    for table in TABLES:
+        path, n = write_table(table, data_dir, out_dir, scale, seed, years)
+        rows += n
+        if parquet:
+            from phonepe_pulse.storage import write_dataset
+
+            write_dataset(table, pd.read_csv(path), file_sha256(path), os.path.join(out_dir, "parquet"))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DATA_DIR)
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--parquet", action="store_true", help="also write the Parquet copies")
+    parser.add_argument("--years", type=int, nargs="+", help="only the rows of these years")
+    args = parser.parse_args()
+    rows = generate(args.data, args.out, args.scale, args.seed, args.parquet, args.years)
+    print(f"{args.out}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
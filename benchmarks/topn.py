@@ -0,0 +1,97 @@
+"""Top-N query times at growing data volume, on the SQLite and DuckDB engines.
+
+Every Data/*.csv file is repeated `--scale` times into a scratch folder
+and loaded both ways, as in `benchmarks.engines`. Then every metric and
+level of `phonepe_pulse.topn` is ranked over one quarter, one year, all
+years and one quarter of every year, for All India and for one state,
+top and bottom: 272 queries per engine, each timed as the median of
+`--repeat` runs straight on the engine (no query cache).
+
+    python -m benchmarks.topn [--scale 1 10 100] [--repeat 5] [--budget 100]
+
+Exits non-zero if any query is slower than `--budget` milliseconds.
+"""
+import argparse
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.engines import scale_data
+from phonepe_pulse.engines import create_engine
+from phonepe_pulse.loader import DATA_DIR, build_database, fingerprint
+from phonepe_pulse.topn import METRICS, YEARS, top_n_query
+
+
+# name -> (years, quarter)
+PERIODS = {
+    "quarter": ((2023, 2023), 1),
+    "year": ((2022, 2022), None),
+    "all years": (YEARS, None),
+    "Q2 of all": (YEARS, 2),
+}
+STATES = [None, "tamil-nadu"]
+
+
+def cases():
+    """(metric, level, period, state, bottom) of every benchmarked ranking."""
+    for metric, m in METRICS.items():
+        for level, period, state, bottom in itertools.product(m.levels, PERIODS, STATES, [False, True]):
+            yield metric, level, period, state, bottom
+
+
+def time_case(engine, case, repeat):
+    """Median milliseconds of one ranking, and its row count."""
+    metric, level, period, state, bottom = case
+    years, quarter = PERIODS[period]
+    sql, params = top_n_query(metric, level, years, quarter, state, 10, bottom)
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, rows = engine.execute(sql, params)
+        runs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(runs), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=DATA_DIR)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=100.0, help="slowest allowed query, ms")
+    args = parser.parse_args()
+
+    over = 0
+    for scale in args.scale:
+        with tempfile.TemporaryDirectory() as tmp:
+            rows = scale_data(args.data, tmp, scale)
+            db_path = os.path.join(tmp, "pulse.db")
+            build_database(db_path, tmp, fingerprint(tmp))
+            engines = [create_engine("sqlite", db_path=db_path), create_engine("duckdb", data_dir=tmp)]
+
+            # period -> engine -> times
+            times = {period: {engine.name: [] for engine in engines} for period in PERIODS}
+            for case in cases():
+                results = [time_case(engine, case, args.repeat) for engine in engines]
+                if len({n for _, n in results}) > 1:
+                    raise SystemExit(f"{case}: engines disagree on the row count")
+                for engine, (ms, _) in zip(engines, results):
+                    times[case[2]][engine.name].append(ms)
+
+        print(f"\nx{scale}: {rows} rows")
+        print(f"{'':<12}" + "".join(f"{e.name + ' p50':>13}{e.name + ' max':>13}" for e in engines))
+        for period, by_engine in times.items():
+            print(f"{period:<12}" + "".join(f"{statistics.median(t):>13.2f}{max(t):>13.2f}"
+                                            for t in by_engine.values()))
+        for engine in engines:
+            slowest = max(t for by_engine in times.values() for t in by_engine[engine.name])
+            status = "ok" if slowest <= args.budget else f"OVER {args.budget:.0f} ms"
+            over += slowest > args.budget
+            print(f"{engine.name}: slowest {slowest:.2f} ms, {status}")
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cost of the tracing layer on Explore Data reruns, disabled and enabled.
+
+Every widget of `benchmarks.reruns` is flipped `--runs` times with tracing
+off and `--runs` times with it on, interleaved. The run-to-run noise of a rerun is larger than the cost
+of its spans, so a span is also timed on its own, disabled and enabled,
+and its cost per rerun (spans per run x cost per span) is reported as a
+share of the rerun time.
+
+    python -m benchmarks.tracing [--script git_PhonePe_pulse.py] [--runs 10]
+"""
+import argparse
+import statistics
+import timeit
+
+import streamlit_option_menu
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.reruns import CHANGES, FragmentRuns
+from phonepe_pulse import tracing
+
+
+def span_cost(enabled, number=200_000):
+    """Microseconds of the dearer of a `span` block and a `traced` call, less
+    a plain function call; inside a trace when `enabled`."""
+    def plain():
+        pass
+
+    wrapped = tracing.traced()(plain)
+
+    def block():
+        with tracing.span("x", sql="") as s:
+            s.set(rows=0)
+
+    with tracing.trace("benchmark", enabled=enabled):
+        base = timeit.timeit(plain, number=number)
+        cost = max(timeit.timeit(block, number=number), timeit.timeit(wrapped, number=number))
+    return (cost - base) / number * 1e6
+
+
+def rerun_times(runs, app, repeat):
+    """(name, kind, median ms off, median ms on, spans per run) of every widget change."""
+    results = []
+    for name, find, default, other in CHANGES:
+        times = {False: [], True: []}
+        spans = [0]
+        for i in range(2 * repeat):
+            # off, off, on, on, ...: each setting sees both directions of the flip
+            tracing.ENABLED = i // 2 % 2 == 1
+            last = max((t.id for t in tracing.recent_traces()), default=0)
+            kind, ms = runs.change(app, find, [other, default][i % 2])
+            times[tracing.ENABLED].append(ms)
+            # The timed run's trace; reruns.py rebuilds the page after a fragment
+            new = [t for t in tracing.recent_traces() if t.id > last]
+            if new:
+                spans.append(len(new[0].spans))
+        tracing.ENABLED = False
+        results.append((name, kind, statistics.median(times[False]), statistics.median(times[True]), max(spans)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", default="git_PhonePe_pulse.py")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    off_us, on_us = span_cost(False), span_cost(True)
+    print(f"per span: {off_us:.3f} us disabled, {on_us:.3f} us enabled")
+
+    streamlit_option_menu.option_menu = lambda *args, **kwargs: "Explore Data"
+    runs = FragmentRuns()
+    app = AppTest.from_file(args.script, default_timeout=120)
+    app.run()
+    if app.exception:
+        raise SystemExit(app.exception[0].value)
+
+    print(f"{'widget':<22}{'rerun':>10}{'spans':>7}{'off ms':>9}{'on ms':>9}{'off %':>8}{'on %':>8}")
+    for name, kind, off_ms, on_ms, spans in rerun_times(runs, app, args.runs):
+        off_pct = spans * off_us / 1000 / off_ms * 100
+        on_pct = spans * on_us / 1000 / off_ms * 100
+        print(f"{name:<22}{kind:>10}{spans:>7}{off_ms:>9.1f}{on_ms:>9.1f}{off_pct:>8.3f}{on_pct:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Data-access layer for the PhonePe Pulse dashboard."""
@@ -0,0 +1,392 @@
+"""Headless JSON API over the aggregates the dashboard shows.
+
+    python -m phonepe_pulse.api [--port 8600] [--engine sqlite]
+
+    GET /api/v1/version
+    GET /api/v1/{section}/totals?year=2023&quarter=4        section: transactions, users or insurance
+    GET /api/v1/transactions/categories?year=2023&quarter=4
+    GET /api/v1/{section}/states?year=2023&quarter=4
+    GET /api/v1/{section}/top/{level}?year=2023&quarter=4&n=10    level: states, districts or pincodes
+    GET /api/v1/{section}/districts?state=tamil-nadu&year=2023&quarter=4
+    GET /api/v1/rankings?metric=transaction_amount&level=district&years=2022-2023[&quarter=4][&state=...][&n=10][&bottom=1]
+    GET /api/v1/insights
+    GET /api/v1/insights/{id}
+
+A response is {"version": data version, "data": [one object per row]},
+with the raw values the dashboard formats as "Cr"/"L". The top lists and
+district rows run the same SQL as the Explore Data page
+(`phonepe_pulse.queries`), rankings are the Insights Top N panel
+(`phonepe_pulse.topn`). Errors are {"error": message} with a 4xx status.
+
+Queries run on a thread pool through `run_query` and a process-wide
+QueryCache, bound to the API's own engine with `phonepe_pulse.db.bind`;
+encoded bodies are cached as well. Every response has a weak ETag of the
+data version and a Last-Modified of the newest CSV file, so a valid
+request with a matching If-None-Match or If-Modified-Since gets a 304
+without a query; its arguments are checked first. Bodies of 1 KB or more are gzipped for clients that accept it. The
+data version is checked every RELOAD_SECONDS; once the CSV files change
+(or, on the "snapshot" engine, a new snapshot is published), new
+requests are served from the new data.
+"""
+import asyncio
+import email.utils
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pandas as pd
+from tornado.ioloop import IOLoop, PeriodicCallback
+from tornado.web import Application, HTTPError, RequestHandler
+
+from phonepe_pulse.cache import QueryCache
+from phonepe_pulse.db import bind, run_query
+from phonepe_pulse.dimensions import STATES
+from phonepe_pulse.engines import DEFAULT_ENGINE, ENGINES, create_engine
+from phonepe_pulse.insights import INSIGHTS
+from phonepe_pulse.loader import DATA_DIR, DB_PATH, data_version, ensure_database, fingerprint, read_meta
+from phonepe_pulse.queries import district_query, top_query
+from phonepe_pulse.snapshot import ensure_snapshot, snapshot_dir
+from phonepe_pulse.topn import METRICS, YEARS, top_n_query
+from phonepe_pulse.tracing import trace
+
+
+PORT = 8600
+WORKERS = int(os.environ.get("PULSE_API_WORKERS", 4))
+RELOAD_SECONDS = 30
+# Encoded bodies kept; most are a few KB
+BODY_CACHE_SIZE = 4096
+MAX_N = 100
+
+SECTIONS = "transactions|users|insurance"
+STATE_SLUGS = {state[0] for state in STATES}
+
+
+# Queries: one function per endpoint, returning the rows as a DataFrame
+
+def totals(section, year, quarter):
+    """All India totals of a section in one quarter."""
+    if section == "transactions":
+        return run_query("""SELECT Transaction_count, Transaction_amount FROM Trans_Quarter
+                    WHERE Year = ? AND Quater = ?
+                    """, (year, quarter))
+    if section == "insurance":
+        return run_query("""SELECT Insurance_count, Insurance_amount FROM Ins_Quarter
+                    WHERE Year = ? AND Quater = ?
+                    """, (year, quarter))
+    return run_query("""SELECT Registered_users, App_opens FROM Users_Quarter
+                WHERE Year = ? AND Quater = ?
+                """, (year, quarter))
+
+
+def categories(year, quarter):
+    """Transaction count and amount per payment category in one quarter."""
+    return run_query("""SELECT Transaction_type, Transaction_count, Transaction_amount FROM Trans_Type_Quarter
+                WHERE Year = ? AND Quater = ?
+                ORDER BY Transaction_type
+                """, (year, quarter))
+
+
+def states(section, year, quarter):
+    """Every state's totals of a section in one quarter: the state map."""
+    if section == "transactions":
+        return run_query("""SELECT r.State, s.State_name, r.Transaction_count, r.Transaction_amount
+                    FROM Trans_State_Quarter r JOIN States s ON s.State = r.State
+                    WHERE r.Year = ? AND r.Quater = ?
+                    ORDER BY s.State_name
+                    """, (year, quarter))
+    if section == "insurance":
+        return run_query("""SELECT r.State, s.State_name, r.Insurance_count, r.Insurance_amount
+                    FROM Ins_State_Quarter r JOIN States s ON s.State = r.State
+                    WHERE r.Year = ? AND r.Quater = ?
+                    ORDER BY s.State_name
+                    """, (year, quarter))
+    return run_query("""SELECT r.State, s.State_name, r.Registered_users, r.App_opens
+                FROM Users_State_Quarter r JOIN States s ON s.State = r.State
+                WHERE r.Year = ? AND r.Quater = ?
+                ORDER BY s.State_name
+                """, (year, quarter))
+
+
+def top(section, level, year, quarter, n):
+    """The Top 10 States, Districts or Postal Codes tab of a section, n rows."""
+    return run_query(*top_query(section, level, year, quarter, n))
+
+
+def districts(section, state, year, quarter):
+    """Every district's totals of a state's section in one quarter."""
+    return run_query(*district_query(section, state, year, quarter))
+
+
+def rankings(metric, level, years, quarter, state, n, bottom):
+    """A top_n_query ranking."""
+    return run_query(*top_n_query(metric, level, years, quarter, state, n, bottom))
+
+
+def insight_list():
+    """The Insights questions and their ids."""
+    return pd.DataFrame([(table, insight.question) for table, insight in INSIGHTS.items()],
+                        columns=["id", "question"])
+
+
+def insight(table):
+    """An Insights answer, with its display column names."""
+    if table not in INSIGHTS:
+        raise HTTPError(404, f"no insight {table!r}")
+    return run_query(f"SELECT * FROM {table} ORDER BY Rank", columns=["Rank"] + INSIGHTS[table].columns)
+
+
+# Query-string arguments: name -> (parse, default); parse raises ValueError
+REQUIRED = object()
+
+
+def _quarter(value):
+    if value not in ("1", "2", "3", "4"):
+        raise ValueError("must be 1-4")
+    return int(value)
+
+
+def _n(value):
+    n = int(value)
+    if not 1 <= n <= MAX_N:
+        raise ValueError(f"must be 1-{MAX_N}")
+    return n
+
+
+def _state(value):
+    if value not in STATE_SLUGS:
+        raise ValueError("must be a state slug such as tamil-nadu")
+    return value
+
+
+def _years(value):
+    first, _, last = value.partition("-")
+    return int(first), int(last or first)
+
+
+def _choice(options):
+    def parse(value):
+        if value not in options:
+            raise ValueError(f"must be one of {', '.join(options)}")
+        return value
+    return parse
+
+
+ARGUMENTS = {
+    "year": (int, REQUIRED),
+    "quarter": (_quarter, REQUIRED),
+    "state": (_state, REQUIRED),
+    "n": (_n, 10),
+    "metric": (_choice(list(METRICS)), REQUIRED),
+    "level": (_choice(["state", "district", "pincode"]), REQUIRED),
+    "years": (_years, YEARS),
+    "quarter?": (_quarter, None),
+    "state?": (_state, None),
+    "bottom": (lambda value: value in ("1", "true"), False),
+}
+
+# (URL pattern, query function, its query-string arguments); named groups
+# of the pattern are passed as keyword arguments too
+ROUTES = [
+    (rf"/api/v1/(?P<section>{SECTIONS})/totals", totals, ["year", "quarter"]),
+    (r"/api/v1/transactions/categories", categories, ["year", "quarter"]),
+    (rf"/api/v1/(?P<section>{SECTIONS})/states", states, ["year", "quarter"]),
+    (rf"/api/v1/(?P<section>{SECTIONS})/top/(?P<level>states|districts|pincodes)", top, ["year", "quarter", "n"]),
+    (rf"/api/v1/(?P<section>{SECTIONS})/districts", districts, ["state", "year", "quarter"]),
+    (r"/api/v1/rankings", rankings, ["metric", "level", "years", "quarter?", "state?", "n", "bottom"]),
+    (r"/api/v1/insights", insight_list, []),
+    (rf"/api/v1/insights/(?P<table>{'|'.join(INSIGHTS)})", insight, []),
+]
+
+
+# The data a request is answered from; modified is a datetime
+Snapshot = namedtuple("Snapshot", "version modified engine")
+
+
+class Service:
+    """The API's engine, caches and worker pool, and the current data version."""
+
+    def __init__(self, engine=DEFAULT_ENGINE, db_path=DB_PATH, data_dir=DATA_DIR, workers=WORKERS):
+        self.engine = engine
+        self.db_path = db_path
+        self.data_dir = data_dir
+        self.queries = QueryCache()
+        self.bodies = QueryCache(BODY_CACHE_SIZE)
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="pulse-api")
+        self.current = None
+        self._files = None
+        self.reload()
+
+    def reload(self):
+        """Moves to the current data version, building the database if the
+        CSV files changed. Returns True if the version changed."""
+        if self.engine == "snapshot":
+            # Follows what the ETL publishes, like the dashboard processes
+            root = snapshot_dir(self.data_dir)
+            version = ensure_snapshot(self.data_dir)
+            if self.current is not None and self.current.version == version:
+                return False
+            modified = datetime.fromtimestamp(os.stat(os.path.join(root, version)).st_mtime, timezone.utc)
+            engine = create_engine(self.engine, data_dir=self.data_dir, version=version)
+            self.current = Snapshot(version, modified.replace(microsecond=0), engine)
+            return True
+        if self.engine == "sqlite":
+            version = ensure_database(self.db_path, self.data_dir)
+            files = read_meta(self.db_path)["files"]
+        else:
+            files = fingerprint(self.data_dir, self._files)
+            version = data_version(files)
+        self._files = files
+        if self.current is not None and self.current.version == version:
+            return False
+        newest = max(info["mtime_ns"] for info in files.values()) // 10**9
+        modified = datetime.fromtimestamp(newest, timezone.utc)
+        engine = create_engine(self.engine, db_path=self.db_path, data_dir=self.data_dir, version=version)
+        self.current = Snapshot(version, modified, engine)
+        return True
+
+    async def run(self, snapshot, name, fn, **kwargs):
+        """fn(**kwargs) on the worker pool, against `snapshot`."""
+        def call():
+            with bind(snapshot.engine, snapshot.version, self.queries, None):
+                with trace(name):
+                    return fn(**kwargs)
+        return await IOLoop.current().run_in_executor(self.executor, call)
+
+
+def json_body(version, df):
+    """The JSON response of a query result."""
+    return f'{{"version": {json.dumps(version)}, "data": {df.to_json(orient="records")}}}'
+
+
+class JsonHandler(RequestHandler):
+    """Writes errors as {"error": message}."""
+
+    def write_error(self, status_code, **kwargs):
+        error = kwargs.get("exc_info", (None, None))[1]
+        message = error.log_message if isinstance(error, HTTPError) and error.log_message else self._reason
+        self.finish({"error": message})
+
+
+class NotFoundHandler(JsonHandler):
+    def prepare(self):
+        raise HTTPError(404, "no such endpoint")
+
+
+class QueryHandler(JsonHandler):
+    """GET of one ROUTES entry."""
+
+    def initialize(self, service, fn, arguments):
+        self.service = service
+        self.fn = fn
+        self.arguments = arguments
+
+    def prepare(self):
+        # Each request is answered from the data version current when it arrived
+        self.snapshot = self.service.current
+
+    def compute_etag(self):
+        return f'W/"{self.snapshot.version}"'
+
+    def not_modified(self):
+        """True if the client's copy is of the current data version."""
+        if self.request.headers.get("If-None-Match"):
+            return self.check_etag_header()
+        since = self.request.headers.get("If-Modified-Since")
+        if not since:
+            return False
+        try:
+            return email.utils.parsedate_to_datetime(since) >= self.snapshot.modified
+        except (TypeError, ValueError):
+            return False
+
+    def parse_arguments(self):
+        kwargs = {}
+        for name in self.arguments:
+            parse, default = ARGUMENTS[name]
+            key = name.rstrip("?")
+            value = self.get_query_argument(key, None)
+            if value is None or value == "":
+                if default is REQUIRED:
+                    raise HTTPError(400, f"{key} is required")
+                kwargs[key] = default
+                continue
+            try:
+                kwargs[key] = parse(value)
+            except ValueError as e:
+                raise HTTPError(400, f"{key} {e}" if str(e).startswith("must") else f"bad {key} {value!r}")
+        return kwargs
+
+    async def get(self, **path):
+        snapshot = self.snapshot
+        self.set_header("Cache-Control", "no-cache")
+        self.set_header("Last-Modified", snapshot.modified)
+        self.set_etag_header()
+        # A bad request is a 400 even for a client holding the current version
+        kwargs = {**path, **self.parse_arguments()}
+        if self.not_modified():
+            self.set_status(304)
+            return
+        key = (self.request.path, tuple(sorted(kwargs.items())), snapshot.version)
+        body = self.service.bodies.get(key)
+        if body is None:
+            try:
+                df = await self.service.run(snapshot, self.request.path, self.fn, **kwargs)
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+            body = json_body(snapshot.version, df)
+            self.service.bodies.put(key, body)
+        self.set_header("Content-Type", "application/json; charset=UTF-8")
+        self.write(body)
+
+
+class VersionHandler(QueryHandler):
+    def initialize(self, service):
+        super().initialize(service, None, [])
+
+    async def get(self):
+        self.set_header("Cache-Control", "no-cache")
+        self.finish({"version": self.snapshot.version, "engine": self.service.engine,
+                     "last_modified": self.snapshot.modified.isoformat()})
+
+
+def make_app(service):
+    """The tornado Application serving ROUTES from `service`."""
+    handlers = [(r"/api/v1/version", VersionHandler, {"service": service})]
+    handlers += [(pattern, QueryHandler, {"service": service, "fn": fn, "arguments": arguments})
+                 for pattern, fn, arguments in ROUTES]
+    return Application(handlers, compress_response=True, default_handler_class=NotFoundHandler)
+
+
+async def serve(service, port=PORT, address=""):
+    """Serves the API until cancelled, checking the data version periodically."""
+    make_app(service).listen(port, address)
+
+    async def reload():
+        if await IOLoop.current().run_in_executor(service.executor, service.reload):
+            print(f"data version {service.current.version}", flush=True)
+
+    PeriodicCallback(reload, RELOAD_SECONDS * 1000).start()
+    print(f"serving version {service.current.version} on http://{address or 'localhost'}:{port}/api/v1/",
+          flush=True)
+    await asyncio.Event().wait()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the dashboard's aggregates as JSON over HTTP.")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--address", default="", help="interface to listen on; all by default")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE, choices=ENGINES)
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database file")
+    parser.add_argument("--data", default=DATA_DIR, help="folder holding the CSV files")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="query threads")
+    args = parser.parse_args()
+    service = Service(args.engine, args.db, args.data, args.workers)
+    asyncio.run(serve(service, args.port, args.address))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Bounded LRU cache for query results and figures.
+
+Entries are keyed on (sql, params, data version), so a new load of the CSV
+files never serves stale results. Cached DataFrames are handed out as
+copies because the panels modify their frames in place. The cache holds
+at most `maxsize` entries and, if `maxbytes` is given, at most that many
+bytes (for figures, whose size varies from kilobytes to a megabyte).
+
+Entries stored by the prefetcher (see `phonepe_pulse.prefetch`) are
+tracked until their first read: the cache counts how many were used
+before being evicted and how many bytes are still waiting to be read.
+"""
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+# ~6 years x 4 quarters x 36 states x 2 sections of district queries, plus
+# the All India panels and Insights
+DEFAULT_MAXSIZE = 2048
+
+
+def _nbytes(value):
+    """Approximate size of a cached DataFrame or string."""
+    if isinstance(value, str):
+        return len(value)
+    return int(value.memory_usage(index=True, deep=True).sum())
+
+
+class QueryCache:
+    """Thread-safe LRU cache with hit/miss and prefetch counters."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.nbytes = 0  # size of all entries, tracked when maxbytes is set
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prefetched = 0
+        self.prefetch_hits = 0
+        self.prefetched_bytes = 0  # prefetched entries not read yet
+        self._data = OrderedDict()
+        self._unread = {}  # prefetched key -> size, until its first read
+        self._sizes = {}  # key -> size, when maxbytes is set
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def prefetching(self):
+        """Marks this thread's puts as prefetches; its lookups are not counted."""
+        self._local.prefetching = True
+        try:
+            yield
+        finally:
+            self._local.prefetching = False
+
+    def get(self, key):
+        """Returns the cached value for `key`, or None on a miss."""
+        prefetching = getattr(self._local, "prefetching", False)
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                if not prefetching:
+                    self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            if not prefetching:
+                self.hits += 1
+                if key in self._unread:
+                    self.prefetch_hits += 1
+                    self.prefetched_bytes -= self._unread.pop(key)
+            return value
+
+    def put(self, key, value, size=None):
+        """Stores `value`, evicting the least recently used entries.
+
+        `size` is the value's size in bytes, measured here when omitted.
+        """
+        prefetching = getattr(self._local, "prefetching", False)
+        if size is None:
+            size = _nbytes(value) if prefetching or self.maxbytes is not None else 0
+        with self._lock:
+            if prefetching and key not in self._data:
+                self._unread[key] = size
+                self.prefetched += 1
+                self.prefetched_bytes += size
+            if self.maxbytes is not None:
+                self.nbytes += size - self._sizes.get(key, 0)
+                self._sizes[key] = size
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize or (self.maxbytes is not None and self.nbytes > self.maxbytes):
+                evicted, _ = self._data.popitem(last=False)
+                self.prefetched_bytes -= self._unread.pop(evicted, 0)
+                self.nbytes -= self._sizes.pop(evicted, 0)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._unread.clear()
+            self._sizes.clear()
+            self.prefetched_bytes = 0
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Returns the counters as a dict."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.nbytes,
+            "maxbytes": self.maxbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "prefetched": self.prefetched,
+            "prefetch_hits": self.prefetch_hits,
+            "prefetch_hit_rate": self.prefetch_hits / self.prefetched if self.prefetched else 0.0,
+            "prefetched_bytes": self.prefetched_bytes,
+        }
@@ -0,0 +1,197 @@
+"""Process-wide, read-only query layer for the dashboard.
+
+Streamlit serves every session from one process and runs each session's
+script on its own thread. `get_engine` is a `st.cache_resource`, so all
+sessions share one query engine (see `phonepe_pulse.engines`), which keeps
+a single connection per thread. The engine is picked with PULSE_ENGINE:
+"sqlite" (default) reads PhonePe_pulse.db, "duckdb" queries the Parquet or
+CSV files in Data/ directly, "memory" a compact copy of them held in
+memory and "snapshot" the same copy memory-mapped from the published
+snapshot, shared by every process.
+
+`prefetch` runs a panel's data function for the neighbouring quarters on
+a background pool, so stepping through quarters reads from the cache.
+`bind` runs the same functions without Streamlit, on a given engine and
+caches (for prefetch jobs and the benchmarks).
+"""
+import functools
+import os
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+from phonepe_pulse.cache import QueryCache
+from phonepe_pulse.engines import DEFAULT_ENGINE, create_engine
+from phonepe_pulse.loader import DATA_DIR, DB_PATH, data_version as files_version, ensure_database, fingerprint
+from phonepe_pulse.prefetch import Prefetcher
+from phonepe_pulse.snapshot import current_version, ensure_snapshot, snapshot_dir
+from phonepe_pulse.tracing import span
+
+
+ENGINE = DEFAULT_ENGINE
+# Bytes of figures kept, not entries, measured as their JSON: a state map is
+# ~0.85 MB, almost all of it GeoJSON, a district or Insights chart a few KB. 64 MB holds the
+# maps of every quarter and section plus the small charts.
+FIGURE_CACHE_MB = float(os.environ.get("PULSE_FIGURE_CACHE_MB", 64))
+
+# What a query or figure needs besides its own arguments. `engine` is None
+# until a cache miss needs it.
+Resources = namedtuple("Resources", "version engine queries figures")
+
+# Within `bind`: ((engine, db_path), Resources) resolved beforehand, so the
+# thread's queries and figures make no Streamlit calls
+_bound = threading.local()
+
+
+@st.cache_resource
+def load_database(db_path=DB_PATH):
+    """Builds the database once per process, only if the CSV files changed."""
+    return ensure_database(db_path)
+
+
+@st.cache_resource
+def load_files(data_dir=DATA_DIR):
+    """Data version of the CSV files, for engines that read them directly."""
+    return files_version(fingerprint(data_dir))
+
+
+@st.cache_resource
+def load_snapshot(data_dir=DATA_DIR):
+    """Publishes a first snapshot once per process if there is none yet."""
+    return ensure_snapshot(data_dir)
+
+
+# Two entries: the current version and the one sessions may still be
+# finishing a rerun on. Older engines are dropped with their connections
+# (and the snapshot mappings).
+@st.cache_resource(max_entries=2)
+def get_engine(engine=ENGINE, version=None, db_path=DB_PATH):
+    """Shared query engine for a given data version.
+
+    A new data version gets a new engine, so connections opened on a
+    replaced database file are never reused.
+    """
+    return create_engine(engine, db_path=db_path, version=version)
+
+
+@st.cache_resource
+def get_query_cache():
+    """Process-wide cache of query results, shared by all sessions."""
+    return QueryCache()
+
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide cache of serialized Plotly figures, shared by all sessions."""
+    return QueryCache(maxbytes=FIGURE_CACHE_MB * 2**20)
+
+
+@st.cache_resource
+def get_prefetcher():
+    """Process-wide prefetch pool filling the shared query cache."""
+    return Prefetcher([get_query_cache(), get_figure_cache()])
+
+
+def data_version(db_path=DB_PATH, engine=ENGINE):
+    """Current data version of the engine's source data."""
+    if engine == "sqlite":
+        return load_database(db_path)
+    if engine == "snapshot":
+        # Read on every rerun, so each process follows a new publish
+        load_snapshot()
+        return current_version(snapshot_dir())
+    return load_files()
+
+
+def resources(db_path=DB_PATH, engine=ENGINE):
+    """The data version and caches for this thread's queries and figures."""
+    bound = getattr(_bound, "bound", None)
+    if bound is not None and bound[0] == (engine, db_path):
+        return bound[1]
+    return Resources(data_version(db_path, engine), None, get_query_cache(), get_figure_cache())
+
+
+def run_query(sql, params=(), columns=None, db_path=DB_PATH, engine=ENGINE):
+    """Runs a read-only query and returns the result as a DataFrame.
+
+    Results are memoized on (sql, params, data version), so repeated panel
+    renders are served from memory without touching the engine.
+
+    Args:
+        sql: the SQL statement.
+        params: values for the statement's `?` placeholders.
+        columns: optional names for the result columns.
+        db_path: SQLite database file.
+        engine: query engine name, one of `phonepe_pulse.engines.ENGINES`.
+
+    Returns:
+        A pandas DataFrame with a 0-based index, owned by the caller.
+    """
+    with span("query", sql=sql) as s:
+        version, query_engine, cache, _ = resources(db_path, engine)
+        key = (sql, tuple(params), version, engine, db_path)
+        df = cache.get(key)
+        cached = df is not None
+        if df is None:
+            query_engine = query_engine or get_engine(engine, version, db_path)
+            names, rows = query_engine.execute(sql, params)
+            with span("dataframe"):
+                df = pd.DataFrame(rows, columns=names)
+            cache.put(key, df)
+        df = df.copy()
+        if columns is not None:
+            df.columns = columns
+        s.set(rows=len(df), cached=cached)
+    return df
+
+
+@contextmanager
+def bind(query_engine, version, queries, figures, engine=ENGINE, db_path=DB_PATH):
+    """Serves this thread's run_query and cached_figure calls for (engine,
+    db_path) from `query_engine` and the given caches.
+
+    Args:
+        query_engine: an engine from `phonepe_pulse.engines.create_engine`.
+        version: the data version used in the cache keys.
+        queries, figures: QueryCache instances for results and figure specs.
+        engine, db_path: the run_query arguments served this way.
+    """
+    previous = getattr(_bound, "bound", None)
+    _bound.bound = ((engine, db_path), Resources(version, query_engine, queries, figures))
+    try:
+        yield
+    finally:
+        _bound.bound = previous
+
+
+def _run_bound(current, fn, *args, **kwargs):
+    with bind(current.engine, current.version, current.queries, current.figures):
+        fn(*args, **kwargs)
+
+
+def prefetch(fn, *args, **kwargs):
+    """Runs fn(*args, **kwargs) in the background so its run_query and
+    cached_figure calls are cached.
+
+    `fn` must only query and compute, never draw or call st.cache_*
+    functions; pass anything it needs from those as keyword arguments.
+    Its queries use the default engine and the data version current when
+    the job was queued. Jobs are deduplicated on (fn, args, data version),
+    so keyword arguments must not change what the job computes.
+
+    Returns:
+        True if the job was queued.
+    """
+    current = resources()
+    key = (fn.__module__, fn.__qualname__, args, current.version)
+    current = current._replace(engine=get_engine(ENGINE, current.version, DB_PATH))
+    return get_prefetcher().submit(key, functools.partial(_run_bound, current, fn, **kwargs), *args)
+
+
+def cache_stats():
+    """Query cache, figure cache and prefetch counters, e.g. for a debug panel."""
+    figures = {f"figure_{name}": value for name, value in get_figure_cache().stats().items()}
+    return {**get_query_cache().stats(), **figures, **get_prefetcher().stats()}
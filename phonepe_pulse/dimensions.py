@@ -0,0 +1,108 @@
+"""State and District dimension tables.
+
+The Pulse data names states by slug ("tamil-nadu") and districts in two
+spellings ("bengaluru urban district" in Map_*, "bengaluru urban" in
+Top_*). The loader stores one row per state and per (State, District) key
+so queries join to the display names, and the maps join to the GeoJSON
+`state_code`, in SQL:
+
+    SELECT s.State_name, SUM(t.Transaction_amount) FROM Agg_Trans t
+    JOIN States s ON s.State = t.State ...
+"""
+import pandas as pd
+
+
+# (slug, display name, GeoJSON st_nm, GeoJSON state_code, ISO 3166-2 code).
+# states_india.geojson predates the 2019/2020 reorganisation: it has no
+# Ladakh polygon (Ladakh is drawn as part of Jammu & Kashmir) and separate
+# Dadra & Nagar Haveli and Daman & Diu polygons, so Ladakh has no map
+# feature and the merged UT is drawn on the Dadra & Nagar Haveli polygon.
+STATES = [
+    ("andaman-&-nicobar-islands", "Andaman & Nicobar Islands", "Andaman & Nicobar Island", 35, "IN-AN"),
+    ("andhra-pradesh", "Andhra Pradesh", "Andhra Pradesh", 28, "IN-AP"),
+    ("arunachal-pradesh", "Arunachal Pradesh", "Arunanchal Pradesh", 12, "IN-AR"),
+    ("assam", "Assam", "Assam", 18, "IN-AS"),
+    ("bihar", "Bihar", "Bihar", 10, "IN-BR"),
+    ("chandigarh", "Chandigarh", "Chandigarh", 4, "IN-CH"),
+    ("chhattisgarh", "Chhattisgarh", "Chhattisgarh", 22, "IN-CG"),
+    ("dadra-&-nagar-haveli-&-daman-&-diu", "Dadra & Nagar Haveli & Daman & Diu", "Dadara & Nagar Havelli", 26, "IN-DH"),
+    ("delhi", "Delhi", "NCT of Delhi", 7, "IN-DL"),
+    ("goa", "Goa", "Goa", 30, "IN-GA"),
+    ("gujarat", "Gujarat", "Gujarat", 24, "IN-GJ"),
+    ("haryana", "Haryana", "Haryana", 6, "IN-HR"),
+    ("himachal-pradesh", "Himachal Pradesh", "Himachal Pradesh", 2, "IN-HP"),
+    ("jammu-&-kashmir", "Jammu & Kashmir", "Jammu & Kashmir", 1, "IN-JK"),
+    ("jharkhand", "Jharkhand", "Jharkhand", 20, "IN-JH"),
+    ("karnataka", "Karnataka", "Karnataka", 29, "IN-KA"),
+    ("kerala", "Kerala", "Kerala", 32, "IN-KL"),
+    ("ladakh", "Ladakh", None, None, "IN-LA"),
+    ("lakshadweep", "Lakshadweep", "Lakshadweep", 31, "IN-LD"),
+    ("madhya-pradesh", "Madhya Pradesh", "Madhya Pradesh", 23, "IN-MP"),
+    ("maharashtra", "Maharashtra", "Maharashtra", 27, "IN-MH"),
+    ("manipur", "Manipur", "Manipur", 14, "IN-MN"),
+    ("meghalaya", "Meghalaya", "Meghalaya", 17, "IN-ML"),
+    ("mizoram", "Mizoram", "Mizoram", 15, "IN-MZ"),
+    ("nagaland", "Nagaland", "Nagaland", 13, "IN-NL"),
+    ("odisha", "Odisha", "Odisha", 21, "IN-OD"),
+    ("puducherry", "Puducherry", "Puducherry", 34, "IN-PY"),
+    ("punjab", "Punjab", "Punjab", 3, "IN-PB"),
+    ("rajasthan", "Rajasthan", "Rajasthan", 8, "IN-RJ"),
+    ("sikkim", "Sikkim", "Sikkim", 11, "IN-SK"),
+    ("tamil-nadu", "Tamil Nadu", "Tamil Nadu", 33, "IN-TN"),
+    ("telangana", "Telangana", "Telangana", 0, "IN-TS"),
+    ("tripura", "Tripura", "Tripura", 16, "IN-TR"),
+    ("uttar-pradesh", "Uttar Pradesh", "Uttar Pradesh", 9, "IN-UP"),
+    ("uttarakhand", "Uttarakhand", "Uttarakhand", 5, "IN-UK"),
+    ("west-bengal", "West Bengal", "West Bengal", 19, "IN-WB"),
+]
+STATE_COLUMNS = ["State", "State_name", "Geo_name", "State_code", "ISO_code"]
+
+DIMENSIONS = {
+    "States": """CREATE TABLE States (
+        State TEXT NOT NULL PRIMARY KEY, State_name TEXT NOT NULL,
+        Geo_name TEXT, State_code INTEGER, ISO_code TEXT NOT NULL
+    ) WITHOUT ROWID""",
+    "Districts": """CREATE TABLE Districts (
+        State TEXT NOT NULL, District TEXT NOT NULL, District_name TEXT NOT NULL,
+        PRIMARY KEY (State, District)
+    ) WITHOUT ROWID""",
+}
+
+# Every (State, District) spelling used by the base tables
+DISTRICT_KEYS = " UNION ".join(
+    f"SELECT DISTINCT State, District FROM {table} WHERE District IS NOT NULL"
+    for table in ["Map_Trans", "Map_Users", "Map_Ins", "Top_Trans", "Top_Users", "Top_Ins"]
+)
+
+
+def states_frame():
+    return pd.DataFrame(STATES, columns=STATE_COLUMNS)
+
+
+def district_names(districts):
+    """Display names for a Series of raw district names.
+
+    "bengaluru urban district" and "bengaluru urban" both become
+    "Bengaluru Urban"; "north and middle andaman" becomes "North and
+    Middle Andaman".
+    """
+    return (districts.astype(str)
+            .str.replace(r"\s+district$", "", regex=True)
+            .str.strip()
+            .str.title()
+            .str.replace(r"(?<= )(And|Of|The)(?= )", lambda m: m.group(0).lower(), regex=True))
+
+
+def districts_frame(keys):
+    """The Districts table for a DataFrame of (State, District) keys."""
+    return keys.assign(District_name=district_names(keys["District"]))
+
+
+def create_dimensions(connection):
+    """Creates and fills States and Districts from the loaded base tables."""
+    for sql in DIMENSIONS.values():
+        connection.execute(sql)
+    connection.executemany("INSERT INTO States VALUES (?, ?, ?, ?, ?)", STATES)
+    keys = pd.DataFrame(connection.execute(DISTRICT_KEYS).fetchall(), columns=["State", "District"])
+    connection.executemany("INSERT INTO Districts VALUES (?, ?, ?)",
+                           districts_frame(keys).itertuples(index=False, name=None))
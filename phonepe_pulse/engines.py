@@ -0,0 +1,199 @@
+"""Pluggable query engines behind `run_query`.
+
+Both engines take the same SQL with `?` placeholders and return
+(column names, rows):
+
+- "sqlite" (default): read-only connections to PhonePe_pulse.db, one per
+  thread, with a larger prepared-statement cache.
+- "duckdb": an in-process DuckDB database whose base tables are views over the
+  Parquet copies in Data/parquet (or the CSV files when a copy is missing
+  or stale), so the base tables are never copied into a database. The
+  small rollup, dimension and Insights tables are computed into it once.
+- "memory": the same DuckDB setup over compact in-memory copies of the
+  base tables (see `phonepe_pulse.model`), read once per process.
+- "snapshot": the same compact tables, memory-mapped from the published
+  Arrow snapshot (see `phonepe_pulse.snapshot`), so every process on the
+  machine shares one copy of them in the page cache.
+
+The engine is chosen with the PULSE_ENGINE environment variable.
+"""
+import os
+import threading
+
+from phonepe_pulse.dimensions import DISTRICT_KEYS, districts_frame, states_frame
+from phonepe_pulse.insights import INSIGHTS, insight_frame
+from phonepe_pulse.loader import DATA_DIR, DB_PATH, TABLES, connect_readonly, file_sha256
+from phonepe_pulse.rollups import ROLLUPS
+from phonepe_pulse.tracing import span
+
+
+ENGINES = ("sqlite", "duckdb", "memory", "snapshot")
+DEFAULT_ENGINE = os.environ.get("PULSE_ENGINE", "sqlite")
+
+# Prepared statements kept per connection (sqlite3 defaults to 128)
+STATEMENT_CACHE_SIZE = 256
+
+
+class SQLiteEngine:
+    """One read-only SQLite connection per thread."""
+
+    name = "sqlite"
+
+    def __init__(self, db_path=DB_PATH, version=None):
+        self.db_path = db_path
+        self.version = version
+        self._local = threading.local()
+
+    def connection(self):
+        """Returns this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = connect_readonly(self.db_path, cached_statements=STATEMENT_CACHE_SIZE)
+            connection.execute("PRAGMA query_only = ON")
+            self._local.connection = connection
+        return connection
+
+    def execute(self, sql, params=()):
+        """Runs a query and returns (column names, rows)."""
+        with span("execute"):
+            cur = self.connection().execute(sql, params)
+        columns = [d[0] for d in cur.description]
+        with span("fetchall") as s:
+            rows = cur.fetchall()
+            s.set(rows=len(rows))
+        return columns, rows
+
+
+class DuckDBEngine:
+    """In-process DuckDB over the Parquet/CSV files, one cursor per thread."""
+
+    name = "duckdb"
+
+    def __init__(self, data_dir=DATA_DIR, version=None):
+        import duckdb
+
+        self.data_dir = data_dir
+        self.version = version
+        self._db = duckdb.connect(":memory:")
+        self._local = threading.local()
+
+        self._create_base_tables()
+        # Rollups hold one row per key and quarter whatever the data volume;
+        # computing them once keeps the rankings on them off the base files
+        for name, (_, select) in ROLLUPS.items():
+            self._db.execute(f"CREATE TABLE {name} AS " + select.format(where=""))
+        # Dimension tables are tiny; copy them in rather than keeping views
+        for name, frame in [("States", states_frame()),
+                            ("Districts", districts_frame(self._db.execute(DISTRICT_KEYS).df()))]:
+            self._db.register("_frame", frame)
+            self._db.execute(f"CREATE TABLE {name} AS SELECT * FROM _frame")
+            self._db.unregister("_frame")
+        # Insights answers are computed once, like the SQLite loader does
+        for name, insight in INSIGHTS.items():
+            self._db.register("_frame", insight_frame(self._execute, insight).reset_index())
+            self._db.execute(f"CREATE TABLE {name} AS SELECT * FROM _frame")
+            self._db.unregister("_frame")
+
+    def _create_base_tables(self):
+        """Views over the Parquet copies, or the CSV files when a copy is missing or stale."""
+        from phonepe_pulse import storage
+
+        parquet_dir = os.path.join(self.data_dir, "parquet")
+        for table, csv in TABLES.items():
+            csv_path = os.path.join(self.data_dir, csv)
+            if storage.is_current(table, file_sha256(csv_path), parquet_dir):
+                glob = os.path.join(storage.dataset_path(table, parquet_dir), "**", "*.parquet")
+                source = f"read_parquet('{glob}', hive_partitioning = true)"
+            else:
+                source = f"read_csv_auto('{csv_path}', header = true)"
+            self._db.execute(f"CREATE VIEW {table} AS SELECT * FROM {source}")
+
+    def _execute(self, sql, params):
+        cur = self._db.execute(sql, list(params))
+        rows = cur.fetchall()
+        return [d[0] for d in cur.description], rows
+
+    def connection(self):
+        """Returns this thread's cursor, opening it on first use."""
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = self._db.cursor()
+        return cursor
+
+    def execute(self, sql, params=()):
+        """Runs a query and returns (column names, rows)."""
+        cur = self.connection()
+        with span("execute"):
+            cur.execute(sql, list(params))
+        with span("fetchall") as s:
+            rows = cur.fetchall()
+            s.set(rows=len(rows))
+        return [d[0] for d in cur.description], rows
+
+
+class MemoryEngine(DuckDBEngine):
+    """In-process DuckDB over the compact in-memory tables of `phonepe_pulse.model`."""
+
+    name = "memory"
+
+    def __init__(self, data_dir=DATA_DIR, version=None, model=None):
+        # {table: DataFrame}; read with `load_model` when None
+        self.model = model
+        super().__init__(data_dir, version)
+
+    def _create_base_tables(self):
+        from phonepe_pulse.model import load_model
+
+        if self.model is None:
+            self.model = load_model(self.data_dir)
+        self._register(self._db)
+
+    def _register(self, connection):
+        # Registered frames are scanned in place, but only seen by the
+        # connection or cursor they were registered on
+        for table, frame in self.model.items():
+            connection.register(table, frame)
+
+    def connection(self):
+        """Returns this thread's cursor, opening it on first use."""
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = self._db.cursor()
+            self._register(cursor)
+        return cursor
+
+
+class SnapshotEngine(MemoryEngine):
+    """In-process DuckDB over the memory-mapped tables of a published snapshot.
+
+    `version` is the snapshot version to map (see `phonepe_pulse.snapshot`);
+    None maps the current one. Raises FileNotFoundError if none was published.
+    """
+
+    name = "snapshot"
+
+    def _create_base_tables(self):
+        from phonepe_pulse.snapshot import current_version, open_snapshot, snapshot_dir
+
+        if self.model is None:
+            root = snapshot_dir(self.data_dir)
+            if self.version is None:
+                self.version = current_version(root)
+            if self.version is None:
+                raise FileNotFoundError(f"no snapshot published in {root}; "
+                                        "run the ETL or python -m phonepe_pulse.snapshot first")
+            self.model = open_snapshot(self.version, root)
+        self._register(self._db)
+
+
+def create_engine(name=DEFAULT_ENGINE, db_path=DB_PATH, data_dir=DATA_DIR, version=None):
+    """Creates the engine called `name`, one of ENGINES."""
+    if name == "sqlite":
+        return SQLiteEngine(db_path, version)
+    if name == "duckdb":
+        return DuckDBEngine(data_dir, version)
+    if name == "memory":
+        return MemoryEngine(data_dir, version)
+    if name == "snapshot":
+        return SnapshotEngine(data_dir, version)
+    raise ValueError(f"unknown engine {name!r}, expected one of {', '.join(ENGINES)}")
@@ -0,0 +1,394 @@
+"""Parallel ETL from the PhonePe pulse JSON tree to the Data/*.csv files.
+
+Replaces the nested `os.listdir` loops of `data_fetch.ipynb`. The quarter
+files of each dataset are parsed on a process pool, and rows are streamed
+to the CSV in bounded batches with explicit column dtypes, so memory does
+not grow with the size of the tree.
+
+    git clone https://github.com/PhonePe/pulse.git
+    python -m phonepe_pulse.etl --pulse pulse/data --out Data
+
+Every run records the size, mtime and sha256 of each quarter file in a
+manifest next to the CSV files. With `--incremental`, only new or changed
+files are parsed, and just their (State, Year, Quater) partitions are
+replaced in the CSVs, which turns a quarterly refresh into seconds. Each
+dataset is also written as typed Parquet partitioned by Year/Quater (see
+`phonepe_pulse.storage`). Once all nine CSV files exist, the run publishes
+a new memory-mapped snapshot of them (see `phonepe_pulse.snapshot`), which
+running app processes on the "snapshot" engine switch to.
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from phonepe_pulse.loader import TABLES, file_sha256
+from phonepe_pulse.snapshot import write_snapshot
+from phonepe_pulse.storage import is_current, write_dataset
+
+
+PULSE_DIR = os.path.join("pulse", "data")
+OUT_DIR = "Data"
+
+# Rows buffered per dataset before they are written out
+BATCH_ROWS = 50_000
+# Quarter files handed to a worker at a time
+CHUNK_FILES = 64
+
+MANIFEST = "etl_manifest.json"
+
+
+def _agg_trans(D):
+    for z in D["data"]["transactionData"]:
+        instrument = z["paymentInstruments"][0]
+        yield z["name"], instrument["count"], instrument["amount"]
+
+
+def _agg_users(D):
+    if D["data"]["usersByDevice"] is None:
+        return
+    users = D["data"]["aggregated"]["registeredUsers"]
+    usage = D["data"]["aggregated"]["appOpens"]
+    for z in D["data"]["usersByDevice"]:
+        yield users, usage, z["brand"], z["count"], z["percentage"]
+
+
+def _agg_ins(D):
+    for z in D["data"]["transactionData"]:
+        instrument = z["paymentInstruments"][0]
+        yield instrument["count"], instrument["amount"]
+
+
+def _map_metric(D):
+    for z in D["data"]["hoverDataList"]:
+        yield z["name"], z["metric"][0]["count"], z["metric"][0]["amount"]
+
+
+def _map_users(D):
+    for place, z in D["data"]["hoverData"].items():
+        yield place, z["registeredUsers"], z["appOpens"]
+
+
+def _top_metric(D):
+    # Only the leading district and pincode are kept, as in the notebook
+    districts, pincodes = D["data"]["districts"], D["data"]["pincodes"]
+    if not districts or not pincodes:
+        return
+    d, p = districts[0], pincodes[0]
+    yield (d["entityName"], p["entityName"], d["metric"]["count"], d["metric"]["amount"],
+           p["metric"]["count"], p["metric"]["amount"])
+
+
+def _top_users(D):
+    districts, pincodes = D["data"]["districts"], D["data"]["pincodes"]
+    if not districts or not pincodes:
+        return
+    d, p = districts[0], pincodes[0]
+    yield d["name"], p["name"], d["registeredUsers"], p["registeredUsers"]
+
+
+# name -> (path under pulse/data, parser, {column: dtype} after State, Year, Quater)
+DATASETS = {
+    "Agg_Trans": ("aggregated/transaction/country/india/state", _agg_trans,
+                  {"Transaction_type": "string", "Transaction_count": "int64", "Transaction_amount": "float64"}),
+    "Agg_Users": ("aggregated/user/country/india/state", _agg_users,
+                  {"Registered_users": "int64", "App_opens": "int64", "Device_Brand": "string",
+                   "Brand_users": "int64", "Device_share": "float64"}),
+    "Agg_Ins": ("aggregated/insurance/country/india/state", _agg_ins,
+                {"Insurance_count": "int64", "Insurance_amount": "float64"}),
+    "Map_Trans": ("map/transaction/hover/country/india/state", _map_metric,
+                  {"District": "string", "Transaction_count": "int64", "Transaction_amount": "float64"}),
+    "Map_Users": ("map/user/hover/country/india/state", _map_users,
+                  {"District": "string", "Registered_users": "int64", "App_opens": "int64"}),
+    "Map_Ins": ("map/insurance/hover/country/india/state", _map_metric,
+                {"District": "string", "Insurance_count": "int64", "Insurance_amount": "float64"}),
+    "Top_Trans": ("top/transaction/country/india/state", _top_metric,
+                  {"District": "string", "Pincode": "string", "Trans_dist_count": "int64",
+                   "Trans_dist_amount": "float64", "Trans_pincode_count": "int64", "Trans_pincode_amount": "float64"}),
+    "Top_Users": ("top/user/country/india/state", _top_users,
+                  {"District": "string", "Pincode": "string", "User_dist_count": "int64",
+                   "User_pincode_count": "int64"}),
+    "Top_Ins": ("top/insurance/country/india/state", _top_metric,
+                {"District": "string", "Pincode": "string", "Ins_dist_count": "int64",
+                 "Ins_dist_amount": "float64", "Ins_pincode_count": "int64", "Ins_pincode_amount": "float64"}),
+}
+
+# Column order of the CSV files, as written by the notebook
+CSV_COLUMNS = {
+    "Agg_Trans": ["State", "Year", "Quater", "Transaction_type", "Transaction_count", "Transaction_amount"],
+    "Agg_Users": ["State", "Year", "Quater", "Registered_users", "App_opens", "Device_Brand", "Brand_users",
+                  "Device_share"],
+    "Agg_Ins": ["State", "Year", "Quater", "Insurance_count", "Insurance_amount"],
+    "Map_Trans": ["State", "District", "Year", "Quater", "Transaction_count", "Transaction_amount"],
+    "Map_Users": ["State", "District", "Year", "Quater", "Registered_users", "App_opens"],
+    "Map_Ins": ["State", "District", "Year", "Quater", "Insurance_count", "Insurance_amount"],
+    "Top_Trans": ["State", "District", "Pincode", "Year", "Quater", "Trans_dist_count", "Trans_dist_amount",
+                  "Trans_pincode_count", "Trans_pincode_amount"],
+    "Top_Users": ["State", "District", "Pincode", "Year", "Quater", "User_dist_count", "User_pincode_count"],
+    "Top_Ins": ["State", "District", "Pincode", "Year", "Quater", "Ins_dist_count", "Ins_dist_amount",
+                "Ins_pincode_count", "Ins_pincode_amount"],
+}
+
+KEY_DTYPES = {"State": "string", "Year": "int16", "Quater": "int8"}
+KEYS = list(KEY_DTYPES)
+
+
+def quarter_files(pulse_dir, dataset):
+    """Lists a dataset's quarter files in (State, Year, Quater) order.
+
+    Returns:
+        A list of (path, state, year, quarter) tuples.
+    """
+    root = os.path.join(pulse_dir, DATASETS[dataset][0])
+    files = []
+    for state in sorted(os.listdir(root)):
+        for year in sorted(os.listdir(os.path.join(root, state)), key=int):
+            year_dir = os.path.join(root, state, year)
+            for name in os.listdir(year_dir):
+                quarter = int(os.path.splitext(name)[0])
+                files.append((os.path.join(year_dir, name), state, int(year), quarter))
+    files.sort(key=lambda f: (f[1], f[2], f[3]))
+    return files
+
+
+def parse_file(dataset, path, state, year, quarter):
+    """Parses one quarter file into rows of (State, Year, Quater, *values)."""
+    with open(path, "r", encoding="utf-8") as f:
+        D = json.load(f)
+    return [(state, year, quarter) + values for values in DATASETS[dataset][1](D)]
+
+
+def _parse_chunk(dataset, chunk):
+    rows = []
+    for path, state, year, quarter in chunk:
+        rows.extend(parse_file(dataset, path, state, year, quarter))
+    return rows
+
+
+def to_frame(dataset, rows):
+    """Builds a typed DataFrame, in CSV column order, from parsed rows."""
+    dtypes = dict(KEY_DTYPES, **DATASETS[dataset][2])
+    df = pd.DataFrame(rows, columns=["State", "Year", "Quater"] + list(DATASETS[dataset][2]))
+    return df.astype(dtypes)[CSV_COLUMNS[dataset]]
+
+
+class CsvSink:
+    """Appends typed batches to a CSV, replacing the file atomically on close."""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.header = True
+
+    def write(self, df):
+        df.to_csv(self.tmp_path, mode="w" if self.header else "a", header=self.header,
+                  index=False, encoding="utf-8")
+        self.header = False
+
+    def close(self, df_empty):
+        if self.header:
+            # No rows at all: still write the header
+            self.write(df_empty)
+        os.replace(self.tmp_path, self.path)
+
+
+def run_dataset(dataset, files, sink, executor=None, batch_rows=BATCH_ROWS):
+    """Parses `files` and streams the rows to `sink` in bounded batches.
+
+    Args:
+        dataset: a key of DATASETS.
+        files: (path, state, year, quarter) tuples, see `quarter_files`.
+        sink: an object with `write(df)` and `close(df_empty)`.
+        executor: a process pool; files are parsed in-process when None.
+        batch_rows: rows buffered before a batch is written.
+
+    Returns:
+        The number of rows written.
+    """
+    chunks = [files[i:i + CHUNK_FILES] for i in range(0, len(files), CHUNK_FILES)]
+    if executor is None:
+        results = (_parse_chunk(dataset, chunk) for chunk in chunks)
+    else:
+        results = executor.map(_parse_chunk, [dataset] * len(chunks), chunks)
+
+    total = 0
+    batch = []
+    for rows in results:
+        batch.extend(rows)
+        if len(batch) >= batch_rows:
+            sink.write(to_frame(dataset, batch))
+            total += len(batch)
+            batch = []
+    if batch:
+        sink.write(to_frame(dataset, batch))
+        total += len(batch)
+    sink.close(to_frame(dataset, []))
+    return total
+
+
+def load_manifest(out_dir=OUT_DIR):
+    """Reads the manifest of ingested files, {dataset: {relative path: entry}}."""
+    try:
+        with open(os.path.join(out_dir, MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(manifest, out_dir=OUT_DIR):
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def diff_files(pulse_dir, files, previous):
+    """Compares quarter files against their manifest entries.
+
+    Files whose size and mtime are unchanged are not re-hashed.
+
+    Returns:
+        (entries, changed, removed): the new manifest entries, the files
+        that are new or whose content changed, and the (State, Year,
+        Quater) partitions whose file disappeared.
+    """
+    entries, changed = {}, []
+    for f in files:
+        path, state, year, quarter = f
+        rel = os.path.relpath(path, pulse_dir)
+        st = os.stat(path)
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "partition": [state, year, quarter]}
+        old = previous.get(rel)
+        if old and old["size"] == entry["size"] and old["mtime_ns"] == entry["mtime_ns"]:
+            entry["sha256"] = old["sha256"]
+        else:
+            entry["sha256"] = file_sha256(path)
+            if not old or old["sha256"] != entry["sha256"]:
+                changed.append(f)
+        entries[rel] = entry
+    removed = [tuple(old["partition"]) for rel, old in previous.items() if rel not in entries]
+    return entries, changed, removed
+
+
+def upsert_partitions(csv_path, dataset, rows, partitions):
+    """Replaces the given (State, Year, Quater) partitions of a CSV file.
+
+    Args:
+        csv_path: the dataset's CSV file.
+        dataset: a key of DATASETS.
+        rows: freshly parsed rows for the partitions that still exist.
+        partitions: every (State, Year, Quater) being replaced or removed.
+
+    Returns:
+        The number of rows in the updated file.
+    """
+    old = pd.read_csv(csv_path, dtype={"State": "string"}, float_precision="round_trip")
+    stale = pd.MultiIndex.from_frame(old[KEYS]).isin(list(partitions))
+    df = pd.concat([old[~stale], to_frame(dataset, rows)], ignore_index=True)
+    df = df.sort_values(KEYS, kind="stable")[CSV_COLUMNS[dataset]]
+    sink = CsvSink(csv_path)
+    sink.write(df)
+    sink.close(df)
+    return len(df)
+
+
+def _report(report, dataset, files, rows, seconds, note=""):
+    if report:
+        seconds = max(seconds, 1e-9)
+        report(f"{dataset:<10} {files:>6} files {rows:>9} rows {seconds:>7.2f} s "
+               f"{files / seconds:>9.0f} files/s {rows / seconds:>10.0f} rows/s{note}")
+
+
+def run(pulse_dir=PULSE_DIR, out_dir=OUT_DIR, datasets=None, workers=None, incremental=False,
+        parquet=True, snapshot=True, report=print):
+    """Builds the CSV files of the given datasets (all nine by default).
+
+    Args:
+        pulse_dir: the pulse repo's data folder.
+        out_dir: output folder for the CSV files and the manifest.
+        datasets: names from DATASETS; all of them when None.
+        workers: parser processes, defaults to the CPU count.
+        incremental: only parse new or changed files and upsert their
+            partitions into the existing CSVs.
+        parquet: also write the typed, partitioned Parquet copy of each
+            dataset to `<out_dir>/parquet`; incremental runs only rewrite
+            the copies of datasets that changed.
+        snapshot: publish a snapshot of the CSV files to
+            `<out_dir>/snapshot` afterwards, if all nine exist.
+        report: called with one progress line per dataset, or None.
+
+    Returns:
+        A dict of {dataset: {"files", "rows", "seconds"}}, where "files" is
+        the number of files parsed.
+    """
+    manifest = load_manifest(out_dir)
+    stats = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for dataset in datasets or DATASETS:
+            start = time.perf_counter()
+            csv_path = os.path.join(out_dir, f"{dataset}.csv")
+            files = quarter_files(pulse_dir, dataset)
+            entries, changed, removed = diff_files(pulse_dir, files, manifest.get(dataset, {}))
+
+            if incremental and dataset in manifest and os.path.exists(csv_path):
+                note = f" ({len(changed)} changed, {len(removed)} removed)"
+                chunks = [changed[i:i + CHUNK_FILES] for i in range(0, len(changed), CHUNK_FILES)]
+                rows = [row for chunk in executor.map(_parse_chunk, [dataset] * len(chunks), chunks)
+                        for row in chunk]
+                partitions = {(state, year, quarter) for _, state, year, quarter in changed} | set(removed)
+                if partitions:
+                    upsert_partitions(csv_path, dataset, rows, partitions)
+                parsed, written = len(changed), len(rows)
+            else:
+                note = ""
+                written = run_dataset(dataset, files, CsvSink(csv_path), executor)
+                parsed = len(files)
+                partitions = None
+
+            if parquet:
+                # An incremental run that changed nothing keeps the Parquet
+                # copy, unless it is missing or was built from another CSV.
+                parquet_dir = os.path.join(out_dir, "parquet")
+                sha = file_sha256(csv_path)
+                if partitions != set() or not is_current(dataset, sha, parquet_dir):
+                    written_df = pd.read_csv(csv_path, float_precision="round_trip")
+                    write_dataset(dataset, written_df, sha, parquet_dir)
+
+            manifest[dataset] = entries
+            save_manifest(manifest, out_dir)
+            seconds = time.perf_counter() - start
+            stats[dataset] = {"files": parsed, "rows": written, "seconds": seconds}
+            _report(report, dataset, parsed, written, seconds, note)
+
+    if snapshot and all(os.path.exists(os.path.join(out_dir, csv)) for csv in TABLES.values()):
+        start = time.perf_counter()
+        version = write_snapshot(out_dir)
+        if report:
+            report(f"snapshot {version} published in {time.perf_counter() - start:.2f} s")
+    return stats
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build Data/*.csv from the pulse JSON tree.")
+    parser.add_argument("--pulse", default=PULSE_DIR, help="the pulse repo's data folder")
+    parser.add_argument("--out", default=OUT_DIR, help="output folder for the CSV files")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only parse new or changed files and upsert their partitions")
+    parser.add_argument("--no-parquet", action="store_true", help="only write the CSV files")
+    parser.add_argument("--no-snapshot", action="store_true", help="do not publish a snapshot")
+    parser.add_argument("datasets", nargs="*", help="datasets to build (default: all)")
+    args = parser.parse_args()
+    unknown = set(args.datasets) - set(DATASETS)
+    if unknown:
+        parser.error(f"unknown datasets: {', '.join(sorted(unknown))}")
+    run(args.pulse, args.out, args.datasets or None, args.workers, args.incremental, not args.no_parquet,
+        not args.no_snapshot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Plotly figures built once and drawn from the process-wide figure cache.
+
+Building a figure (and for a state map, attaching the GeoJSON to it) is
+most of the cost of drawing a chart. `chart(panel, filters, build)` calls
+`build()` only when the figure of (panel, filters, data version) is not in
+the figure cache, and draws the cached figure with `st.plotly_chart`:
+
+    chart("district", (state, year, qua, att, kind), lambda: barChart(df, ...))
+
+`st.plotly_chart` copies the figure it is given before serializing it, so
+one cached figure is drawn by every session without being changed.
+
+Every figure gets one of the shared TEMPLATES when it is built. They are
+set on the figure's layout rather than registered as plotly templates
+because the Streamlit theme is merged over `layout.template` in the
+browser. `figure_stats()` reports the build and draw times of each panel.
+"""
+import threading
+import time
+from collections import defaultdict
+
+import plotly.io as pio
+import streamlit as st
+
+from phonepe_pulse.db import resources
+from phonepe_pulse.tracing import span
+
+
+# template -> update_layout and update_traces arguments
+TEMPLATES = {
+    "chart": {
+        "layout": {"title_font_size": 24, "hoverlabel_font_size": 18},
+    },
+    "insight": {
+        "layout": {"title_font_color": "#1308C2", "title_font_size": 25,
+                   "xaxis_title_font_size": 20, "yaxis_title_font_size": 20},
+        "traces": {"textfont_size": 16},
+    },
+}
+_timings = defaultdict(lambda: {"builds": 0, "build_ms": 0.0, "draws": 0, "draw_ms": 0.0})
+_timings_lock = threading.Lock()
+
+
+def _record(panel, action, start):
+    ms = (time.perf_counter() - start) * 1000
+    with _timings_lock:
+        timing = _timings[panel]
+        timing[action + "s"] += 1
+        timing[action + "_ms"] += ms
+
+
+def cached_figure(panel, filters, build, template="chart"):
+    """A figure from the figure cache, built only when it is not cached.
+
+    Args:
+        panel: chart name, e.g. "transactions-map".
+        filters: hashable tuple of the selections the figure depends on.
+        build: called without arguments on a cache miss; returns a Plotly figure.
+        template: the TEMPLATES entry to style the figure with.
+
+    Returns:
+        The Plotly figure, shared with other sessions: draw it, don't change it.
+    """
+    with span("figure", panel=panel) as s:
+        version, _, _, cache = resources()
+        key = (panel, filters, version)
+        fig = cache.get(key)
+        s.set(cached=fig is not None)
+        if fig is None:
+            start = time.perf_counter()
+            with span("build"):
+                fig = build()
+                style = TEMPLATES[template]
+                fig.update_layout(**style["layout"])
+                if "traces" in style:
+                    fig.update_traces(**style["traces"])
+            # The cache is bounded by bytes; a figure costs what it sends
+            with span("to_json") as j:
+                size = len(pio.to_json(fig, validate=False))
+                j.set(bytes=size)
+            cache.put(key, fig, size)
+            _record(panel, "build", start)
+    return fig
+
+
+def plotly_chart(fig, panel=None):
+    """Draws a figure with st.plotly_chart(fig, use_container_width=True)."""
+    start = time.perf_counter()
+    with span("draw", panel=panel):
+        st.plotly_chart(fig, use_container_width=True)
+    if panel:
+        _record(panel, "draw", start)
+
+
+def chart(panel, filters, build, template="chart"):
+    """Draws a figure from the figure cache; see `cached_figure`."""
+    plotly_chart(cached_figure(panel, filters, build, template), panel)
+
+
+def figure_stats():
+    """Builds, draws and their total milliseconds per panel."""
+    with _timings_lock:
+        return {panel: dict(timing) for panel, timing in sorted(_timings.items())}
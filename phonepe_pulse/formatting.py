@@ -0,0 +1,279 @@
+"""Indian-style number formatting (lakh/crore digit grouping) for whole columns.
+
+    format_num(df["Registered_users"])                  # "12,34,56,789"
+    format_currency(df["Transaction_amount"])           # "₹1,23,456.79 Cr"
+    format_currency(avg, unit=None)                     # "₹976.31"
+    format_percent(df["YoY"])                           # "12.3%"
+
+All of them take a scalar, a list, a numpy array or a pandas Series and
+return the same kind of thing (a Series keeps its index). The digits are
+built with integer arithmetic on the whole array, so a 100k-row column is
+formatted without a Python-level loop or per-value string operations. Values are rounded half away from
+zero to `precision` decimals, and NaN becomes an empty string.
+
+Floats are rounded on their exact binary value, as `decimal.Decimal(x)`
+holds it: 4821.655 is stored as 4821.65499999999974534..., so it shows
+as 4821.65. `python -m phonepe_pulse.formatting` (run by CI) compares the
+formatters with a per-value `decimal` reference on random values and on
+the edge cases (half-way values, negatives, NaN, lakhs and crores).
+"""
+import sys
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pandas as pd
+
+from phonepe_pulse.tracing import traced
+
+
+# unit -> (divisor, suffix)
+UNITS = {
+    None: (1, ""),
+    "thousand": (10**3, " K"),
+    "lakh": (10**5, " L"),
+    "crore": (10**7, " Cr"),
+}
+
+_DIGITS = 19  # enough for any int64
+# Column of each digit in "dd,dd,dd,dd,dd,dd,dd,dd,ddd": pairs, then a group of three
+_DIGIT_COLS = np.array([i + min(i // 2, 8) for i in range(_DIGITS)])
+_POWERS = 10 ** np.arange(1, _DIGITS, dtype=np.int64)
+_SPLIT = 2.0**27 + 1  # splits a float64 into two 26-bit halves
+
+
+def _codes(text):
+    return np.array([ord(c) for c in text], dtype=np.uint32)
+
+
+def _write_digits(out, columns, magnitudes):
+    """Writes the last len(columns) decimal digits of `magnitudes` into `columns`."""
+    quotient = magnitudes
+    for column in columns[::-1]:
+        quotient, digit = np.divmod(quotient, 10)
+        out[:, column] = digit + ord("0")
+
+
+def _two_product(a, b):
+    """a * b as p + err: p the float64 product, err its exact rounding error (Dekker)."""
+    p = a * b
+    c = _SPLIT * a
+    a_hi = c - (c - a)
+    a_lo = a - a_hi
+    c = _SPLIT * b
+    b_hi = c - (c - b)
+    b_lo = b - b_hi
+    return p, ((a_hi * b_hi - p) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
+
+
+def _round_scaled(magnitudes, precision):
+    """magnitudes * 10**precision rounded half up, as int64; exact below 2**52.
+
+    The float product can land on a .5 the exact product does not reach
+    (4821.655 * 100 gives 482165.5) or cross it for large amounts, so its
+    rounding error decides the ties.
+    """
+    p, err = _two_product(magnitudes, float(10**precision))
+    rounded = np.floor(p + 0.5)
+    # Compared against the exact product p + err; both differences are exact
+    rounded -= (p - (rounded - 0.5)) + err < 0
+    rounded += (p - (rounded + 0.5)) + err >= 0
+    return rounded.astype(np.int64)
+
+
+def _format(values, precision, prefix="", suffix=""):
+    """Formats values as [-]prefix<grouped>[.decimals]suffix.
+
+    Every row is laid out right-aligned in one matrix of UCS-4 code points,
+    then shifted left past its leading zeros and viewed as a numpy unicode
+    array, so no per-value string operations are needed.
+    """
+    if np.ndim(values) == 0:
+        return _format([values], precision, prefix, suffix)[0]
+    index = values.index if isinstance(values, pd.Series) else None
+    array = np.asarray(values)
+    if np.issubdtype(array.dtype, np.integer):
+        # Exact for counts too large for a float64
+        missing = np.zeros(array.shape, dtype=bool)
+        negative = array < 0
+        scaled = np.abs(array.astype(np.int64)) * 10**precision
+    else:
+        array = array.astype(np.float64)
+        missing = np.isnan(array)
+        # Round half away from zero
+        scaled = _round_scaled(np.abs(np.where(missing, 0, array)), precision)
+        negative = (array < 0) & (scaled > 0)
+    integer = scaled // 10**precision
+    ndigits = np.searchsorted(_POWERS, integer, side="right") + 1
+
+    # Only as many digit columns as the longest value needs
+    most = int(ndigits.max(initial=1))
+    digit_cols = _DIGIT_COLS[_DIGITS - most:] - _DIGIT_COLS[_DIGITS - most]
+    lead = len(prefix) + 1  # room for the sign and prefix
+    grouped = int(digit_cols[-1]) + 1
+    fraction = precision + 1 if precision else 0
+    width = lead + grouped + fraction + len(suffix)
+
+    n = len(array)
+    out = np.zeros((n, width), dtype=np.uint32)
+    out[:, lead:lead + grouped] = ord(",")
+    _write_digits(out, lead + digit_cols, integer)
+    col = lead + grouped
+    if precision:
+        out[:, col] = ord(".")
+        _write_digits(out, np.arange(col + 1, col + fraction), scaled % 10**precision)
+        col += fraction
+    out[:, col:width] = _codes(suffix)
+
+    # Prefix and sign go just before the first significant digit
+    start = lead + digit_cols[most - ndigits] - len(prefix)
+    rows = np.arange(n)
+    for i, code in enumerate(_codes(prefix)):
+        out[rows, start + i] = code
+    start = start - negative
+    out[rows[negative], start[negative]] = ord("-")
+    start[missing] = width
+
+    # Shift rows left so each starts at its first character; rows with the
+    # same start share one slice copy
+    text = np.zeros((n, width), dtype=np.uint32)
+    order = np.argsort(start, kind="stable")
+    starts, bounds = np.unique(start[order], return_index=True)
+    for first, rows_from, rows_to in zip(starts, bounds, np.append(bounds[1:], n)):
+        group = order[rows_from:rows_to]
+        text[group, :width - first] = out[group, first:width]
+    text = text.view(f"<U{width}").ravel().astype(object)
+    if index is not None:
+        return pd.Series(text, index=index, name=values.name)
+    return text
+
+
+@traced()
+def format_num(values, precision=0):
+    """Formats numbers with Indian digit grouping, e.g. 12,34,56,789.
+
+    Args:
+        values: a number, list, numpy array or pandas Series.
+        precision: decimals to round to.
+
+    Returns:
+        A string for a scalar, otherwise strings of the same shape and type.
+    """
+    return _format(values, precision)
+
+
+@traced()
+def format_currency(values, unit="crore", precision=2):
+    """Formats rupee amounts, e.g. ₹1,23,456.79 Cr.
+
+    Args:
+        values: amounts in rupees; a number, list, numpy array or Series.
+        unit: one of UNITS; the amounts are divided by it and its suffix
+            appended. None formats plain rupees.
+        precision: decimals to round to, after dividing by the unit.
+
+    Returns:
+        A string for a scalar, otherwise strings of the same shape and type.
+    """
+    divisor, suffix = UNITS[unit]
+    if divisor != 1:
+        values = values / divisor if isinstance(values, (pd.Series, np.ndarray)) else np.divide(values, divisor)
+    return _format(values, precision, "₹", suffix)
+
+
+@traced()
+def format_percent(values, precision=1):
+    """Formats fractions as percentages, e.g. 0.1234 -> 12.3%.
+
+    Args:
+        values: fractions; a number, list, numpy array or Series.
+        precision: decimals to round the percentage to.
+
+    Returns:
+        A string for a scalar, otherwise strings of the same shape and type.
+    """
+    values = values * 100 if isinstance(values, (pd.Series, np.ndarray)) else np.multiply(values, 100)
+    return _format(values, precision, suffix="%")
+
+
+def _reference(value, precision, prefix="", suffix=""):
+    """One value formatted with `decimal`, digit by digit: the expected output."""
+    if value != value:
+        return ""
+    exact = Decimal(int(value)) if isinstance(value, (int, np.integer)) else Decimal(float(value))
+    digits = f"{abs(exact).quantize(Decimal(1).scaleb(-precision), rounding=ROUND_HALF_UP):f}"
+    integer, _, decimals = digits.partition(".")
+    head, tail = integer[:-3], integer[-3:]
+    groups = [head[max(i - 2, 0):i] for i in range(len(head), 0, -2)][::-1]
+    sign = "-" if exact < 0 and digits.strip("0.") else ""
+    return sign + prefix + ",".join(groups + [tail]) + ("." + decimals if decimals else "") + suffix
+
+
+# Values every formatter is checked on, besides the random ones
+EDGE_CASES = [
+    0, 0.0, -0.0, 0.5, 1.5, 2.5, -0.5, -2.5, 0.125, -0.125, 1.005, 0.285, 4821.655, -4821.655,
+    -0.004, -0.005, 0.0049999999999999999, 99.995, 999.5, 99999.995, 9999999.995, -9999999.995,
+    12345678.905, 10**7, 10**7 - 0.5, 123456789012.345, 7635745668072.949, 1e13 + 0.005, -1e13,
+    float("nan"), 2**53, -2**53 + 1, 10**18, -(10**18), 2**63 - 1,
+]
+
+
+def check(cases=20000, seed=0):
+    """Compares the formatters with `_reference`; returns the mismatches.
+
+    Integers are drawn up to 18 digits, floats from log-uniform magnitudes
+    up to 1e13 (crores of rupees at two decimals) with both signs, plus
+    values on a rounding boundary at every precision, and EDGE_CASES.
+    """
+    rng = np.random.default_rng(seed)
+    ints = rng.integers(0, 10 ** rng.integers(1, 19, cases), dtype=np.int64) * rng.choice([-1, 1], cases)
+    floats = 10 ** rng.uniform(-4, 13, cases) * rng.choice([-1, 1], cases)
+    # d.dd5 and friends: ties in decimal, just off them in binary
+    ties = (np.floor(floats * 1000) + 0.5) / 1000
+    edge_floats = np.array([value for value in EDGE_CASES if isinstance(value, float)])
+    edge_ints = np.array([value for value in EDGE_CASES if isinstance(value, int)], dtype=np.int64)
+    failures = []
+
+    def compare(name, got, values, precision, prefix="", suffix=""):
+        for value, text in zip(values.tolist(), got):
+            expected = _reference(value, precision, prefix, suffix)
+            if text != expected:
+                failures.append(f"{name}({value!r}): {text!r} != {expected!r}")
+
+    for values in (ints, edge_ints):
+        compare("format_num", format_num(values), values, 0)
+    for values in (floats, ties, edge_floats):
+        for precision in (0, 1, 2):
+            compare(f"format_num[{precision}]", format_num(values, precision), values, precision)
+        compare("format_currency[None]", format_currency(values, unit=None), values, 2, "₹")
+        for unit in ("lakh", "crore"):
+            divisor, suffix = UNITS[unit]
+            compare(f"format_currency[{unit}]", format_currency(values, unit=unit), values / divisor, 2,
+                    "₹", suffix)
+        fractions = values / 10**7
+        compare("format_percent", format_percent(fractions), fractions * 100, 1, suffix="%")
+    # Scalars and Series take the same path as arrays
+    for value in EDGE_CASES:
+        compare("format_num", [format_num(value)], np.array([value]), 0)
+    series = pd.Series(edge_floats, index=range(5, 5 + len(edge_floats)))
+    if not format_currency(series).index.equals(series.index):
+        failures.append("format_currency(Series): index not kept")
+    return failures
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check the formatters against a decimal reference.")
+    parser.add_argument("--cases", type=int, default=20000, help="random values per kind")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = check(args.cases, args.seed)
+    for failure in failures[:50]:
+        print(failure)
+    print(f"{len(failures)} mismatches")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""State boundaries for the choropleth maps, parsed once per process.
+
+`get_states(detail)` returns the India GeoJSON with a Plotly `id` on every
+feature and the {st_nm: state_code} map the app joins on. Both are
+`st.cache_resource`s, so reruns and sessions share one parsed copy.
+
+The full-resolution polygons are much finer than a zoom-3.6 map can show,
+and Plotly sends the whole GeoJSON to the browser with every figure, so
+the app uses a simplified variant. Simplification is topology-preserving:
+rings are cut into arcs at the points where neighbouring states meet,
+each arc is simplified once with Douglas-Peucker, and every state that
+shares the arc gets the same points, so borders never open gaps or
+overlap.
+
+    python -m phonepe_pulse.geo     # vertices and payload size per detail level
+"""
+import json
+import os
+
+import numpy as np
+import streamlit as st
+
+from phonepe_pulse.loader import DATA_DIR
+from phonepe_pulse.tracing import traced
+
+
+GEOJSON_PATH = os.path.join(DATA_DIR, "states_india.geojson")
+
+# detail level -> Douglas-Peucker tolerance in degrees (0.01 deg is ~1 km;
+# a zoom-3.6 map shows roughly 0.04 deg per pixel)
+DETAIL = {
+    "full": 0,
+    "fine": 0.002,
+    "medium": 0.01,
+    "coarse": 0.05,
+}
+MAP_DETAIL = "medium"
+
+
+@traced()
+def read_geojson(path=GEOJSON_PATH):
+    """Parses the GeoJSON and sets each feature's id to its state_code."""
+    with open(path, encoding="utf-8") as f:
+        geojson = json.load(f)
+    for feature in geojson["features"]:
+        feature["id"] = feature["properties"]["state_code"]
+    return geojson
+
+
+def state_ids(geojson):
+    """Maps each st_nm to the feature id used as the Plotly location."""
+    return {feature["properties"]["st_nm"]: feature["id"] for feature in geojson["features"]}
+
+
+def _polygons(geometry):
+    """The polygons of a Polygon or MultiPolygon, as lists of rings."""
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    return geometry["coordinates"]
+
+
+def _douglas_peucker(points, tolerance):
+    """Indexes of the points kept by Douglas-Peucker; the ends are always kept."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        segment = points[first + 1:last]
+        start, end = points[first], points[last]
+        dx, dy = end - start
+        length = np.hypot(dx, dy)
+        if length == 0:
+            dist = np.hypot(*(segment - start).T)
+        else:
+            dist = np.abs(dx * (segment[:, 1] - start[1]) - dy * (segment[:, 0] - start[0])) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            i += first + 1
+            keep[i] = True
+            stack.append((first, i))
+            stack.append((i, last))
+    return np.flatnonzero(keep)
+
+
+def _junctions(rings):
+    """Vertices where a ring's neighbours change, i.e. where arcs start and end.
+
+    A vertex shared by several rings is a junction when one of its
+    neighbouring vertices is not shared by exactly the same rings.
+    """
+    owners = {}
+    for r, ring in enumerate(rings):
+        for point in ring[:-1]:
+            owners.setdefault(point, set()).add(r)
+    junctions = set()
+    for ring in rings:
+        ring = ring[:-1]
+        for i, point in enumerate(ring):
+            shared = owners[point]
+            if len(shared) > 1 and (owners[ring[i - 1]] != shared
+                                    or owners[ring[(i + 1) % len(ring)]] != shared):
+                junctions.add(point)
+    return junctions
+
+
+@traced()
+def simplify(geojson, tolerance, precision=5):
+    """Returns a topology-preserving simplified copy of a FeatureCollection.
+
+    Args:
+        geojson: a FeatureCollection of Polygon/MultiPolygon features.
+        tolerance: Douglas-Peucker tolerance in coordinate units; 0 only
+            rounds the coordinates.
+        precision: decimals kept in the output coordinates.
+
+    Returns:
+        A new FeatureCollection with the same properties and ids.
+    """
+    rings = [tuple(map(tuple, ring))
+             for feature in geojson["features"]
+             for polygon in _polygons(feature["geometry"])
+             for ring in polygon]
+    junctions = _junctions(rings)
+    arcs = {}
+
+    def simplify_arc(arc):
+        # Shared arcs run in opposite directions in neighbouring rings;
+        # simplify one orientation and reverse it for the other
+        key = min(arc, arc[::-1])
+        if key not in arcs:
+            points = np.array(key)
+            kept = points[_douglas_peucker(points, tolerance)] if tolerance else points
+            arcs[key] = [[round(x, precision), round(y, precision)] for x, y in kept]
+        return arcs[key] if key == arc else arcs[key][::-1]
+
+    def simplify_ring(ring):
+        ring = ring[:-1]
+        cuts = [i for i, point in enumerate(ring) if point in junctions]
+        if not cuts:
+            # An island: cut it at two fixed points so it keeps some area
+            cuts = [0, len(ring) // 2]
+        ring = ring[cuts[0]:] + ring[:cuts[0]]
+        cuts = [i - cuts[0] for i in cuts] + [len(ring)]
+        closed = ring + (ring[0],)
+        out = []
+        for start, end in zip(cuts, cuts[1:]):
+            out.extend(simplify_arc(closed[start:end + 1])[:-1])
+        out.append(out[0])
+        return out if len(out) >= 4 else [[round(x, precision), round(y, precision)] for x, y in closed]
+
+    features = []
+    for feature in geojson["features"]:
+        polygons = [[simplify_ring(tuple(map(tuple, ring))) for ring in polygon]
+                    for polygon in _polygons(feature["geometry"])]
+        if feature["geometry"]["type"] == "Polygon":
+            geometry = {"type": "Polygon", "coordinates": polygons[0]}
+        else:
+            geometry = {"type": "MultiPolygon", "coordinates": polygons}
+        features.append({"type": "Feature", "id": feature.get("id"),
+                         "properties": feature["properties"], "geometry": geometry})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def vertex_count(geojson):
+    return sum(len(ring) for feature in geojson["features"]
+               for polygon in _polygons(feature["geometry"]) for ring in polygon)
+
+
+@st.cache_resource
+def load_geojson(path=GEOJSON_PATH):
+    """The full-resolution GeoJSON, parsed once per process."""
+    return read_geojson(path)
+
+
+@st.cache_resource
+def get_states(detail=MAP_DETAIL, path=GEOJSON_PATH):
+    """The GeoJSON at a detail level and its {st_nm: id} map.
+
+    Args:
+        detail: a key of DETAIL.
+        path: the GeoJSON file.
+
+    Returns:
+        (GeoJSON FeatureCollection, {st_nm: state_code}); shared, do not modify.
+    """
+    geojson = load_geojson(path)
+    if DETAIL[detail]:
+        geojson = simplify(geojson, DETAIL[detail])
+    return geojson, state_ids(geojson)
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Vertex counts and payload size per detail level.")
+    parser.add_argument("--geojson", default=GEOJSON_PATH)
+    args = parser.parse_args()
+
+    geojson = read_geojson(args.geojson)
+    print(f"{'detail':<8}{'tolerance':>10}{'vertices':>10}{'KB':>10}{'build ms':>10}")
+    for detail, tolerance in DETAIL.items():
+        start = time.perf_counter()
+        simplified = simplify(geojson, tolerance) if tolerance else geojson
+        ms = (time.perf_counter() - start) * 1000
+        size = len(json.dumps(simplified, separators=(",", ":"))) / 1024
+        print(f"{detail:<8}{tolerance:>10}{vertex_count(simplified):>10}{size:>10.0f}{ms:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""The Insights questions, answered once at load time.
+
+Every question on the Insights page is a fixed aggregate over data that
+only changes when the database is rebuilt. INSIGHTS declares each one: its
+SQL with `?` placeholders and the parameters it is asked with, the display
+names of its columns, how they are formatted and the bar chart drawn from
+them; rankings of a single metric come from `phonepe_pulse.topn`. The
+loader runs the SQL after the rollup and dimension tables exist and
+stores each answer, ranked, in a small summary table, so selecting a
+question reads a few dozen rows:
+
+    SELECT * FROM Insight_Categories ORDER BY Rank
+
+Adding a question is adding an entry; nothing else needs to change.
+"""
+from collections import namedtuple
+
+import pandas as pd
+
+from phonepe_pulse.topn import top_n_query
+
+
+# question: selectbox label; sql, params: the aggregate, rows in display
+# order; columns: display names of its columns; formats: {column: "num",
+# "currency" or "text"}; chart: plotly.express.bar arguments (or None for a table)
+Insight = namedtuple("Insight", "question sql params columns formats chart")
+
+# The most recent quarter of a table, e.g. LATEST.format(table="Map_Users");
+# registration counts are running totals, so they are read as of one quarter
+LATEST = "(SELECT MAX(Year * 4 + Quater) FROM {table})"
+
+# summary table -> Insight
+INSIGHTS = {
+    "Insight_Categories": Insight(
+        "1. Top 10 spending categories by total transaction amount?",
+        """SELECT Transaction_type, SUM(Transaction_amount) AS Transaction_amount
+           FROM Trans_Type_Quarter
+           GROUP BY Transaction_type
+           ORDER BY Transaction_amount DESC LIMIT ?""",
+        (10,),
+        ["Category", "Transaction Amount"],
+        {"Transaction Amount": "currency"},
+        {"x": "Category", "y": "Transaction Amount", "color": "Transaction Amount",
+         "title": "Top 10 spending categories by total transaction amount"},
+    ),
+    "Insight_Users_Quarter": Insight(
+        "2. How many PhonePe users were registered in a quater year?",
+        """SELECT Year, Quater, Registered_users FROM Users_Quarter
+           ORDER BY Year, Quater""",
+        (),
+        ["Year", "Quater", "Registered Users"],
+        {"Year": "text", "Registered Users": "num"},
+        {"x": "Year", "y": "Registered Users", "color": "Quater", "title": "PhonePe Users"},
+    ),
+    "Insight_Brands": Insight(
+        "3. Top 10 mobile brands based on PhonePe registrations?",
+        f"""SELECT Device_Brand, SUM(Brand_users) AS Brand_users FROM Agg_Users
+            WHERE Year * 4 + Quater = {LATEST.format(table="Agg_Users")}
+            GROUP BY Device_Brand
+            ORDER BY Brand_users DESC LIMIT ?""",
+        (10,),
+        ["Device Brand", "Registered Users"],
+        {"Registered Users": "num"},
+        {"x": "Device Brand", "y": "Registered Users", "color": "Registered Users",
+         "title": "Top 10 Most Mobile Brands"},
+    ),
+    "Insight_Top_Districts": Insight(
+        "4. Top 10 registered users with respect to District?",
+        *top_n_query("registered_users", "district", n=10),
+        ["State", "District", "Users"],
+        {"Users": "num"},
+        {"x": "District", "y": "Users", "color": "State",
+         "title": "Top 10 Registered-users based on District"},
+    ),
+    "Insight_Least_Districts": Insight(
+        "5. Least registered users with respect to District?",
+        *top_n_query("registered_users", "district", n=10, bottom=True),
+        ["State", "District", "Users"],
+        {"Users": "num"},
+        {"x": "District", "y": "Users", "color": "State",
+         "title": "Least Registered-users based on District"},
+    ),
+    "Insight_Merchant_States": Insight(
+        "6. Leading states in merchant transactions of year 2023?",
+        """SELECT s.State_name, SUM(a.Transaction_amount) AS Transaction_amount FROM Agg_Trans a
+           JOIN States s ON s.State = a.State
+           WHERE a.Transaction_type = ? AND a.Year = ?
+           GROUP BY s.State_name
+           ORDER BY Transaction_amount DESC""",
+        ("Merchant payments", 2023),
+        ["State", "Transaction Amount"],
+        {"Transaction Amount": "currency"},
+        None,
+    ),
+    "Insight_State_Districts": Insight(
+        "7. Reveal spending pattern across Tamil Nadu?",
+        """WITH top AS (
+               SELECT District, SUM(Transaction_amount) AS Total FROM Map_Trans
+               WHERE State = ?
+               GROUP BY District
+               ORDER BY Total DESC LIMIT ?)
+           SELECT d.District_name, CAST(m.Year AS TEXT) AS Year,
+                  SUM(m.Transaction_amount) AS Transaction_amount
+           FROM Map_Trans m
+           JOIN top t ON t.District = m.District
+           JOIN Districts d ON d.State = m.State AND d.District = m.District
+           WHERE m.State = ?
+           GROUP BY d.District_name, m.Year
+           ORDER BY MAX(t.Total) DESC, m.Year""",
+        ("tamil-nadu", 10, "tamil-nadu"),
+        ["District", "Year", "Transaction Amount"],
+        {"Transaction Amount": "currency"},
+        {"x": "District", "y": "Transaction Amount", "color": "Year",
+         "title": "Spending Pattern Across Tamil Nadu"},
+    ),
+    "Insight_Leading_States": Insight(
+        "8. Which state processes the highest total transaction value each year?",
+        """SELECT s.State_name, ranked.Year, ranked.Transaction_amount FROM (
+               SELECT State, Year, SUM(Transaction_amount) AS Transaction_amount,
+                      ROW_NUMBER() OVER (PARTITION BY Year ORDER BY SUM(Transaction_amount) DESC) AS n
+               FROM Trans_State_Quarter
+               GROUP BY State, Year) AS ranked
+           JOIN States s ON s.State = ranked.State
+           WHERE ranked.n = 1
+           ORDER BY ranked.Year DESC""",
+        (),
+        ["State", "Year", "Transaction Value"],
+        {"Year": "text", "Transaction Value": "currency"},
+        {"x": "Year", "y": "Transaction Value", "color": "State",
+         "title": "States with Highest Transactions"},
+    ),
+    "Insight_Trans_Pincodes": Insight(
+        "9. Top 10 transaction amount based on postal codes in year 2023?",
+        *top_n_query("transaction_amount", "pincode", years=(2023, 2023), n=10),
+        ["State", "Pincode", "Transaction Amount"],
+        {"Pincode": "text", "Transaction Amount": "currency"},
+        None,
+    ),
+    "Insight_User_Pincodes": Insight(
+        "10. Top 10 postal codes with highest registered users in the year 2023?",
+        *top_n_query("registered_users", "pincode", years=(2023, 2023), n=10),
+        ["State", "Pincode", "User Count"],
+        {"Pincode": "text", "User Count": "num"},
+        None,
+    ),
+}
+
+
+def insight_frame(execute, insight):
+    """Computes an insight's answer.
+
+    Args:
+        execute: runs (sql, params) and returns (column names, rows), like
+            the engines' `execute`.
+        insight: an Insight.
+
+    Returns:
+        A DataFrame of the rows, indexed by a 1-based "Rank".
+    """
+    names, rows = execute(insight.sql, insight.params)
+    df = pd.DataFrame(rows, columns=names)
+    df.index = pd.RangeIndex(1, len(df) + 1, name="Rank")
+    return df
+
+
+def create_insights(connection):
+    """Creates and fills the summary table of every insight (SQLite)."""
+    def execute(sql, params):
+        cur = connection.execute(sql, params)
+        return [d[0] for d in cur.description], cur.fetchall()
+
+    for table, insight in INSIGHTS.items():
+        insight_frame(execute, insight).to_sql(table, connection, index=True)
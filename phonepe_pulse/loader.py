@@ -0,0 +1,353 @@
+"""One-time, versioned load of the Pulse CSV files into SQLite.
+
+The Streamlit script re-executes on every widget change, so the CSV -> SQL
+copy must not live at module level. `ensure_database` fingerprints the CSV
+files and only rebuilds `PhonePe_pulse.db` when they changed. The rebuild
+is written to a temporary file and swapped in with `os.replace`, so readers
+never see a half-written table.
+
+Run `python -m phonepe_pulse.loader` to (re)build the database by hand.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from phonepe_pulse.dimensions import DIMENSIONS, create_dimensions
+from phonepe_pulse.insights import INSIGHTS, create_insights
+from phonepe_pulse.rollups import refresh_rollups
+from phonepe_pulse.schema import create_indexes, create_tables
+
+
+DB_PATH = "PhonePe_pulse.db"
+DATA_DIR = "Data"
+
+# SQL table name -> CSV file name
+TABLES = {
+    "Agg_Trans": "Agg_Trans.csv",
+    "Agg_Users": "Agg_Users.csv",
+    "Map_Trans": "Map_Trans.csv",
+    "Map_Users": "Map_Users.csv",
+    "Top_Trans": "Top_Trans.csv",
+    "Top_Users": "Top_Users.csv",
+    "Agg_Ins": "Agg_Ins.csv",
+    "Map_Ins": "Map_Ins.csv",
+    "Top_Ins": "Top_Ins.csv",
+}
+
+META_TABLE = "_pulse_meta"
+
+# Bumped whenever the derived schema changes (rollups, indexes, insights, ...), so
+# databases built by an older loader are rebuilt even if the CSVs are not.
+SCHEMA_VERSION = 7
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Returns the hex sha256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stat(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def fingerprint(data_dir=DATA_DIR, previous=None):
+    """Fingerprints the CSV files by size, mtime and content hash.
+
+    Files whose size and mtime match `previous` reuse the stored hash, so a
+    warm check only costs one `stat` per file.
+
+    Args:
+        data_dir: folder holding the CSV files.
+        previous: the file fingerprints stored by the last load, if any.
+
+    Returns:
+        A dict of {file name: {"size", "mtime_ns", "sha256"}}.
+    """
+    previous = previous or {}
+    files = {}
+    for name in sorted(TABLES.values()):
+        path = os.path.join(data_dir, name)
+        info = _stat(path)
+        old = previous.get(name)
+        if old and old["size"] == info["size"] and old["mtime_ns"] == info["mtime_ns"]:
+            info["sha256"] = old["sha256"]
+        else:
+            info["sha256"] = file_sha256(path)
+        files[name] = info
+    return files
+
+
+def data_version(files):
+    """Derives a short version string from the content hashes and schema."""
+    digest = hashlib.sha256(str(SCHEMA_VERSION).encode())
+    for name in sorted(files):
+        digest.update(name.encode())
+        digest.update(files[name]["sha256"].encode())
+    return digest.hexdigest()[:16]
+
+
+def read_meta(db_path=DB_PATH):
+    """Reads the load metadata from the database.
+
+    Returns:
+        A dict with "version", "files" and, from loaders that record them,
+        "schema" and "partitions"; None if the database is missing or was
+        not built by this loader.
+    """
+    if not os.path.exists(db_path):
+        return None
+    try:
+        connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            rows = connection.execute(f"SELECT key, value FROM {META_TABLE}").fetchall()
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return None
+    meta = dict(rows)
+    if "version" not in meta or "files" not in meta:
+        return None
+    result = {"version": meta["version"], "files": json.loads(meta["files"])}
+    if "partitions" in meta:
+        result["schema"] = int(meta["schema"])
+        result["partitions"] = json.loads(meta["partitions"])
+    return result
+
+
+def read_source(table, data_dir=DATA_DIR, csv_sha256=None, dtype=None):
+    """Reads a table's rows, from its Parquet copy when that is current.
+
+    The Parquet copy keeps the column dtypes; the CSV is the fallback when
+    pyarrow is missing or the copy was built from an older CSV, and is
+    read with `dtype` ({column: dtype}, columns it lacks are ignored).
+    """
+    try:
+        from phonepe_pulse import storage
+    except ImportError:
+        storage = None
+    parquet_dir = os.path.join(data_dir, "parquet")
+    if storage is not None and storage.is_current(table, csv_sha256, parquet_dir):
+        return storage.read_dataset(table, parquet_dir=parquet_dir)
+    path = os.path.join(data_dir, TABLES[table])
+    if dtype:
+        columns = pd.read_csv(path, nrows=0).columns
+        dtype = {column: kind for column, kind in dtype.items() if column in columns}
+    # round_trip parses each float to the value that was written, so
+    # rewriting a CSV does not change the rows it kept (or their hashes)
+    return pd.read_csv(path, dtype=dtype, float_precision="round_trip")
+
+
+def partition_hashes(df):
+    """{"Year-Quater": hash of the partition's rows, whatever their order}."""
+    rows = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return {f"{year}-{quarter}": hashlib.sha256(np.sort(rows[index]).tobytes()).hexdigest()[:16]
+            for (year, quarter), index in df.groupby(["Year", "Quater"]).indices.items()}
+
+
+def _write_meta(connection, version, files, partitions):
+    connection.execute(f"CREATE TABLE IF NOT EXISTS {META_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+    connection.executemany(
+        f"INSERT OR REPLACE INTO {META_TABLE} VALUES (?, ?)",
+        [("version", version), ("files", json.dumps(files)), ("schema", str(SCHEMA_VERSION)),
+         ("partitions", json.dumps(partitions))],
+    )
+
+
+def current_umask():
+    """The process umask (os.umask can only be read by setting it)."""
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def build_database(db_path=DB_PATH, data_dir=DATA_DIR, files=None):
+    """Loads every CSV into a fresh database file and swaps it in atomically.
+
+    Args:
+        db_path: target SQLite file.
+        data_dir: folder holding the CSV files.
+        files: precomputed fingerprints, computed here if omitted.
+
+    Returns:
+        The data version of the new database.
+    """
+    files = files or fingerprint(data_dir)
+    version = data_version(files)
+
+    target_dir = os.path.dirname(os.path.abspath(db_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".pulse-", suffix=".db", dir=target_dir)
+    os.close(fd)
+    try:
+        connection = sqlite3.connect(tmp_path)
+        try:
+            create_tables(connection)
+            partitions = {}
+            for table, csv in TABLES.items():
+                df = read_source(table, data_dir, files[csv]["sha256"])
+                df.to_sql(table, connection, if_exists="append", index=False)
+                partitions[table] = partition_hashes(df)
+            create_indexes(connection)
+            refresh_rollups(connection)
+            create_dimensions(connection)
+            create_insights(connection)
+            _write_meta(connection, version, files, partitions)
+            connection.commit()
+            # WAL lets any number of readers run while the loader writes
+            connection.execute("PRAGMA journal_mode = WAL")
+        finally:
+            connection.close()
+        # mkstemp files are private; app processes may run as another user
+        os.chmod(tmp_path, 0o644 & ~current_umask())
+        os.replace(tmp_path, db_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return version
+
+
+def can_update(meta):
+    """Whether a database with this metadata can be updated in place."""
+    return bool(meta) and meta.get("schema") == SCHEMA_VERSION
+
+
+def update_database(db_path=DB_PATH, data_dir=DATA_DIR, files=None, meta=None):
+    """Replaces the changed partitions in a copy of the database and swaps it in.
+
+    Only tables whose CSV changed are read. Their (Year, Quater) partitions
+    are compared by hash with those recorded in `meta`; changed, new and
+    removed partitions are deleted and re-inserted, the rollups of those
+    quarters are recomputed and the small dimension and Insights tables
+    rebuilt.
+
+    Args:
+        db_path: SQLite file, built by this loader (see `can_update`).
+        data_dir: folder holding the CSV files.
+        files: precomputed fingerprints, computed here if omitted.
+        meta: the database's `read_meta`, read here if omitted.
+
+    Returns:
+        The data version of the updated database.
+    """
+    meta = meta or read_meta(db_path)
+    files = files or fingerprint(data_dir, meta["files"])
+    version = data_version(files)
+    partitions = dict(meta["partitions"])
+
+    target_dir = os.path.dirname(os.path.abspath(db_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".pulse-", suffix=".db", dir=target_dir)
+    os.close(fd)
+    try:
+        source = connect_readonly(db_path)
+        connection = sqlite3.connect(tmp_path)
+        try:
+            source.backup(connection)
+            connection.execute("PRAGMA journal_mode = DELETE")
+            quarters = set()
+            for table, csv in TABLES.items():
+                if files[csv]["sha256"] == meta["files"][csv]["sha256"]:
+                    continue
+                df = read_source(table, data_dir, files[csv]["sha256"])
+                old, new = partitions[table], partition_hashes(df)
+                changed = {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+                keys = sorted(tuple(map(int, key.split("-"))) for key in changed)
+                connection.executemany(f"DELETE FROM {table} WHERE Year = ? AND Quater = ?", keys)
+                quarters.update(keys)
+                rows = df[(df["Year"].astype("int64") * 10 + df["Quater"]).isin([y * 10 + q for y, q in keys])]
+                rows.to_sql(table, connection, if_exists="append", index=False)
+                partitions[table] = new
+            refresh_rollups(connection, sorted(quarters))
+            # Dimensions and Insights span every quarter; they are small
+            for table in [*DIMENSIONS, *INSIGHTS]:
+                connection.execute(f"DROP TABLE IF EXISTS {table}")
+            create_dimensions(connection)
+            create_insights(connection)
+            _write_meta(connection, version, files, partitions)
+            connection.commit()
+            connection.execute("PRAGMA journal_mode = WAL")
+        finally:
+            source.close()
+            connection.close()
+        os.chmod(tmp_path, 0o644 & ~current_umask())
+        os.replace(tmp_path, db_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return version
+
+
+def _write_files_meta(db_path, files):
+    connection = sqlite3.connect(db_path)
+    try:
+        with connection:
+            connection.execute(f"UPDATE {META_TABLE} SET value = ? WHERE key = 'files'",
+                               (json.dumps(files),))
+    finally:
+        connection.close()
+
+
+def ensure_database(db_path=DB_PATH, data_dir=DATA_DIR):
+    """Builds the database only if the CSV files changed since the last load.
+
+    A database built by this loader's schema is updated in place (see
+    `update_database`); any other is rebuilt.
+
+    Returns:
+        The current data version.
+    """
+    meta = read_meta(db_path)
+    files = fingerprint(data_dir, previous=meta["files"] if meta else None)
+    version = data_version(files)
+    if meta and meta["version"] == version:
+        if files != meta["files"]:
+            # Touched but unchanged: remember the new mtimes to skip re-hashing
+            _write_files_meta(db_path, files)
+        return version
+    if can_update(meta):
+        return update_database(db_path, data_dir, files, meta)
+    return build_database(db_path, data_dir, files)
+
+
+def connect_readonly(db_path=DB_PATH, **kwargs):
+    """Opens a read-only connection to the Pulse database."""
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, **kwargs)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load the Pulse CSV files into SQLite.")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database file")
+    parser.add_argument("--data", default=DATA_DIR, help="folder holding the CSV files")
+    parser.add_argument("--force", action="store_true", help="rebuild even if up to date")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.force:
+        version = build_database(args.db, args.data)
+        action = "built"
+    else:
+        before = read_meta(args.db)
+        version = ensure_database(args.db, args.data)
+        if before and before["version"] == version:
+            action = "up to date"
+        else:
+            action = "updated" if can_update(before) else "built"
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{args.db}: {action}, version {version} ({elapsed:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
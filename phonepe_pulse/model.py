@@ -0,0 +1,89 @@
+"""Compact in-memory copy of the nine Pulse tables.
+
+The "memory" engine (see `phonepe_pulse.engines`) answers the dashboard's
+SQL with DuckDB over these frames instead of a database file. The engine
+is shared by every session of a process (`phonepe_pulse.db.get_engine`),
+so the tables are held once per process, and only read through SQL.
+
+`compact` keeps them small:
+
+- State, District, Transaction_type, Device_Brand and Pincode are
+  dictionary-encoded as categoricals: each row holds an int8 or int16 code
+  into one copy of the distinct values.
+- Year and Quater are int16 and int8.
+- Integer counts get the narrowest integer type that holds their values.
+- Amounts and shares stay float64. In float32 a quarter's payment value
+  (~2.7e13 rupees) would be rounded to a multiple of about 2 million.
+
+    python -m phonepe_pulse.model    # bytes per table, compact and as read from CSV
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from phonepe_pulse.loader import DATA_DIR, TABLES, file_sha256, read_source
+
+
+KEYS = ["State", "District", "Transaction_type", "Device_Brand", "Pincode"]
+# Read straight into the compact types; Pincode is read as an integer so
+# its categories, and query results, stay numbers
+CSV_DTYPES = {"State": "category", "District": "category", "Transaction_type": "category",
+              "Device_Brand": "category", "Year": "int16", "Quater": "int8"}
+
+
+def compact(df):
+    """`df` with dictionary-encoded keys and the narrowest numeric dtypes."""
+    columns = {}
+    for name, values in df.items():
+        if name in KEYS:
+            values = values.astype("category")
+            if pd.api.types.is_extension_array_dtype(values.cat.categories):
+                # Nullable Int32 Pincode (from Parquet): DuckDB reads NumPy
+                # int64 categories as BIGINT, but cannot scan extension ones
+                values = values.cat.rename_categories(np.asarray(values.cat.categories, dtype="int64"))
+        elif name == "Year":
+            values = values.astype("int16")
+        elif name == "Quater":
+            values = values.astype("int8")
+        elif pd.api.types.is_integer_dtype(values):
+            values = pd.to_numeric(values, downcast="integer")
+        columns[name] = values
+    return pd.DataFrame(columns)
+
+
+def read_table(table, data_dir=DATA_DIR):
+    """One table, compacted; from its Parquet copy when that is current."""
+    path = os.path.join(data_dir, TABLES[table])
+    return compact(read_source(table, data_dir, file_sha256(path), dtype=CSV_DTYPES))
+
+
+def load_model(data_dir=DATA_DIR):
+    """Every table, compacted: {table: DataFrame}."""
+    return {table: read_table(table, data_dir) for table in TABLES}
+
+
+def memory_usage(model):
+    """Bytes held by each table of a model, its strings included."""
+    return {table: int(df.memory_usage(index=True, deep=True).sum()) for table, df in model.items()}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare the compact tables with the CSV reads.")
+    parser.add_argument("--data", default=DATA_DIR, help="folder holding the CSV files")
+    args = parser.parse_args()
+
+    model = load_model(args.data)
+    full = memory_usage({table: pd.read_csv(os.path.join(args.data, csv)) for table, csv in TABLES.items()})
+    small = memory_usage(model)
+    print(f"{'table':<12}{'rows':>10}{'CSV MB':>9}{'compact MB':>12}")
+    for table in TABLES:
+        print(f"{table:<12}{len(model[table]):>10}{full[table] / 2**20:>9.2f}{small[table] / 2**20:>12.2f}")
+    print(f"{'total':<12}{sum(map(len, model.values())):>10}{sum(full.values()) / 2**20:>9.2f}"
+          f"{sum(small.values()) / 2**20:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
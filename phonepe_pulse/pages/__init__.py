@@ -0,0 +1,22 @@
+"""Dashboard pages, one module per option_menu entry.
+
+Streamlit re-executes git_PhonePe_pulse.py on every interaction, but a
+page module is imported only the first time its page is shown and then
+stays in sys.modules, so a rerun only calls that page's `render()`.
+Heavy imports such as plotly.express live in the page modules and are
+never loaded for pages that do not draw charts.
+"""
+import importlib
+
+
+# option_menu label -> module defining render()
+PAGES = {
+    "Explore Data": "phonepe_pulse.pages.explore",
+    "Insights": "phonepe_pulse.pages.insights",
+    "Data APIs": "phonepe_pulse.pages.data_apis",
+}
+
+
+def render(page):
+    """Imports the page's module on first use and draws the page."""
+    importlib.import_module(PAGES[page]).render()
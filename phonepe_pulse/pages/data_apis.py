@@ -0,0 +1,79 @@
+"""Data APIs page: a guide to the Pulse data and its HTTP API."""
+import streamlit as st
+
+
+def render():
+    """Draws the Data APIs page."""
+
+    with st.container(border= True):
+        st.markdown("""
+                    <div style="background-color:#673ab7; border:2px solid #ccc; border-radius:15px; padding:2px 10px; width:200px; height: 80px">
+                    <h2 style="color:#ffffff;font-weight:bold;">DATA APIs</h2>
+                    </div>
+                    """, unsafe_allow_html=True)
+        st.header("Introduction")
+        st.write("""
+                 Founded in 2015, **PhonePe** has been a key player in this digital transformation. By leveraging open APIs (Application Programming Interfaces), 
+                 PhonePe has streamlined access to payment services for millions of users. APIs allowed PhonePe to integrate seamlessly with banks and 
+                 other financial institutions, offering a wider range of services and simplifying the user experience.""")              
+        st.write("""
+                 This interactive webpage empowers you to delve into the fascinating world of PhonePe transactions across India. 
+                 Visualize data trends and gain insights into how PhonePe is transforming the financial landscape at various geographical levels - 
+                 from broad state-wise patterns to granular details within postal codes.
+                 """)
+        
+    with st.container(border= True):
+        st.header("Guide")
+        st.write("""
+                This data has been structured to provide details on data cuts of Transactions, Users and Insurance on the Explore tab. 
+                 Along with fun facts, showcasing it's reach, impact and interesting trends. 
+                """)
+        # Aggregated
+        col1, col2, col3 = st.columns([4,3,3])
+        # Column 1: Aggregated
+        with col1:
+            with st.container(border= True):
+                st.subheader("Aggregated")
+                st.write("Aggregated values of various payment categories as shown under Categories section")
+                st.image("Data/pic1.png", use_column_width=False, width=300)
+        # Column 2: Map
+        with col2:
+            with st.container(border= True):
+                st.subheader("Map")
+                st.write("Total values at the State and District levels")
+                st.image("Data/pic3.png", use_column_width=False, width=300)
+        # Column 3: Top
+        with col3:
+            with st.container(border= True):
+                st.subheader("Top")
+                st.write("Totals of top States / Districts / Postal Codes")
+                st.image("Data/pic2.png", use_column_width=False, width=300)
+
+    with st.container(border= True):
+        st.header("HTTP API")
+        st.write("""
+                 The numbers on the Explore Data and Insights pages are also served as JSON, without the dashboard.
+                 Start the API with `python -m phonepe_pulse.api` and read it from a notebook or a reporting job:
+                 """)
+        st.code('''import pandas as pd
+import requests
+
+url = "http://localhost:8600/api/v1/transactions/districts"
+rows = requests.get(url, params={"state": "tamil-nadu", "year": 2023, "quarter": 4}).json()["data"]
+df = pd.DataFrame(rows)''', language="python")
+        st.write("""
+                 Endpoints: `/api/v1/{section}/totals`, `/api/v1/transactions/categories`, `/api/v1/{section}/states`,
+                 `/api/v1/{section}/top/{states|districts|pincodes}`, `/api/v1/{section}/districts`, `/api/v1/rankings`,
+                 `/api/v1/insights` and `/api/v1/insights/{id}`, where section is transactions, users or insurance.
+                 """)
+
+    with st.container(border= True):
+        st.header("GitHub")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("""
+                    A home for the data that powers the PhonePe Pulse website.
+                    """)
+        with col2:
+            url = "https://github.com/PhonePe/pulse#readme"
+            st.link_button(label="Open", url= url)
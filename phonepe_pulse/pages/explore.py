@@ -0,0 +1,758 @@
+"""Explore Data page: All India panels, state maps and the district explorer.
+
+Each panel shows one section: Transactions, Users or Insurance (from
+2020 Q2). A section's tables are only queried once it is selected.
+
+The district explorer, the trend panel and each Top 10 tab are `st.fragment`s. Changing one
+of the district explorer's selectboxes reruns only that fragment, so the
+maps, summaries and tables above it are not queried or drawn again.
+
+Queries live in the `*_data` functions and figures are built by the
+`*Chart`/`*Map` functions; neither draws. Each of them, and each fragment,
+is a span of the rerun's trace (`phonepe_pulse.tracing`). Figures are
+drawn from cached JSON specs (`phonepe_pulse.figures`). After a quarter is shown the page
+prefetches the data and figures of its neighbouring quarters
+(`phonepe_pulse.prefetch`), so stepping through quarters and years reads
+from the caches.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from phonepe_pulse.db import prefetch, run_query
+from phonepe_pulse.figures import cached_figure, chart, plotly_chart
+from phonepe_pulse.formatting import format_currency, format_num, format_percent
+from phonepe_pulse.geo import get_states
+from phonepe_pulse.prefetch import neighbours
+from phonepe_pulse.queries import DISTRICT_TABLES, district_query, top_query
+from phonepe_pulse.tracing import span, traced
+from phonepe_pulse.trends import (TREND_SQL, Trend, by_state, qoq, quarter_labels, rolling_mean, summary,
+                                  trend_matrix, yoy)
+
+
+# First quarter with Insurance data
+INSURANCE_START = (2020, 2)
+
+
+@traced()
+def lineChart(df, x, y, title):
+    """Plotly line chart
+
+    Args: 
+        df: A pandas DataFrame.
+        x: x-axis column name.
+        y: y-axis column name.
+        title: chart title.
+    Returns:
+        Plotly figure.
+    """
+    return px.line(df, x= x, y=y, width=850, height=525, title=title)
+
+
+@traced()
+def barChart(df, x, y, title):
+    """Plotly bar chart
+    
+    Args: 
+        df: A pandas DataFrame.
+        x: x-axis column name.
+        y: y-axis column name.
+        title: chart title.
+    Returns:
+        Plotly figure.
+    """
+    return px.bar(df, x= x, y=y, width=850, height=525, title=title)
+
+
+@traced()
+def transactionsMap(df10, year, qua, india_states):
+    """Choropleth of the transaction amount per state, from transactions_data."""
+    fig = px.choropleth_mapbox(
+        df10,
+        locations = 'id',
+        geojson = india_states,
+        hover_name = "State",
+        hover_data = {'All PhonePe transactions':True, 'Total payment value':True, 'id':False, 'Avg. payment value':True, "mapTransactions":False},
+        title = f"PhonePe Amount Transactions in Q{qua}-{year}",
+        mapbox_style = "carto-positron",
+        center = {"lat":24, "lon":78},
+        color = "mapTransactions",
+        color_continuous_scale = 'Viridis',
+        zoom = 3.6,
+        width = 800, 
+        height = 800
+    )
+    fig.update_layout(coloraxis_colorbar=dict(title='Transaction Amount', showticklabels=True))
+    fig.update_geos(fitbounds="locations", visible=False)
+    return fig
+
+
+@traced()
+def usersMap(df11, year, qua, india_states):
+    """Choropleth of the app opens per state, from users_data."""
+    fig = px.choropleth_mapbox(
+        df11,
+        locations = 'id',
+        geojson = india_states,
+        hover_name = "State",
+        hover_data = {'Registered Users':True, 'App Opens':True, 'id':False},
+        title = f"PhonePe Users in Q{qua}-{year}",
+        mapbox_style = "carto-positron",
+        center = {"lat":24, "lon":78},
+        color = "App Opens",
+        color_continuous_scale = px.colors.diverging.PuOr,
+        zoom = 3.6,
+        width = 800, 
+        height = 800
+    )
+    fig.update_layout(coloraxis_colorbar=dict(title='App Opens', showticklabels=True))
+    fig.update_geos(fitbounds = "locations", visible = False,)
+    return fig
+
+
+@traced()
+def insuranceMap(df13, year, qua, india_states):
+    """Choropleth of the insurance premium per state, from insurance_data."""
+    fig = px.choropleth_mapbox(
+        df13,
+        locations = 'id',
+        geojson = india_states,
+        hover_name = "State",
+        hover_data = {'Insurance Policies':True, 'Total premium value':True, 'id':False, 'Avg. premium value':True, "mapInsurance":False},
+        title = f"PhonePe Insurance in Q{qua}-{year}",
+        mapbox_style = "carto-positron",
+        center = {"lat":24, "lon":78},
+        color = "mapInsurance",
+        color_continuous_scale = 'Tealgrn',
+        zoom = 3.6,
+        width = 800, 
+        height = 800
+    )
+    fig.update_layout(coloraxis_colorbar=dict(title='Premium Amount', showticklabels=True))
+    fig.update_geos(fitbounds="locations", visible=False)
+    return fig
+
+
+@traced()
+def transactions_data(year, qua):
+    """All India totals, categories and state map rows of one quarter's transactions."""
+    columns = ["All PhonePe transactions", "Total payment value"]
+    df1 = run_query("""SELECT Transaction_count, Transaction_amount FROM Trans_Quarter
+                WHERE Year = ? AND Quater = ?
+                """, (year, qua), columns=columns)
+    df1["Avg. payment value"] = format_currency(df1.loc[0,"Total payment value"]/df1.loc[0,"All PhonePe transactions"], unit=None)
+    df1["All PhonePe transactions"] = format_num(df1["All PhonePe transactions"])
+    df1["Total payment value"] = format_currency(df1["Total payment value"])
+
+    # Categories
+    columns = ["Transaction_type", "Transaction_count"]
+    df2 = run_query("""SELECT Transaction_type, Transaction_count FROM Trans_Type_Quarter
+                WHERE Year = ? AND Quater = ?
+                ORDER BY Transaction_type
+                """, (year, qua), columns=columns)
+    df2["Transaction_count"] = format_num(df2["Transaction_count"])
+
+    # Map
+    columns = ["State", "id", "All PhonePe transactions", "Total payment value"]
+    df10 = run_query("""SELECT s.State_name, s.State_code, r.Transaction_count, r.Transaction_amount
+                FROM Trans_State_Quarter r JOIN States s ON s.State = r.State
+                WHERE r.Year = ? AND r.Quater = ?
+                ORDER BY s.State_name
+                """, (year, qua), columns=columns)
+    df10.index += 1
+    df10["Avg. payment value"] = format_currency(df10["Total payment value"]/df10["All PhonePe transactions"], unit=None)
+    df10["All PhonePe transactions"] = format_num(df10["All PhonePe transactions"])
+    df10["mapTransactions"] = df10["Total payment value"]
+    df10["Total payment value"] = format_currency(df10["Total payment value"])
+    return df1, df2, df10
+
+
+@traced()
+def users_data(year, qua):
+    """All India totals and state map rows of one quarter's users."""
+    columns = ["Registered_users", "App_opens"]
+    df6 = run_query("""SELECT Registered_users, App_opens FROM Users_Quarter
+                WHERE Year = ? AND Quater = ?
+                """, (year, qua), columns=columns)
+
+    # Map
+    columns = ["State", "id", "Registered Users", "App Opens"]
+    df11 = run_query("""SELECT s.State_name, s.State_code, r.Registered_users, r.App_opens
+                FROM Users_State_Quarter r JOIN States s ON s.State = r.State
+                WHERE r.Year = ? AND r.Quater = ?
+                ORDER BY s.State_name
+                """, (year, qua), columns=columns)
+    df11.index += 1
+    return df6, df11
+
+
+@traced()
+def insurance_data(year, qua):
+    """All India totals and state map rows of one quarter's insurance; empty before 2020 Q2."""
+    columns = ["Insurance Policies", "Total premium value"]
+    df7 = run_query("""SELECT Insurance_count, Insurance_amount FROM Ins_Quarter
+                WHERE Year = ? AND Quater = ?
+                """, (year, qua), columns=columns)
+    if df7.size != 0:
+        df7["Avg. premium value"] = format_currency(df7.loc[0,"Total premium value"]/df7.loc[0,"Insurance Policies"], unit=None)
+        df7["Insurance Policies"] = format_num(df7["Insurance Policies"])
+        df7["Total premium value"] = format_currency(df7["Total premium value"])
+
+    # Map
+    columns = ["State", "id", "Insurance Policies", "Total premium value"]
+    df13 = run_query("""SELECT s.State_name, s.State_code, r.Insurance_count, r.Insurance_amount
+                FROM Ins_State_Quarter r JOIN States s ON s.State = r.State
+                WHERE r.Year = ? AND r.Quater = ?
+                ORDER BY s.State_name
+                """, (year, qua), columns=columns)
+    df13.index += 1
+    df13["Avg. premium value"] = format_currency(df13["Total premium value"]/df13["Insurance Policies"], unit=None)
+    df13["Insurance Policies"] = format_num(df13["Insurance Policies"])
+    df13["mapInsurance"] = df13["Total premium value"]
+    df13["Total premium value"] = format_currency(df13["Total premium value"])
+    return df7, df13
+
+
+# Explore section -> (Top 10 value column, its formatter)
+TOP_VALUES = {
+    "Transactions": ("Transactions", format_currency),
+    "Users": ("Users", format_num),
+    "Insurance": ("Premium", format_currency),
+}
+
+
+def _top_data(section, level, key, year, qua):
+    """A Top 10 tab's rows, numbered from 1 and formatted."""
+    value, formatter = TOP_VALUES[section]
+    df = run_query(*top_query(section.lower(), level, year, qua), columns=[key, value])
+    df[value] = formatter(df[value])
+    df.index += 1
+    return df
+
+
+@traced()
+def top_states_data(section, year, qua):
+    """Top 10 States of a section in one quarter."""
+    return _top_data(section, "states", "State", year, qua)
+
+
+@traced()
+def top_districts_data(section, year, qua):
+    """Top 10 Districts of a section in one quarter."""
+    return _top_data(section, "districts", "District", year, qua)
+
+
+@traced()
+def top_postal_codes_data(section, year, qua):
+    """Top 10 Postal Codes of a section in one quarter."""
+    df = _top_data(section, "pincodes", "Postal Code", year, qua)
+    df["Postal Code"] = df["Postal Code"].astype(str)
+    return df
+
+
+def all_india_data(section, year, qua, india_states):
+    """Everything the All India panels of a section query, and the map, for prefetching."""
+    if section == "Transactions":
+        _, _, df10 = transactions_data(year, qua)
+        cached_figure("transactions-map", (year, qua), lambda: transactionsMap(df10, year, qua, india_states))
+    elif section == "Insurance":
+        _, df13 = insurance_data(year, qua)
+        if df13.empty:
+            return
+        cached_figure("insurance-map", (year, qua), lambda: insuranceMap(df13, year, qua, india_states))
+    else:
+        _, df11 = users_data(year, qua)
+        cached_figure("users-map", (year, qua), lambda: usersMap(df11, year, qua, india_states))
+    top_states_data(section, year, qua)
+    top_districts_data(section, year, qua)
+    top_postal_codes_data(section, year, qua)
+
+
+@traced()
+def district_data(section, state, year, qua):
+    """District rows of a state's section in one quarter."""
+    _, first, second = DISTRICT_TABLES[section.lower()]
+    df12 = run_query(*district_query(section.lower(), state, year, qua),
+                     columns=["Slug", "District", first, second]).drop(columns="Slug")
+    if section == "Transactions":
+        df12["Transaction Count"] = format_num(df12["Transaction_count"])
+        df12["mapTransactions"] = df12["Transaction_amount"]
+        df12["Transaction Amount"] = format_currency(df12["Transaction_amount"])
+    elif section == "Insurance":
+        df12["Insurance Count"] = format_num(df12["Insurance_count"])
+        df12["Insurance Amount"] = format_currency(df12["Insurance_amount"])
+    else:
+        df12["Registered Users"] = format_num(df12["Registered_users"])
+        df12["App Opens"] = format_num(df12["App_opens"])
+    df12.index += 1
+    return df12
+
+
+@traced()
+def district_figure(section, state, state_name, year, qua, att, chart):
+    """The district explorer's figure, built from district_data on a cache miss."""
+    def build():
+        df12 = district_data(section, state, year, qua)
+        title = f"{state_name}: {att} Analysis (Q{qua} {year})"
+        if chart == "line":
+            return lineChart(df12, 'District', att, title)
+        return barChart(df12, 'District', att, title)
+    return cached_figure("district", (section, state, year, qua, att, chart), build)
+
+
+# Trend panel: section -> attribute -> rollup column, measure -> matrix transform
+ATTRIBUTES = {
+    "Transactions": {"Transaction Count": "Transaction_count", "Transaction Amount": "Transaction_amount"},
+    "Users": {"Registered Users": "Registered_users", "App Opens": "App_opens"},
+    "Insurance": {"Insurance Count": "Insurance_count", "Insurance Amount": "Insurance_amount"},
+}
+MEASURES = {"Value": lambda values: values, "4-quarter average": rolling_mean,
+            "QoQ growth": qoq, "YoY growth": yoy}
+TREND_LINES = 10
+
+
+@traced()
+def trend_data(section, att, state=None):
+    """Quarterly trend of every state, or of every district of one state.
+
+    Returns:
+        (Trend, display names of its rows)
+    """
+    districts = trend_matrix(run_query(TREND_SQL[section]), ["State", "District"], ATTRIBUTES[section][att])
+    if state is None:
+        trend = by_state(districts)
+        names = run_query("SELECT State, State_name FROM States")
+        return trend, trend.keys["State"].map(dict(names.itertuples(index=False))).tolist()
+    rows = (districts.keys["State"] == state).to_numpy()
+    trend = Trend(districts.keys[rows].reset_index(drop=True), districts.quarters, districts.values[rows])
+    names = run_query("SELECT District, District_name FROM Districts WHERE State = ?", (state,))
+    return trend, trend.keys["District"].map(dict(names.itertuples(index=False))).tolist()
+
+
+@traced()
+def trendChart(trend, names, measure, title):
+    """Plotly line chart of the TREND_LINES rows with the largest latest value."""
+    top = np.argsort(-np.nan_to_num(trend.values[:, -1], nan=-np.inf), kind="stable")[:TREND_LINES]
+    df = pd.DataFrame(MEASURES[measure](trend.values[top]).T, index=quarter_labels(trend.quarters),
+                      columns=[names[i] for i in top])
+    fig = px.line(df, width=850, height=525, title=title,
+                  labels={"index": "Quarter", "value": measure, "variable": ""})
+    if measure.endswith("growth"):
+        fig.update_yaxes(tickformat=".0%")
+    return fig
+
+
+@st.fragment
+@traced(root=True)
+def trend_explorer():
+    """Quarterly trends, growth and CAGR of the states or of one state's districts.
+
+    A fragment: changing any of its selectboxes reruns only this function.
+    """
+    st.header("Trends")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        section = st.selectbox("Section", list(ATTRIBUTES), label_visibility="collapsed", key="sec-trend")
+    with col2:
+        att = st.selectbox("Attribute", list(ATTRIBUTES[section]), label_visibility="collapsed", key=f"att-trend-{section}")
+    with col3:
+        states = run_query("SELECT State, State_name FROM States ORDER BY State_name")
+        state_slugs = {"All States": None, **dict(zip(states["State_name"], states["State"]))}
+        state_name = st.selectbox("States", list(state_slugs), label_visibility="collapsed", key="state-trend")
+        state = state_slugs[state_name]
+    with col4:
+        measure = st.selectbox("Measure", list(MEASURES), label_visibility="collapsed", key="measure-trend")
+
+    trend, names = trend_data(section, att, state)
+    title = f"{state_name}: {att}, {measure}"
+    chart("trend", (section, att, state, measure), lambda: trendChart(trend, names, measure, title))
+
+    df = summary(trend)
+    df.insert(0, "Name", names)
+    df = df.sort_values("Latest", ascending=False, kind="stable").reset_index(drop=True)
+    df.index += 1
+    latest = quarter_labels(trend.quarters[-1:])[0]
+    shown = pd.DataFrame({"District" if state else "State": df["Name"]})
+    shown[latest] = (format_currency if att.endswith("Amount") else format_num)(df["Latest"])
+    for column in ["QoQ", "YoY", "CAGR"]:
+        shown[column] = format_percent(df[column])
+    st.dataframe(shown, use_container_width=True)
+
+
+@st.fragment
+@traced(root=True)
+def top_states(section, year, qua):
+    """Top 10 States tab for a section and quarter."""
+    st.header("Top 10 States")
+    st.dataframe(top_states_data(section, int(year), int(qua)), width= 500)
+
+
+@st.fragment
+@traced(root=True)
+def top_districts(section, year, qua):
+    """Top 10 Districts tab for a section and quarter."""
+    st.header("Top 10 Districts")
+    st.dataframe(top_districts_data(section, int(year), int(qua)), width= 500)
+
+
+@st.fragment
+@traced(root=True)
+def top_postal_codes(section, year, qua):
+    """Top 10 Postal Codes tab for a section and quarter."""
+    st.header("Top 10 Postal Codes")
+    st.dataframe(top_postal_codes_data(section, int(year), int(qua)), width= 500)
+
+
+@st.fragment
+@traced(root=True)
+def district_explorer():
+    """District charts for one state, section, attribute and quarter.
+
+    A fragment: changing any of its six selectboxes reruns only this
+    function, not the maps and tables above it.
+    """
+    st.header("Districts")
+
+    col1, col2, col3, col4, col5, col6 = st.columns(6)
+    with col1:
+        # Column 1: Select State
+        states = run_query("SELECT State, State_name FROM States ORDER BY State_name")
+        state_slugs = dict(zip(states["State_name"], states["State"]))
+        States = list(state_slugs)
+        default_sec = States.index("Tamil Nadu")
+        State = st.selectbox(
+            "Select a State...",
+            options = States,
+            index = default_sec,
+            label_visibility = "collapsed",
+            key = "state-dist"
+        )
+        map_sn = State
+        State = state_slugs[State]
+
+    with col2:
+        # Column 2: Select Section
+        sections = ["Transactions", "Users", "Insurance"]
+        default_sec = sections.index("Transactions")
+        section = st.selectbox(
+            "Select a payment section...",
+            options = sections,
+            index = default_sec,
+            label_visibility = "collapsed",
+            key = "sec-dist"
+        )
+
+    with col3:
+        # Column 3: Select Section-info
+        if section == "Transactions":
+            attrs = ["Transaction Count", "Transaction Amount"]
+            default_TA = attrs.index("Transaction Count")
+            att = st.selectbox(
+                "Select an attribute...",
+                options = attrs,
+                index = default_TA,
+                label_visibility = "collapsed",
+                key = "T_att-dist"
+            )
+        elif section == "Users":
+            attrs = ["Registered Users", "App Opens"]
+            default_UA = attrs.index("Registered Users")
+            att = st.selectbox(
+                "Select an attribute...",
+                options = attrs,
+                index = default_UA,
+                label_visibility = "collapsed",
+                key = "U_att-dist"
+            )
+        elif section == "Insurance":
+            attrs = ["Insurance Count", "Insurance Amount"]
+            default_IA = attrs.index("Insurance Count")
+            att = st.selectbox(
+                "Select an attribute...",
+                options = attrs,
+                index = default_IA,
+                label_visibility = "collapsed",
+                key = "I_att-dist"
+            )
+
+    with col4:
+        # Column 4: Select Year
+        years = ["2018", "2019", "2020", "2021", "2022", "2023"]
+        default_y = years.index("2023")
+        year = st.selectbox(
+            "Select an year...",
+            options = years,
+            index = default_y,
+            label_visibility = "collapsed",
+            key = "year-dist"
+        )
+
+    with col5:
+        # Column 5: Select Quater
+        quaters = ["Q1 (Jan-Mar)", "Q2 (Apr-Jun)", "Q3 (Jul-Sep)", "Q4 (Oct-Dec)"]
+        default_q = quaters.index("Q1 (Jan-Mar)")
+        quater = st.selectbox(
+            "Select a quater...",
+            options = quaters,
+            index = default_q,
+            label_visibility = "collapsed",
+            key = "qua-dist"
+        )
+
+        if quater == "Q1 (Jan-Mar)":
+            qua = "1"
+        elif quater == "Q2 (Apr-Jun)":
+            qua = "2"
+        elif quater == "Q3 (Jul-Sep)":
+            qua = "3"
+        elif quater == "Q4 (Oct-Dec)":
+            qua = "4"
+
+    with col6:
+        # Column 6: Select Chart
+        charts = ["line", "bar"]
+        default_c = charts.index("bar")
+        chart = st.selectbox(
+            "Select an chart...",
+            options = charts,
+            index = default_c,
+            label_visibility = "collapsed",
+            key = "chart-dist"
+        )
+
+
+    if section == "Insurance" and (int(year), int(qua)) < INSURANCE_START:
+        st.info(f"PhonePe Insurance data starts in Q{INSURANCE_START[1]} {INSURANCE_START[0]}; there is none for Q{qua} {year}.")
+        return
+    plotly_chart(district_figure(section, State, map_sn, int(year), int(qua), att, chart), "district")
+
+    for y, q in neighbours(int(year), int(qua)):
+        prefetch(district_figure, section, State, map_sn, y, q, att, chart)
+
+
+def render():
+    """Draws the Explore Data page."""
+    st.write("") # empty space
+    st.header("Explore Data")     
+    # A short story on the section
+    st.write("""Tapping fingers impatiently as the massive PhonePe Pulse dataset finished downloading.
+                **PhonePe Pulse**, a teasure trove of anonymized user transaction, insurance data has promised 
+                valuable insights into India's booming digital payments landscape. The first hurdle of 
+                data cleaning of endless spreadsheet led to a visualization in a **kaleidoscope of colors**.
+                """)
+
+    col1, col2 = st.columns((6,4))
+    with col1:
+        # Column 1: Title
+        st.header("All India")
+
+    with col2:
+        # Column 2: Data Exploration
+        sub1, sub2, sub3 = st.columns(3)
+
+        with sub1:
+            sections = ["Transactions", "Users", "Insurance"]
+            default_sec = sections.index("Transactions")
+            section = st.selectbox(
+                "Select a payment section...",
+                options = sections,
+                index = default_sec,
+                label_visibility = "collapsed"
+            )
+
+        with sub2:
+            years = ["2018", "2019", "2020", "2021", "2022", "2023"]
+            default_y = years.index("2023")
+            year = st.selectbox(
+                "Select an year...",
+                options = years,
+                index = default_y,
+                label_visibility = "collapsed"
+            )
+
+        with sub3:
+            quaters = ["Q1 (Jan-Mar)", "Q2 (Apr-Jun)", "Q3 (Jul-Sep)", "Q4 (Oct-Dec)"]
+            default_q = quaters.index("Q1 (Jan-Mar)")
+            quater = st.selectbox(
+                "Select a quater...",
+                options = quaters,
+                index = default_q,
+                label_visibility = "collapsed"
+            )
+
+            if quater == "Q1 (Jan-Mar)":
+                qua = "1"
+            elif quater == "Q2 (Apr-Jun)":
+                qua = "2"
+            elif quater == "Q3 (Jul-Sep)":
+                qua = "3"
+            elif quater == "Q4 (Oct-Dec)":
+                qua = "4"
+
+
+    with span("get_states"):
+        india_states, _ = get_states()
+    if section == "Transactions":
+        # Transactions
+        df1, df2, df10 = transactions_data(int(year), int(qua))
+        total_trans = str(df1.loc[0,"All PhonePe transactions"])
+        total_val =  str(df1.loc[0,"Total payment value"])
+        avg_trans = str(df1.loc[0,"Avg. payment value"])
+
+        col1, col2 = st.columns((6,4))
+        with col1:
+            # Column 1: Transaction Map
+            # map geojson and dataframe using the state_code id
+            chart("transactions-map", (int(year), int(qua)), lambda: transactionsMap(df10, int(year), int(qua), india_states))
+
+            with st.expander("Fun Facts"):
+                Ecol1, Ecol2 = st.columns(2)
+                with Ecol1:
+                    container1 = st.container(border=True)
+                    container1.write("""Maharashtra's PhonePe users with Xiaomi phones could create a human chain stretching 
+                                     for over 1,134 kilometers – that's almost the distance from Mumbai to Delhi!""")
+                    
+                with Ecol2:
+                    container2 = st.container(border=True)
+                    container2.write("""PhonePe transactions in Maharashtra during Q4 2023 (₹70,786.27 billion) helped save millions of trees!
+                                      Since most transactions are digital, there's less need for paper receipts
+                                     """)
+        with col2:
+            # Column 2: Insights of Transaction
+            st.header("Transactions")
+            st.write("All PhonePe transactions (UPI+Cards+Wallets)")
+            st.write(total_trans)
+            Tcol1, Tcol2 = st.columns(2)
+            with Tcol1:
+                st.write("Total payment value")
+                st.write(total_val)
+            with Tcol2:
+                st.write("Avg. transaction value")
+                st.write(avg_trans)
+            st.markdown("""
+                        <hr style="border: 1px solid #673ab7; margin-top: 10px; margin-bottom: 20px;">
+                        """, unsafe_allow_html=True
+                        )
+
+            st.header("Categories")
+            for i in range(len(df2["Transaction_count"])):
+                name, value = list(df2.iloc[i,0:2])
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write(name)
+                with col2:
+                    st.write(value)
+            st.markdown("""
+                        <hr style="border: 1px solid #673ab7; margin-top: 10px; margin-bottom: 20px;">
+                        """, unsafe_allow_html=True
+                        )
+
+            tab1, tab2, tab3 = st.tabs(["States", "Districts", "Postal Codes"])
+            with tab1:
+                top_states(section, year, qua)
+            with tab2:
+                top_districts(section, year, qua)
+            with tab3:
+                top_postal_codes(section, year, qua)
+
+
+    elif section == "Users":
+        # Users
+        df6, df11 = users_data(int(year), int(qua))
+        if df6.size != 0:
+            Registered_users = format_num(df6.iloc[0,0])
+            App_opens = format_num(df6.iloc[0,1])
+        else: 
+            Registered_users = 0
+            App_opens = 0
+
+        col1, col2 = st.columns((6,4))
+        with col1:
+            # Column 1: Map
+            # map geojson and dataframe using the state_code id
+            chart("users-map", (int(year), int(qua)), lambda: usersMap(df11, int(year), int(qua), india_states))
+            
+            with st.expander("Fun Facts"):
+                Ecol1, Ecol2 = st.columns(2)
+                with Ecol1:
+                    container1 = st.container(border=True)
+                    container1.write("""Maharashtra's PhonePe users with Xiaomi phones could create a human chain stretching 
+                                     for over 1,134 kilometers – that's almost the distance from Mumbai to Delhi!""")
+                    
+                with Ecol2:
+                    container2 = st.container(border=True)
+                    container2.write("""PhonePe transactions in Maharashtra during Q4 2023 (₹70,786.27 billion) helped save millions of trees!
+                                      Since most transactions are digital, there's less need for paper receipts
+                                     """)
+                    
+        with col2:
+            # Insights of User
+            st.header("Users")
+            st.write(f"Registered PhonePe users till Q{qua} {year}")
+            st.write(Registered_users)
+            st.write(f"PhonePe app opens in Q{qua} {year}")
+            st.write(App_opens)
+            st.markdown("""
+                        <hr style="border: 1px solid #673ab7; margin-top: 10px; margin-bottom: 20px;">
+                        """, unsafe_allow_html=True
+                        )
+
+            tab1, tab2, tab3 = st.tabs(["States", "Districts", "Postal Codes"])
+            with tab1:
+                top_states(section, year, qua)
+            with tab2:
+                top_districts(section, year, qua)
+            with tab3:
+                top_postal_codes(section, year, qua)
+
+    elif section == "Insurance":
+        # Insurance
+        df7, df13 = insurance_data(int(year), int(qua))
+        col1, col2 = st.columns((6,4))
+        if df7.size == 0:
+            with col1:
+                st.info(f"PhonePe Insurance data starts in Q{INSURANCE_START[1]} {INSURANCE_START[0]}; there is none for Q{qua} {year}.")
+        else:
+            with col1:
+                # Column 1: Map
+                chart("insurance-map", (int(year), int(qua)), lambda: insuranceMap(df13, int(year), int(qua), india_states))
+
+            with col2:
+                # Insights of Insurance
+                st.header("Insurance")
+                st.write("All India Insurance Policies Purchased (Nos.)")
+                st.write(str(df7.loc[0,"Insurance Policies"]))
+                Icol1, Icol2 = st.columns(2)
+                with Icol1:
+                    st.write("Total premium value")
+                    st.write(str(df7.loc[0,"Total premium value"]))
+                with Icol2:
+                    st.write("Average premium value")
+                    st.write(str(df7.loc[0,"Avg. premium value"]))
+                st.markdown("""
+                            <hr style="border: 1px solid #673ab7; margin-top: 10px; margin-bottom: 20px;">
+                            """, unsafe_allow_html=True
+                            )
+
+                tab1, tab2, tab3 = st.tabs(["States", "Districts", "Postal Codes"])
+                with tab1:
+                    top_states(section, year, qua)
+                with tab2:
+                    top_districts(section, year, qua)
+                with tab3:
+                    top_postal_codes(section, year, qua)
+
+    for y, q in neighbours(int(year), int(qua)):
+        prefetch(all_india_data, section, y, q, india_states=india_states)
+
+    # Districts
+    st.write("")
+    st.write("")
+    st.write("")
+    district_explorer()
+
+    # Trends
+    st.write("")
+    trend_explorer()
@@ -0,0 +1,128 @@
+"""Insights page: ten analytical questions over the Pulse tables.
+
+The answers are computed when the database is built (see
+`phonepe_pulse.insights`); selecting a question reads its summary table.
+Below them, a top-N fragment ranks states, districts or pincodes by any
+metric over any years (see `phonepe_pulse.topn`).
+"""
+import plotly.express as px
+import streamlit as st
+
+from phonepe_pulse.db import run_query
+from phonepe_pulse.figures import chart
+from phonepe_pulse.formatting import format_currency, format_num
+from phonepe_pulse.insights import INSIGHTS
+from phonepe_pulse.topn import METRICS, YEARS, top_n_columns, top_n_query
+from phonepe_pulse.tracing import traced
+
+
+# "text" keeps years and pincodes free of digit grouping
+FORMATS = {"num": format_num, "currency": format_currency, "text": lambda values: values.astype(str)}
+
+
+@traced()
+def insight_data(table):
+    """Reads an insight's answer with its display column names, indexed by rank."""
+    insight = INSIGHTS[table]
+    df = run_query(f"SELECT * FROM {table} ORDER BY Rank", columns=["Rank"] + insight.columns)
+    return df.set_index("Rank").rename_axis(None)
+
+
+@traced()
+def top_n_data(metric, level, years, quarter, state, n, bottom):
+    """A top_n_query result with display column names, ranked from 1."""
+    df = run_query(*top_n_query(metric, level, years, quarter, state, n, bottom),
+                   columns=top_n_columns(metric, level))
+    df.index += 1
+    return df
+
+
+@st.fragment
+@traced(root=True)
+def top_n_explorer():
+    """Ranks states, districts or pincodes by a metric.
+
+    A fragment: changing a control reruns only this function.
+    """
+    st.subheader("Top N")
+    col1, col2, col3, col4, col5, col6 = st.columns([2, 1, 2, 1, 2, 1])
+    with col1:
+        labels = {m.label: name for name, m in METRICS.items()}
+        metric = labels[st.selectbox("Metric", list(labels), key="metric-topn")]
+    with col2:
+        level = st.selectbox("Level", [l.title() for l in METRICS[metric].levels], key="level-topn").lower()
+    with col3:
+        years = st.select_slider("Years", options=list(range(YEARS[0], YEARS[1] + 1)),
+                                 value=YEARS, key="years-topn")
+    with col4:
+        quarter = st.selectbox("Quarter", ["All", 1, 2, 3, 4], key="quarter-topn")
+        quarter = None if quarter == "All" else quarter
+    with col5:
+        states = run_query("SELECT State, State_name FROM States ORDER BY State_name")
+        state_slugs = {"All India": None, **dict(zip(states["State_name"], states["State"]))}
+        state_name = st.selectbox("State", list(state_slugs), key="state-topn")
+        state = state_slugs[state_name]
+    with col6:
+        n = int(st.number_input("N", min_value=1, max_value=100, value=10, key="n-topn"))
+        bottom = st.toggle("Bottom", key="bottom-topn")
+
+    filters = (metric, level, tuple(years), quarter, state, n, bottom)
+    df = top_n_data(*filters)
+    key, value = df.columns[-2], df.columns[-1]
+    df[key] = df[key].astype(str)
+    shown = df.copy()
+    shown[value] = FORMATS["currency" if metric.endswith("_amount") else "num"](shown[value])
+    col1, col2 = st.columns(2)
+    with col1:
+        st.dataframe(shown)
+    with col2:
+        title = f"{'Bottom' if bottom else 'Top'} {n} {level}s by {value}, {state_name}"
+        chart("top-n", filters, lambda: px.bar(df, x=key, y=value, color="State", title=title), "insight")
+
+
+def render():
+    """Draws the Insights page."""
+    st.header("Insights")
+    st.write("""Our next mission is to unearth **hidden trends** and patterns that could revolutionize PhonePe mobile wallet strategy.""")
+
+    # Initial value for session state
+    if "selectbox_enabled" not in st.session_state:
+        st.session_state["selectbox_enabled"] = False
+
+    # Function to execute the chosen query
+    def execute_query(table: str):
+        """
+        Shows the answer to an insight as a table and, if it has one, a chart.
+
+        Args:
+            table (str): the insight's summary table, a key of INSIGHTS.
+        """
+        insight = INSIGHTS[table]
+        df = insight_data(table)
+        shown = df.copy()
+        for column, kind in insight.formats.items():
+            shown[column] = FORMATS[kind](shown[column])
+        if insight.chart is None:
+            st.dataframe(shown)
+            return
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.dataframe(shown)
+        with col2:
+            chart(table, (), lambda: px.bar(df, orientation= 'v', text_auto='.2s', **insight.chart), "insight")
+
+    questions = {insight.question: table for table, insight in INSIGHTS.items()}
+    selected_option = st.selectbox(
+        "Check out some fun facts about PhonePe here...",
+        list(questions),
+        index=None,
+        placeholder="Select your Question...")
+
+    st.write("Question: ", selected_option)
+
+    if selected_option:
+        st.session_state["selectbox_enabled"] = True
+        execute_query(questions[selected_option])
+
+    top_n_explorer()
@@ -0,0 +1,101 @@
+"""Background prefetching of neighbouring quarters into the query cache.
+
+Users step through consecutive quarters and years. After a panel is drawn
+for a (year, quarter) the page queues the same panel's data function for
+the `neighbours` of that quarter; a small, process-wide thread pool runs
+them so their `run_query` results (and figure specs, see
+`phonepe_pulse.figures`) are already cached when the user gets there.
+
+Prefetched entries count against a memory budget until they are first
+read. Once the unread bytes reach the budget new jobs are skipped, so a
+user who never steps through quarters cannot fill the cache with them.
+The pool size and budget are read from PULSE_PREFETCH_WORKERS and
+PULSE_PREFETCH_MB; PULSE_PREFETCH_MB=0 turns prefetching off.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+
+YEARS = range(2018, 2024)
+WORKERS = int(os.environ.get("PULSE_PREFETCH_WORKERS", 2))
+BUDGET_MB = float(os.environ.get("PULSE_PREFETCH_MB", 32))
+
+logger = logging.getLogger(__name__)
+
+
+def neighbours(year, quarter, years=YEARS):
+    """The previous and next quarter and the same quarter a year either side.
+
+    >>> neighbours(2023, 1)
+    [(2022, 4), (2023, 2), (2022, 1)]
+    """
+    index = year * 4 + quarter - 1
+    return [(i // 4, i % 4 + 1) for i in (index - 1, index + 1, index - 4, index + 4)
+            if i // 4 in years]
+
+
+class Prefetcher:
+    """Runs prefetch jobs on a thread pool within a memory budget."""
+
+    def __init__(self, caches, workers=WORKERS, budget_mb=BUDGET_MB):
+        self.caches = list(caches)
+        self.budget = budget_mb * 2**20
+        self.submitted = 0
+        self.skipped = 0
+        self.failed = 0
+        self._pending = set()
+        self._done = set()
+        self._lock = threading.Condition()
+        self._pool = ThreadPoolExecutor(max(workers, 1), thread_name_prefix="prefetch")
+
+    def submit(self, key, fn, *args):
+        """Queues fn(*args) unless `key` already ran or the budget is used up.
+
+        Returns:
+            True if the job was queued.
+        """
+        with self._lock:
+            if key in self._pending or key in self._done:
+                return False
+            if sum(cache.prefetched_bytes for cache in self.caches) >= self.budget:
+                self.skipped += 1
+                return False
+            self._pending.add(key)
+            self.submitted += 1
+        self._pool.submit(self._run, key, fn, args)
+        return True
+
+    def _run(self, key, fn, args):
+        try:
+            with ExitStack() as stack:
+                for cache in self.caches:
+                    stack.enter_context(cache.prefetching())
+                fn(*args)
+        except Exception:
+            logger.exception("prefetch of %s failed", key)
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+                if len(self._done) >= max(cache.maxsize for cache in self.caches):
+                    self._done.clear()
+                self._done.add(key)
+                self._lock.notify_all()
+
+    def wait(self, timeout=None):
+        """Blocks until no jobs are queued or running."""
+        with self._lock:
+            return self._lock.wait_for(lambda: not self._pending, timeout)
+
+    def stats(self):
+        """Returns the job counters as a dict."""
+        return {
+            "prefetch_submitted": self.submitted,
+            "prefetch_skipped": self.skipped,
+            "prefetch_failed": self.failed,
+            "prefetch_pending": len(self._pending),
+        }
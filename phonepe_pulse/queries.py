@@ -0,0 +1,79 @@
+"""SQL of the per-quarter lists shown on Explore Data and served by the API.
+
+Both the page (`phonepe_pulse.pages.explore`) and the HTTP API
+(`phonepe_pulse.api`) run these, so they read the same rows and share
+`run_query` cache entries for the same arguments:
+
+    sql, params = top_query("transactions", "districts", 2023, 4)
+    run_query(sql, params)  # District_name, Transaction_amount
+
+Sections are "transactions", "users" and "insurance", as in the API's
+URLs.
+"""
+
+# section -> (Top_* table, state/district column, pincode column, result name)
+TOP_TABLES = {
+    "transactions": ("Top_Trans", "Trans_dist_amount", "Trans_pincode_amount", "Transaction_amount"),
+    "users": ("Top_Users", "User_dist_count", "User_pincode_count", "Registered_users"),
+    "insurance": ("Top_Ins", "Ins_dist_amount", "Ins_pincode_amount", "Insurance_amount"),
+}
+TOP_LEVELS = ("states", "districts", "pincodes")
+
+# section -> (district rollup, its two measures)
+DISTRICT_TABLES = {
+    "transactions": ("Trans_District_Quarter", "Transaction_count", "Transaction_amount"),
+    "users": ("Users_District_Quarter", "Registered_users", "App_opens"),
+    "insurance": ("Ins_District_Quarter", "Insurance_count", "Insurance_amount"),
+}
+
+
+def top_query(section, level, year, quarter, n=10):
+    """SQL of a Top 10 States, Districts or Postal Codes tab.
+
+    Args:
+        section: a key of TOP_TABLES.
+        level: one of TOP_LEVELS.
+        year, quarter: the quarter ranked.
+        n: number of rows.
+
+    Returns:
+        (sql, params); the result columns are the state name, district
+        name or pincode and the section's measure, largest first.
+    """
+    table, column, pincode_column, name = TOP_TABLES[section]
+    if level == "states":
+        sql = f"""SELECT s.State_name, SUM(t.{column}) AS {name} FROM {table} t
+                JOIN States s ON s.State = t.State
+                WHERE t.Year = ? AND t.Quater = ?
+                GROUP BY s.State_name
+                ORDER BY {name} DESC LIMIT ?"""
+    elif level == "districts":
+        sql = f"""SELECT d.District_name, SUM(t.{column}) AS {name} FROM {table} t
+                JOIN Districts d ON d.State = t.State AND d.District = t.District
+                WHERE t.Year = ? AND t.Quater = ?
+                GROUP BY d.District_name
+                ORDER BY {name} DESC LIMIT ?"""
+    elif level == "pincodes":
+        sql = f"""SELECT Pincode, SUM({pincode_column}) AS {name} FROM {table}
+                WHERE Year = ? AND Quater = ?
+                GROUP BY Pincode, Year, Quater
+                ORDER BY {name} DESC LIMIT ?"""
+    else:
+        raise ValueError(f"unknown level {level!r}, expected one of {', '.join(TOP_LEVELS)}")
+    return sql, (year, quarter, n)
+
+
+def district_query(section, state, year, quarter):
+    """SQL of every district's totals of a state's section in one quarter.
+
+    Returns:
+        (sql, params); the result columns are the district slug, its
+        display name and the section's two measures, in slug order.
+    """
+    table, first, second = DISTRICT_TABLES[section]
+    sql = f"""SELECT r.District, d.District_name, r.{first}, r.{second}
+            FROM {table} r
+            JOIN Districts d ON d.State = r.State AND d.District = r.District
+            WHERE r.Year = ? AND r.Quater = ? AND r.State = ?
+            ORDER BY r.District"""
+    return sql, (year, quarter, state)
@@ -0,0 +1,203 @@
+"""Quarterly rollup tables for the All India headline panels.
+
+Each rollup is a small WITHOUT ROWID table keyed on (Year, Quater[, ...]),
+so the Transactions, Users and Insurance cards, the Categories block and
+the state maps become primary-key lookups instead of scans of the base tables. The
+state, district and pincode rollups also back the top-N queries of
+`phonepe_pulse.topn`, with an index per metric for ranked reads.
+
+Rollups are refreshed per quarter: `refresh_rollups(connection, [(2024, 1)])`
+only recomputes the partitions of a newly landed quarter. The loader's
+`update_database` passes the quarters whose base rows changed.
+"""
+
+
+# name -> (CREATE TABLE, SELECT that computes it; filtered per quarter)
+ROLLUPS = {
+    "Trans_Quarter": (
+        """CREATE TABLE IF NOT EXISTS Trans_Quarter (
+            Year INTEGER NOT NULL, Quater INTEGER NOT NULL,
+            Transaction_count INTEGER, Transaction_amount REAL,
+            PRIMARY KEY (Year, Quater)
+        ) WITHOUT ROWID""",
+        """SELECT Year, Quater, SUM(Transaction_count) AS Transaction_count,
+                  SUM(Transaction_amount) AS Transaction_amount
+           FROM Agg_Trans {where}
+           GROUP BY Year, Quater""",
+    ),
+    "Trans_Type_Quarter": (
+        """CREATE TABLE IF NOT EXISTS Trans_Type_Quarter (
+            Year INTEGER NOT NULL, Quater INTEGER NOT NULL, Transaction_type TEXT NOT NULL,
+            Transaction_count INTEGER, Transaction_amount REAL,
+            PRIMARY KEY (Year, Quater, Transaction_type)
+        ) WITHOUT ROWID""",
+        """SELECT Year, Quater, Transaction_type, SUM(Transaction_count) AS Transaction_count,
+                  SUM(Transaction_amount) AS Transaction_amount
+           FROM Agg_Trans {where}
+           GROUP BY Year, Quater, Transaction_type""",
+    ),
+    "Trans_State_Quarter": (
+        """CREATE TABLE IF NOT EXISTS Trans_State_Quarter (
+            Year INTEGER NOT NULL, Quater INTEGER NOT NULL, State TEXT NOT NULL,
+            Transaction_count INTEGER, Transaction_amount REAL,
+            PRIMARY KEY (Year, Quater, State)
+        ) WITHOUT ROWID""",
+        """SELECT Year, Quater, State, SUM(Transaction_count) AS Transaction_count,
+                  SUM(Transaction_amount) AS Transaction_amount
+           FROM Agg_Trans {where}
+           GROUP BY Year, Quater, State""",
+    ),
+    # Agg_Users repeats the state totals on every device-brand row and has
+    # no rows after 2022 Q1, so user rollups are built from the districts.
+    "Users_Quarter": (
+        """CREATE TABLE IF NOT EXISTS Users_Quarter (
+            Year INTEGER NOT NULL, Quater INTEGER NOT NULL,
+            Registered_users INTEGER, App_opens INTEGER,
+            PRIMARY KEY (Year, Quater)
+        ) WITHOUT ROWID""",
+        """SELECT Year, Quater, SUM(Registered_users) AS Registered_users,
+                  SUM(App_opens) AS App_opens
+           FROM Map_Users {where}
+           GROUP BY Year, Quater""",
+    ),
+    "Users_State_Quarter": (
+        """CREATE TABLE IF NOT EXISTS Users_State_Quarter (
+            Year INTEGER NOT NULL, Quater INTEGER NOT NULL, State TEXT NOT NULL,
+            Registered_users INTEGER, App_opens INTEGER,
+            PRIMARY KEY (Year, Quater, State)
+        ) WITHOUT ROWID""",
+        """SELECT Year, Quater, State, SUM(Registered_users) AS Registered_users,
+                  SUM(App_opens) AS App_opens
+           FROM Map_Users {where}
+           GROUP BY Year, Quater, State""",
+    ),
+    # Insurance starts in 2020 Q2; quarters before it have no rows
+    "Ins_Quarter": (
+        """CREATE TABLE IF NOT EXISTS Ins_Quarter (
+            Year INTEGER NOT NULL, Quater INTEGER NOT NULL,
+            Insurance_count INTEGER, Insurance_amount REAL,
+            PRIMARY KEY (Year, Quater)
+        ) WITHOUT ROWID""",
+        """SELECT Year, Quater, SUM(Insurance_count) AS Insurance_count,
+                  SUM(Insurance_amount) AS Insurance_amount
+           FROM Agg_Ins {where}
+           GROUP BY Year, Quater""",
+    ),
+    "Ins_State_Quarter": (
+        """CREATE TABLE IF NOT EXISTS Ins_State_Quarter (
+            Year INTEGER NOT NULL, Quater INTEGER NOT NULL, State TEXT NOT NULL,
+            Insurance_count INTEGER, Insurance_amount REAL,
+            PRIMARY KEY (Year, Quater, State)
+        ) WITHOUT ROWID""",
+        """SELECT Year, Quater, State, SUM(Insurance_count) AS Insurance_count,
+                  SUM(Insurance_amount) AS Insurance_amount
+           FROM Agg_Ins {where}
+           GROUP BY Year, Quater, State""",
+    ),
+    # District and pincode grain for the top-N queries (see phonepe_pulse.topn)
+    "Trans_District_Quarter": (
+        """CREATE TABLE IF NOT EXISTS Trans_District_Quarter (
+            Year INTEGER NOT NULL, Quater INTEGER NOT NULL, State TEXT NOT NULL, District TEXT NOT NULL,
+            Transaction_count INTEGER, Transaction_amount REAL,
+            PRIMARY KEY (Year, Quater, State, District)
+        ) WITHOUT ROWID""",
+        """SELECT Year, Quater, State, District, SUM(Transaction_count) AS Transaction_count,
+                  SUM(Transaction_amount) AS Transaction_amount
+           FROM Map_Trans {where}
+           GROUP BY Year, Quater, State, District""",
+    ),
+    "Users_District_Quarter": (
+        """CREATE TABLE IF NOT EXISTS Users_District_Quarter (
+            Year INTEGER NOT NULL, Quater INTEGER NOT NULL, State TEXT NOT NULL, District TEXT NOT NULL,
+            Registered_users INTEGER, App_opens INTEGER,
+            PRIMARY KEY (Year, Quater, State, District)
+        ) WITHOUT ROWID""",
+        """SELECT Year, Quater, State, District, SUM(Registered_users) AS Registered_users,
+                  SUM(App_opens) AS App_opens
+           FROM Map_Users {where}
+           GROUP BY Year, Quater, State, District""",
+    ),
+    "Ins_District_Quarter": (
+        """CREATE TABLE IF NOT EXISTS Ins_District_Quarter (
+            Year INTEGER NOT NULL, Quater INTEGER NOT NULL, State TEXT NOT NULL, District TEXT NOT NULL,
+            Insurance_count INTEGER, Insurance_amount REAL,
+            PRIMARY KEY (Year, Quater, State, District)
+        ) WITHOUT ROWID""",
+        """SELECT Year, Quater, State, District, SUM(Insurance_count) AS Insurance_count,
+                  SUM(Insurance_amount) AS Insurance_amount
+           FROM Map_Ins {where}
+           GROUP BY Year, Quater, State, District""",
+    ),
+    # Top_* only hold each state's leading pincode per quarter
+    "Trans_Pincode_Quarter": (
+        """CREATE TABLE IF NOT EXISTS Trans_Pincode_Quarter (
+            Year INTEGER NOT NULL, Quater INTEGER NOT NULL, State TEXT NOT NULL, Pincode INTEGER NOT NULL,
+            Transaction_count INTEGER, Transaction_amount REAL,
+            PRIMARY KEY (Year, Quater, State, Pincode)
+        ) WITHOUT ROWID""",
+        """SELECT Year, Quater, State, Pincode, SUM(Trans_pincode_count) AS Transaction_count,
+                  SUM(Trans_pincode_amount) AS Transaction_amount
+           FROM Top_Trans {where}
+           GROUP BY Year, Quater, State, Pincode HAVING Pincode IS NOT NULL""",
+    ),
+    "Users_Pincode_Quarter": (
+        """CREATE TABLE IF NOT EXISTS Users_Pincode_Quarter (
+            Year INTEGER NOT NULL, Quater INTEGER NOT NULL, State TEXT NOT NULL, Pincode INTEGER NOT NULL,
+            Registered_users INTEGER,
+            PRIMARY KEY (Year, Quater, State, Pincode)
+        ) WITHOUT ROWID""",
+        """SELECT Year, Quater, State, Pincode, SUM(User_pincode_count) AS Registered_users
+           FROM Top_Users {where}
+           GROUP BY Year, Quater, State, Pincode HAVING Pincode IS NOT NULL""",
+    ),
+    "Ins_Pincode_Quarter": (
+        """CREATE TABLE IF NOT EXISTS Ins_Pincode_Quarter (
+            Year INTEGER NOT NULL, Quater INTEGER NOT NULL, State TEXT NOT NULL, Pincode INTEGER NOT NULL,
+            Insurance_count INTEGER, Insurance_amount REAL,
+            PRIMARY KEY (Year, Quater, State, Pincode)
+        ) WITHOUT ROWID""",
+        """SELECT Year, Quater, State, Pincode, SUM(Ins_pincode_count) AS Insurance_count,
+                  SUM(Ins_pincode_amount) AS Insurance_amount
+           FROM Top_Ins {where}
+           GROUP BY Year, Quater, State, Pincode HAVING Pincode IS NOT NULL""",
+    ),
+}
+
+# Ranked reads of one quarter walk these backwards (or forwards) with LIMIT
+ROLLUP_INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} ON {table} (Year, Quater, {column})"
+    for table, columns in [
+        ("Trans_State_Quarter", ["Transaction_count", "Transaction_amount"]),
+        ("Users_State_Quarter", ["Registered_users", "App_opens"]),
+        ("Trans_District_Quarter", ["Transaction_count", "Transaction_amount"]),
+        ("Users_District_Quarter", ["Registered_users", "App_opens"]),
+        ("Trans_Pincode_Quarter", ["Transaction_count", "Transaction_amount"]),
+        ("Users_Pincode_Quarter", ["Registered_users"]),
+        ("Ins_State_Quarter", ["Insurance_count", "Insurance_amount"]),
+        ("Ins_District_Quarter", ["Insurance_count", "Insurance_amount"]),
+        ("Ins_Pincode_Quarter", ["Insurance_count", "Insurance_amount"]),
+    ]
+    for column in columns
+]
+
+
+def refresh_rollups(connection, quarters=None):
+    """Creates the rollup tables and (re)computes their partitions.
+
+    Args:
+        connection: a writable sqlite3 connection holding the base tables.
+        quarters: iterable of (Year, Quater) to refresh; all when None.
+    """
+    for name, (create, select) in ROLLUPS.items():
+        connection.execute(create)
+        if quarters is None:
+            connection.execute(f"DELETE FROM {name}")
+            connection.execute(f"INSERT INTO {name} " + select.format(where=""))
+            continue
+        for year, qua in quarters:
+            params = (int(year), int(qua))
+            connection.execute(f"DELETE FROM {name} WHERE Year = ? AND Quater = ?", params)
+            connection.execute(f"INSERT INTO {name} " + select.format(where="WHERE Year = ? AND Quater = ?"),
+                               params)
+    for sql in ROLLUP_INDEXES:
+        connection.execute(sql)
@@ -0,0 +1,214 @@
+"""Typed table definitions and indexes for PhonePe_pulse.db.
+
+The loader creates these tables before inserting the CSV rows, so columns
+get real types instead of whatever `DataFrame.to_sql` infers, and every
+dashboard filter is served by a composite index.
+
+`python -m phonepe_pulse.schema` runs EXPLAIN QUERY PLAN over every SQL
+string passed to `run_query` in the app, its pages and the HTTP API, and
+over the SQL they build at run time (see `generated_queries`), and exits
+non-zero if any of them scans a whole table.
+"""
+import ast
+import glob
+import os
+import re
+import sqlite3
+import sys
+
+
+TABLE_SCHEMAS = {
+    "Agg_Trans": """CREATE TABLE Agg_Trans (
+        State TEXT NOT NULL, Year INTEGER NOT NULL, Quater INTEGER NOT NULL,
+        Transaction_type TEXT NOT NULL, Transaction_count INTEGER, Transaction_amount REAL
+    )""",
+    "Agg_Users": """CREATE TABLE Agg_Users (
+        State TEXT NOT NULL, Year INTEGER NOT NULL, Quater INTEGER NOT NULL,
+        Registered_users INTEGER, App_opens INTEGER,
+        Device_Brand TEXT NOT NULL, Brand_users INTEGER, Device_share REAL
+    )""",
+    "Map_Trans": """CREATE TABLE Map_Trans (
+        State TEXT NOT NULL, District TEXT NOT NULL, Year INTEGER NOT NULL, Quater INTEGER NOT NULL,
+        Transaction_count INTEGER, Transaction_amount REAL
+    )""",
+    "Map_Users": """CREATE TABLE Map_Users (
+        State TEXT NOT NULL, District TEXT NOT NULL, Year INTEGER NOT NULL, Quater INTEGER NOT NULL,
+        Registered_users INTEGER, App_opens INTEGER
+    )""",
+    "Top_Trans": """CREATE TABLE Top_Trans (
+        State TEXT NOT NULL, District TEXT, Pincode INTEGER, Year INTEGER NOT NULL, Quater INTEGER NOT NULL,
+        Trans_dist_count INTEGER, Trans_dist_amount REAL,
+        Trans_pincode_count INTEGER, Trans_pincode_amount REAL
+    )""",
+    "Top_Users": """CREATE TABLE Top_Users (
+        State TEXT NOT NULL, District TEXT, Pincode INTEGER, Year INTEGER NOT NULL, Quater INTEGER NOT NULL,
+        User_dist_count INTEGER, User_pincode_count INTEGER
+    )""",
+    "Agg_Ins": """CREATE TABLE Agg_Ins (
+        State TEXT NOT NULL, Year INTEGER NOT NULL, Quater INTEGER NOT NULL,
+        Insurance_count INTEGER, Insurance_amount REAL
+    )""",
+    "Map_Ins": """CREATE TABLE Map_Ins (
+        State TEXT NOT NULL, District TEXT NOT NULL, Year INTEGER NOT NULL, Quater INTEGER NOT NULL,
+        Insurance_count INTEGER, Insurance_amount REAL
+    )""",
+    "Top_Ins": """CREATE TABLE Top_Ins (
+        State TEXT NOT NULL, District TEXT, Pincode INTEGER, Year INTEGER NOT NULL, Quater INTEGER NOT NULL,
+        Ins_dist_count INTEGER, Ins_dist_amount REAL,
+        Ins_pincode_count INTEGER, Ins_pincode_amount REAL
+    )""",
+}
+
+# Composite indexes; trailing columns make the common queries covering
+INDEXES = [
+    # All India panels and rollup builds
+    "CREATE INDEX ix_Agg_Trans_quarter ON Agg_Trans (Year, Quater, Transaction_type, Transaction_count, Transaction_amount)",
+    "CREATE INDEX ix_Agg_Trans_type ON Agg_Trans (Transaction_type, Year, Transaction_amount, Transaction_count)",
+    "CREATE INDEX ix_Agg_Users_quarter ON Agg_Users (Year, Quater, Registered_users)",
+    "CREATE INDEX ix_Agg_Users_brand ON Agg_Users (Device_Brand, Brand_users)",
+    "CREATE INDEX ix_Agg_Ins_quarter ON Agg_Ins (Year, Quater, State, Insurance_count, Insurance_amount)",
+    # District explorer
+    "CREATE INDEX ix_Map_Trans_district ON Map_Trans (State, Year, Quater, District, Transaction_count, Transaction_amount)",
+    "CREATE INDEX ix_Map_Users_district ON Map_Users (State, Year, Quater, District, Registered_users, App_opens)",
+    "CREATE INDEX ix_Map_Ins_district ON Map_Ins (State, Year, Quater, District, Insurance_count, Insurance_amount)",
+    # Top 10 tabs
+    "CREATE INDEX ix_Top_Trans_dist_amount ON Top_Trans (Year, Quater, Trans_dist_amount DESC)",
+    "CREATE INDEX ix_Top_Trans_state ON Top_Trans (Year, Quater, State, Trans_dist_amount)",
+    "CREATE INDEX ix_Top_Trans_pincode ON Top_Trans (Year, Quater, Pincode, Trans_pincode_amount)",
+    "CREATE INDEX ix_Top_Trans_state_year ON Top_Trans (State, Year, Quater)",
+    "CREATE INDEX ix_Top_Users_dist_count ON Top_Users (Year, Quater, User_dist_count DESC)",
+    "CREATE INDEX ix_Top_Users_state ON Top_Users (Year, Quater, State, User_dist_count)",
+    "CREATE INDEX ix_Top_Users_pincode ON Top_Users (Year, Quater, Pincode, User_pincode_count)",
+    "CREATE INDEX ix_Top_Users_district ON Top_Users (District, User_dist_count, State)",
+    "CREATE INDEX ix_Top_Ins_state ON Top_Ins (Year, Quater, State, Ins_dist_amount)",
+    "CREATE INDEX ix_Top_Ins_district ON Top_Ins (Year, Quater, State, District, Ins_dist_amount)",
+    "CREATE INDEX ix_Top_Ins_pincode ON Top_Ins (Year, Quater, Pincode, Ins_pincode_amount)",
+]
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+# The entry script, every page module and the HTTP API
+APP_SCRIPTS = (["git_PhonePe_pulse.py"] + sorted(glob.glob(os.path.join(PAGES_DIR, "*.py")))
+               + [os.path.join(os.path.dirname(__file__), "api.py")])
+
+# "SCAN Agg_Trans" reads every row, and "SCAN Agg_Trans USING [COVERING]
+# INDEX ix" every entry of the index; only "SEARCH" rows use a key range
+_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+
+# label -> the (table, index) walks that query is allowed. Insight_Brands
+# groups the latest quarter by brand in index order; it runs once at load
+# time, when the loader builds the Insights summary tables.
+FULL_INDEX_WALKS = {
+    "INSIGHTS[Insight_Brands]": {("Agg_Users", "ix_Agg_Users_brand")},
+}
+
+
+def create_tables(connection):
+    """Creates the typed base tables."""
+    for sql in TABLE_SCHEMAS.values():
+        connection.execute(sql)
+
+
+def create_indexes(connection):
+    """Creates the composite indexes and refreshes planner statistics."""
+    for sql in INDEXES:
+        connection.execute(sql)
+    connection.execute("ANALYZE")
+
+
+def dashboard_queries(path):
+    """Returns every SQL literal passed to `run_query` in a script."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    queries = []
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and getattr(node.func, "id", None) == "run_query"
+                and node.args and isinstance(node.args[0], ast.Constant)):
+            queries.append((node.lineno, node.args[0].value))
+    return sorted(queries)
+
+
+def generated_queries():
+    """Returns (label, sql, params) of the SQL built at run time.
+
+    Covers every `top_n_query` metric and level, with one and several
+    years, with and without a quarter and a state, top and bottom; the
+    `top_query` and `district_query` of each section; the `TREND_SQL` of
+    each section; and the INSIGHTS queries with their summary-table reads.
+    """
+    from itertools import product
+
+    from phonepe_pulse.insights import INSIGHTS
+    from phonepe_pulse.queries import DISTRICT_TABLES, TOP_LEVELS, TOP_TABLES, district_query, top_query
+    from phonepe_pulse.topn import METRICS, YEARS, top_n_query
+    from phonepe_pulse.trends import TREND_SQL
+
+    queries = []
+    for metric, (_, _, levels) in METRICS.items():
+        for level, years, quarter, state, bottom in product(
+                levels, [(YEARS[1], YEARS[1]), YEARS], [None, 4], [None, "tamil-nadu"], [False, True]):
+            label = (f"top_n_query({metric}, {level}, years={years[0]}-{years[1]}, quarter={quarter}, "
+                     f"state={state}, bottom={bottom})")
+            queries.append((label, *top_n_query(metric, level, years, quarter, state, bottom=bottom)))
+    for section, level in product(TOP_TABLES, TOP_LEVELS):
+        queries.append((f"top_query({section}, {level})", *top_query(section, level, 2023, 4)))
+    for section in DISTRICT_TABLES:
+        queries.append((f"district_query({section})", *district_query(section, "tamil-nadu", 2023, 4)))
+    for section, sql in TREND_SQL.items():
+        queries.append((f"TREND_SQL[{section}]", sql, ()))
+    for table, insight in INSIGHTS.items():
+        queries.append((f"INSIGHTS[{table}]", insight.sql, insight.params))
+        queries.append((f"{table} read", f"SELECT * FROM {table} ORDER BY Rank", ()))
+    return queries
+
+
+def full_scans(connection, sql, params=None, allowed=()):
+    """Returns the base tables that `sql` scans, or whose index it walks.
+
+    Index walks are reported as "Agg_Users (ix_Agg_Users_brand)", except
+    the (table, index) pairs in `allowed`. Scans of subqueries and of the
+    small rollup tables are not reported. `params` default to NULL for
+    every placeholder.
+    """
+    if params is None:
+        params = (None,) * sql.count("?")
+    plan = connection.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    tables = []
+    for row in plan:
+        match = _FULL_SCAN.match(row[-1])
+        if not match or match.group(1) not in TABLE_SCHEMAS or match.groups() in allowed:
+            continue
+        table, index = match.groups()
+        tables.append(f"{table} ({index})" if index else table)
+    return tables
+
+
+def main():
+    import argparse
+
+    from phonepe_pulse.loader import DB_PATH, connect_readonly, ensure_database
+
+    parser = argparse.ArgumentParser(description="Check that no dashboard query scans a whole table.")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database file")
+    parser.add_argument("--app", nargs="+", default=APP_SCRIPTS, help="scripts whose run_query calls are checked")
+    args = parser.parse_args()
+
+    ensure_database(args.db)
+    connection = connect_readonly(args.db)
+    checks = [(f"{os.path.relpath(path)}:{lineno}", sql, None)
+              for path in args.app for lineno, sql in dashboard_queries(path)]
+    failures = 0
+    for label, sql, params in checks + generated_queries():
+        try:
+            scans = full_scans(connection, sql, params, FULL_INDEX_WALKS.get(label, ()))
+        except sqlite3.Error as e:
+            status, failed = f"ERROR {e}", True
+        else:
+            status, failed = ("FULL SCAN " + ", ".join(scans), True) if scans else ("ok", False)
+        failures += failed
+        print(f"{label}: {status}")
+    connection.close()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
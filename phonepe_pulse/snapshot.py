@@ -0,0 +1,188 @@
+"""Memory-mapped snapshots of the compact tables, shared by every app process.
+
+A snapshot is one folder per data version:
+
+    Data/snapshot/<version>/<table>.arrow   Arrow IPC file of a compact table
+    Data/snapshot/CURRENT                   the version being served
+
+The tables are the frames of `phonepe_pulse.model` (dictionary-encoded
+keys, narrow integers), written uncompressed as one record batch each.
+`open_snapshot` maps each file with `pa.memory_map` and wraps its buffers
+in DataFrames without copying them: numeric columns are NumPy views and
+keys are categoricals over the dictionary indices. The columns thus stay
+in the page cache, which every process serving the same snapshot shares,
+so N Streamlit workers hold one copy of the data instead of N private
+ones. The "snapshot" engine (see `phonepe_pulse.engines`) runs the
+DuckDB queries on these frames, as the "memory" engine does on its own.
+
+Publishing is atomic. `write_snapshot` fills a temporary folder, renames
+it to its version, then replaces CURRENT, so a reader sees the old
+version or the new one, never a partial one. App processes compare
+CURRENT with the version they serve (one `stat` per check) and open the
+new snapshot on their next query. A version folder is removed KEEP
+publishes later; on POSIX systems a mapped file stays readable after it
+is unlinked.
+
+    python -m phonepe_pulse.snapshot     # publish a snapshot of Data/*.csv
+"""
+import os
+import shutil
+import tempfile
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from phonepe_pulse.loader import DATA_DIR, TABLES, current_umask, data_version, fingerprint
+from phonepe_pulse.model import load_model
+
+
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshot")
+CURRENT = "CURRENT"
+# Versions kept besides the current one, for processes still serving them
+KEEP = 2
+
+# root -> ((st_ino, st_mtime_ns) of CURRENT, version)
+_current = {}
+_lock = threading.Lock()
+
+
+def snapshot_dir(data_dir=DATA_DIR):
+    return os.path.join(data_dir, "snapshot")
+
+
+def current_version(root=SNAPSHOT_DIR):
+    """The published version, or None if nothing was published to `root`.
+
+    CURRENT is only re-read when a `stat` shows it was replaced.
+    """
+    path = os.path.join(root, CURRENT)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (st.st_ino, st.st_mtime_ns)
+    with _lock:
+        cached = _current.get(root)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with open(path, encoding="ascii") as f:
+        version = f.read().strip()
+    with _lock:
+        _current[root] = (key, version)
+    return version
+
+
+def _publish(root, version):
+    """Points CURRENT at `version` in one rename."""
+    fd, tmp_path = tempfile.mkstemp(prefix=".current-", dir=root)
+    with os.fdopen(fd, "w", encoding="ascii") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    # mkstemp files are private; app processes may run as another user
+    os.chmod(tmp_path, 0o644 & ~current_umask())
+    os.replace(tmp_path, os.path.join(root, CURRENT))
+
+
+def _prune(root, keep=KEEP):
+    """Removes all but the current and the `keep` most recent other versions."""
+    current = current_version(root)
+    versions = sorted((entry for entry in os.scandir(root)
+                       if entry.is_dir() and not entry.name.startswith(".") and entry.name != current),
+                      key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+    for entry in versions[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def write_snapshot(data_dir=DATA_DIR, root=None, files=None):
+    """Writes the snapshot of the CSV files in `data_dir` and publishes it.
+
+    Args:
+        data_dir: folder holding the CSV files (and their Parquet copies).
+        root: snapshot folder; `<data_dir>/snapshot` by default.
+        files: precomputed fingerprints, computed here if omitted.
+
+    Returns:
+        The published data version.
+    """
+    root = root or snapshot_dir(data_dir)
+    os.makedirs(root, exist_ok=True)
+    version = data_version(files or fingerprint(data_dir))
+    target = os.path.join(root, version)
+    if not os.path.isdir(target):
+        tmp_path = tempfile.mkdtemp(prefix=".snapshot-", dir=root)
+        try:
+            for table, df in load_model(data_dir).items():
+                # One record batch, so every column maps as one buffer
+                arrow = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+                with ipc.new_file(os.path.join(tmp_path, f"{table}.arrow"), arrow.schema) as writer:
+                    writer.write_table(arrow)
+            # mkdtemp folders are private too
+            os.chmod(tmp_path, 0o755 & ~current_umask())
+            os.rename(tmp_path, target)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            # Another process published this version first
+            if not os.path.isdir(target):
+                raise
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+    if current_version(root) != version:
+        _publish(root, version)
+    _prune(root)
+    return version
+
+
+def ensure_snapshot(data_dir=DATA_DIR, root=None):
+    """The published version, writing a first snapshot if there is none.
+
+    Unlike `ensure_database`, this does not check the CSV files: new data
+    is published by the ETL (or `python -m phonepe_pulse.snapshot`).
+    """
+    return current_version(root or snapshot_dir(data_dir)) or write_snapshot(data_dir, root)
+
+
+def _column(column):
+    """A pandas view of a mapped column; copied only if it is chunked or has nulls."""
+    if column.num_chunks != 1 or column.null_count:
+        return column.to_pandas()
+    array = column.chunk(0)
+    if pa.types.is_dictionary(array.type):
+        return pd.Categorical.from_codes(array.indices.to_numpy(zero_copy_only=True),
+                                         dtype=pd.CategoricalDtype(array.dictionary.to_pandas()))
+    return array.to_numpy(zero_copy_only=True)
+
+
+def open_snapshot(version, root=SNAPSHOT_DIR):
+    """Maps every table of a version: {table: DataFrame} over the mapped buffers."""
+    path = os.path.join(root, version)
+    model = {}
+    for table in TABLES:
+        arrow = ipc.open_file(pa.memory_map(os.path.join(path, f"{table}.arrow"))).read_all()
+        model[table] = pd.DataFrame({name: _column(column) for name, column in zip(arrow.column_names, arrow.columns)},
+                                    copy=False)
+    return model
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Publish a memory-mapped snapshot of the Pulse tables.")
+    parser.add_argument("--data", default=DATA_DIR, help="folder holding the CSV files")
+    parser.add_argument("--root", default=None, help="snapshot folder (default: <data>/snapshot)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    version = write_snapshot(args.data, args.root)
+    root = args.root or snapshot_dir(args.data)
+    size = sum(entry.stat().st_size for entry in os.scandir(os.path.join(root, version)))
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{root}: version {version} published, {size / 2**20:.1f} MB ({elapsed:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Typed, partitioned Parquet copies of the Pulse CSV files.
+
+Each dataset is written to `Data/parquet/<dataset>/Year=<y>/Quater=<q>/`
+with categorical State, District, Transaction_type and Device_Brand and a
+nullable Int32 Pincode, so readers can project columns and skip whole
+partitions instead of parsing every CSV row. A `_source.json` file records the sha256 of the CSV the
+copy was made from; `read_dataset` callers can use `is_current` to fall
+back to the CSV when the two disagree.
+
+    python -m phonepe_pulse.storage        # convert Data/*.csv
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from phonepe_pulse.loader import DATA_DIR, file_sha256
+
+
+PARQUET_DIR = os.path.join(DATA_DIR, "parquet")
+PARTITION_COLS = ["Year", "Quater"]
+CATEGORICAL = ["State", "District", "Transaction_type", "Device_Brand"]
+SOURCE_FILE = "_source.json"
+
+DATASETS = ["Agg_Trans", "Agg_Users", "Agg_Ins", "Map_Trans", "Map_Users", "Map_Ins",
+            "Top_Trans", "Top_Users", "Top_Ins"]
+
+
+def _typed(df):
+    """Applies the storage dtypes: categoricals, nullable Pincode and narrow Year/Quater."""
+    df = df.copy()
+    for column in CATEGORICAL:
+        if column in df:
+            df[column] = df[column].astype("category")
+    if "Pincode" in df:
+        # Rows without a pincode make pandas read the column as float (or
+        # string, from the ETL); store whole numbers with nulls either way
+        df["Pincode"] = pd.to_numeric(df["Pincode"]).astype("Int32")
+    return df.astype({"Year": "int16", "Quater": "int8"})
+
+
+def dataset_path(dataset, parquet_dir=PARQUET_DIR):
+    return os.path.join(parquet_dir, dataset)
+
+
+def write_dataset(dataset, df, source_sha256=None, parquet_dir=PARQUET_DIR):
+    """Writes a dataset as Parquet partitioned by Year/Quater.
+
+    The new copy is written next to the old one and swapped in, so readers
+    never see a partially written dataset.
+    """
+    path = dataset_path(dataset, parquet_dir)
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    _typed(df).to_parquet(tmp_path, engine="pyarrow", partition_cols=PARTITION_COLS, index=False)
+    with open(os.path.join(tmp_path, SOURCE_FILE), "w", encoding="utf-8") as f:
+        json.dump({"sha256": source_sha256}, f)
+
+    old_path = path + ".old"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def source_sha256(dataset, parquet_dir=PARQUET_DIR):
+    """Returns the sha256 of the CSV a Parquet dataset was built from."""
+    try:
+        with open(os.path.join(dataset_path(dataset, parquet_dir), SOURCE_FILE), encoding="utf-8") as f:
+            return json.load(f)["sha256"]
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+
+
+def is_current(dataset, csv_sha256, parquet_dir=PARQUET_DIR):
+    """True if the Parquet copy was built from a CSV with this hash."""
+    return csv_sha256 is not None and source_sha256(dataset, parquet_dir) == csv_sha256
+
+
+def read_dataset(dataset, columns=None, filters=None, parquet_dir=PARQUET_DIR):
+    """Reads a Parquet dataset with column projection and predicate pushdown.
+
+    Args:
+        dataset: a dataset name, such as "Map_Trans".
+        columns: columns to read; all when None.
+        filters: pyarrow filters, e.g. [("Year", "=", 2023), ("Quater", "=", 1)].
+            Filters on Year/Quater prune whole partitions.
+        parquet_dir: root folder of the Parquet datasets.
+
+    Returns:
+        A DataFrame with categorical string columns, a nullable Int32
+        Pincode and int16/int8 Year/Quater.
+    """
+    df = pd.read_parquet(dataset_path(dataset, parquet_dir), engine="pyarrow",
+                         columns=columns, filters=filters)
+    # Hive partition values come back as string categories; map the few
+    # distinct values instead of converting every row
+    for column in PARTITION_COLS:
+        if column in df:
+            # An Index cast to int16 stays an int64 Index under pandas 1.5
+            values = np.asarray(df[column].cat.categories, dtype="int16" if column == "Year" else "int8")
+            df[column] = values[df[column].cat.codes.to_numpy()]
+    return df
+
+
+def convert_csv(dataset, data_dir=DATA_DIR, parquet_dir=PARQUET_DIR):
+    """Writes the Parquet copy of one Data/*.csv file."""
+    csv_path = os.path.join(data_dir, f"{dataset}.csv")
+    write_dataset(dataset, pd.read_csv(csv_path, float_precision="round_trip"), file_sha256(csv_path), parquet_dir)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write Parquet copies of the Pulse CSV files.")
+    parser.add_argument("--data", default=DATA_DIR, help="folder holding the CSV files")
+    parser.add_argument("--out", default=PARQUET_DIR, help="Parquet output folder")
+    args = parser.parse_args()
+    for dataset in DATASETS:
+        convert_csv(dataset, args.data, args.out)
+        print(f"{dataset}: {dataset_path(dataset, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
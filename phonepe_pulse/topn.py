@@ -0,0 +1,133 @@
+"""Top-N and bottom-N rankings of states, districts and pincodes.
+
+`top_n_query(metric, level, ...)` returns the SQL and parameters ranking
+one level by one metric over a year range, optionally for a single
+quarter of each year and within one state:
+
+    sql, params = top_n_query("transaction_amount", "district", years=(2022, 2023),
+                              state="tamil-nadu", n=5)
+    run_query(sql, params)  # State, District, Transaction Amount
+
+Rankings read the rollup tables (see `phonepe_pulse.rollups`), which hold
+one row per key and quarter however many base rows there are. A ranking
+of one quarter walks the rollup's (Year, Quater, metric) index and stops
+after N rows, with no sort; a year range groups the keys of the quarters
+in it and keeps the N best while sorting.
+
+Flow metrics (transactions, app opens, insurance policies) are summed over the range. A
+registration count is a running total, so it is read as of the latest
+quarter in the range that has data.
+"""
+from collections import namedtuple
+
+
+# label: display name; total: "sum" over quarters or "last" quarter;
+# levels: {level: (rollup table, column)}
+Metric = namedtuple("Metric", "label total levels")
+
+METRICS = {
+    "transaction_count": Metric("Transaction Count", "sum", {
+        "state": ("Trans_State_Quarter", "Transaction_count"),
+        "district": ("Trans_District_Quarter", "Transaction_count"),
+        "pincode": ("Trans_Pincode_Quarter", "Transaction_count"),
+    }),
+    "transaction_amount": Metric("Transaction Amount", "sum", {
+        "state": ("Trans_State_Quarter", "Transaction_amount"),
+        "district": ("Trans_District_Quarter", "Transaction_amount"),
+        "pincode": ("Trans_Pincode_Quarter", "Transaction_amount"),
+    }),
+    "registered_users": Metric("Registered Users", "last", {
+        "state": ("Users_State_Quarter", "Registered_users"),
+        "district": ("Users_District_Quarter", "Registered_users"),
+        "pincode": ("Users_Pincode_Quarter", "Registered_users"),
+    }),
+    "app_opens": Metric("App Opens", "sum", {
+        "state": ("Users_State_Quarter", "App_opens"),
+        "district": ("Users_District_Quarter", "App_opens"),
+    }),
+    "insurance_count": Metric("Insurance Count", "sum", {
+        "state": ("Ins_State_Quarter", "Insurance_count"),
+        "district": ("Ins_District_Quarter", "Insurance_count"),
+        "pincode": ("Ins_Pincode_Quarter", "Insurance_count"),
+    }),
+    "insurance_amount": Metric("Insurance Amount", "sum", {
+        "state": ("Ins_State_Quarter", "Insurance_amount"),
+        "district": ("Ins_District_Quarter", "Insurance_amount"),
+        "pincode": ("Ins_Pincode_Quarter", "Insurance_amount"),
+    }),
+}
+
+# level -> (key columns of the rollup, their display expressions, joins)
+LEVELS = {
+    "state": (["State"], ["s.State_name"], ""),
+    "district": (["State", "District"], ["s.State_name", "d.District_name"],
+                 "JOIN Districts d ON d.State = r.State AND d.District = r.District"),
+    "pincode": (["State", "Pincode"], ["s.State_name", "r.Pincode"], ""),
+}
+
+YEARS = (2018, 2023)
+
+
+def top_n_query(metric, level, years=YEARS, quarter=None, state=None, n=10, bottom=False):
+    """SQL ranking the keys of `level` by `metric`.
+
+    Args:
+        metric: a key of METRICS.
+        level: "state", "district" or "pincode".
+        years: (first, last) year, inclusive.
+        quarter: only this quarter (1-4) of each year; all quarters when None.
+        state: only keys in this state (slug, e.g. "tamil-nadu").
+        n: number of rows.
+        bottom: rank from the lowest value instead of the highest.
+
+    Returns:
+        (sql, params); the result columns are the keys of the level and the
+        metric value (see `top_n_columns`), best first.
+
+    Raises:
+        ValueError: if the metric is unknown or has no data at that level.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"unknown metric {metric!r}, expected one of {', '.join(METRICS)}")
+    _, total, levels = METRICS[metric]
+    if level not in levels:
+        raise ValueError(f"{metric} has no {level} level, expected one of {', '.join(levels)}")
+    table, column = levels[level]
+    keys, names, join = LEVELS[level]
+
+    first, last = int(years[0]), int(years[1])
+    if first == last:
+        where, params = ["Year = ?"], [first]
+    else:
+        where, params = ["Year BETWEEN ? AND ?"], [first, last]
+    if quarter is not None:
+        where.append("Quater = ?")
+        params.append(int(quarter))
+    key_where, key_params = (["State = ?"], [state]) if state is not None else ([], [])
+    order = "ASC" if bottom else "DESC"
+
+    if total == "last":
+        # The latest quarter in the range; each key has one row in it
+        latest = (f"SELECT {{}} FROM {table} WHERE {' AND '.join(where + key_where)} "
+                  f"ORDER BY Year DESC, Quater DESC LIMIT 1")
+        where = [f"Year = ({latest.format('Year')})", f"Quater = ({latest.format('Quater')})"]
+        params = (params + key_params) * 2
+    where = " AND ".join(where + key_where)
+    if total == "last" or (first == last and quarter is not None):
+        # One quarter: ranked straight off the (Year, Quater, metric) index
+        ranked = (f"SELECT {', '.join(keys)}, {column} AS Value FROM {table} WHERE {where} "
+                  f"ORDER BY {column} {order} LIMIT ?")
+    else:
+        ranked = (f"SELECT {', '.join(keys)}, SUM({column}) AS Value FROM {table} WHERE {where} "
+                  f"GROUP BY {', '.join(keys)} ORDER BY Value {order} LIMIT ?")
+    params = params + key_params + [int(n)]
+
+    sql = (f"SELECT {', '.join(names)}, r.Value AS {column} FROM ({ranked}) AS r "
+           f"JOIN States s ON s.State = r.State {join} "
+           f"ORDER BY r.Value {order}")
+    return sql, tuple(params)
+
+
+def top_n_columns(metric, level):
+    """Display names of the columns of a `top_n_query` result."""
+    return LEVELS[level][0] + [METRICS[metric].label]
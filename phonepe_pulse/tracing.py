@@ -0,0 +1,270 @@
+"""Per-rerun span timings of queries, transforms and charts.
+
+A trace covers one script run, or one fragment rerun, of one session. Its
+spans nest like the calls they wrap:
+
+    with trace("Explore Data"):
+        with span("query", sql=sql) as s:
+            names, rows = engine.execute(sql, params)
+            s.set(rows=len(rows))
+
+    @traced()
+    def district_data(section, state, year, qua): ...
+
+Spans are only recorded on a thread with an open trace. Elsewhere
+(prefetch threads, or tracing off) `span` returns a shared no-op span
+and a `traced` function is called directly, so the cost when disabled is
+one thread-local lookup per call.
+
+Runs are traced for sessions opened with ?debug=1, which shows them in a
+sidebar overlay, and for every session when PULSE_TRACE is set.
+PULSE_TRACE_FILE=path appends each finished trace to a JSON lines file,
+one span per line:
+
+    python -m phonepe_pulse.tracing traces.jsonl   # count, p50, p95, total per span
+"""
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+ENABLED = bool(os.environ.get("PULSE_TRACE"))
+TRACE_FILE = os.environ.get("PULSE_TRACE_FILE")
+# Finished traces kept in memory for the overlay, across all sessions
+RECENT = 100
+# Characters of a span's SQL kept in its record
+SQL_CHARS = 80
+
+_local = threading.local()
+_ids = itertools.count(1)
+_recent = deque(maxlen=RECENT)
+_lock = threading.Lock()
+
+
+class _NullSpan:
+    """What `span` returns when nothing is being traced."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed call within a Trace; `set` adds attributes such as row counts."""
+
+    __slots__ = ("trace", "name", "attrs", "index", "parent", "depth", "start", "ms")
+
+    def __init__(self, trace, name, attrs):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+        self.ms = None
+
+    def __enter__(self):
+        stack = self.trace.stack
+        self.parent = stack[-1].index if stack else None
+        self.depth = len(stack)
+        self.index = len(self.trace.spans)
+        self.trace.spans.append(self)
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.ms = (time.perf_counter() - self.start) * 1000
+        self.trace.stack.pop()
+        if exc[0] is not None:
+            self.attrs["error"] = exc[0].__name__
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Trace:
+    """The spans of one run; spans[0] is the run itself."""
+
+    def __init__(self, name, session=None):
+        self.id = next(_ids)
+        self.name = name
+        self.session = session
+        self.time = time.time()
+        self.spans = []
+        self.stack = []
+
+    @property
+    def ms(self):
+        return self.spans[0].ms if self.spans else None
+
+
+def _session():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+def wanted():
+    """True if runs are traced: PULSE_TRACE is set, or the page has ?debug=1."""
+    if ENABLED:
+        return True
+    if _session() is None:
+        return False
+    import streamlit as st
+
+    return bool(st.query_params.get("debug"))
+
+
+def span(name, **attrs):
+    """A context manager timing a block as a span of this thread's trace."""
+    trace_ = getattr(_local, "trace", None)
+    if trace_ is None:
+        return NULL_SPAN
+    return Span(trace_, name, attrs)
+
+
+@contextmanager
+def trace(name, enabled=None, **attrs):
+    """Traces a run: its spans are kept, exported and shown in the overlay.
+
+    Inside another trace this is a plain span.
+
+    Args:
+        name: the run's name, e.g. the page or fragment.
+        enabled: trace this run; `wanted()` when None.
+        attrs: attributes of the run's root span.
+    """
+    if getattr(_local, "trace", None) is not None:
+        with span(name, **attrs) as s:
+            yield s
+        return
+    if not (wanted() if enabled is None else enabled):
+        yield NULL_SPAN
+        return
+    current = _local.trace = Trace(name, _session())
+    try:
+        with Span(current, name, attrs) as root:
+            yield root
+    finally:
+        _local.trace = None
+        _finish(current)
+
+
+def traced(name=None, root=False):
+    """Decorator running a function in a span named after it.
+
+    With root=True a call outside any trace starts one; use it for
+    `st.fragment`s, which Streamlit reruns on their own.
+    """
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if root:
+                with trace(label):
+                    return fn(*args, **kwargs)
+            trace_ = getattr(_local, "trace", None)
+            if trace_ is None:
+                return fn(*args, **kwargs)
+            with Span(trace_, label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def records(trace_):
+    """The spans of a finished trace as flat dicts, in start order."""
+    out = []
+    origin = trace_.spans[0].start if trace_.spans else 0
+    for s in trace_.spans:
+        record = {"trace": trace_.id, "run": trace_.name, "session": trace_.session,
+                  "time": round(trace_.time, 3), "span": s.index, "parent": s.parent,
+                  "depth": s.depth, "name": s.name, "start_ms": round((s.start - origin) * 1000, 3),
+                  "ms": None if s.ms is None else round(s.ms, 3)}
+        for key, value in s.attrs.items():
+            record[key] = " ".join(value.split())[:SQL_CHARS] if key == "sql" else value
+        out.append(record)
+    return out
+
+
+def to_jsonl(traces):
+    """JSON lines of the spans of some traces."""
+    return "".join(json.dumps(record, default=str) + "\n" for t in traces for record in records(t))
+
+
+def _finish(trace_):
+    with _lock:
+        _recent.append(trace_)
+        if TRACE_FILE:
+            with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                f.write(to_jsonl([trace_]))
+
+
+def recent_traces(session=None):
+    """Finished traces, oldest first; of one session when given."""
+    with _lock:
+        traces = list(_recent)
+    return [t for t in traces if session is None or t.session == session]
+
+
+def session_traces():
+    """Finished traces of the current Streamlit session, oldest first."""
+    return recent_traces(_session())
+
+
+def summary(traces):
+    """One row per trace: its run, time, span count, queries and rows fetched."""
+    rows = []
+    for t in traces:
+        queries = [s for s in t.spans if s.name == "query"]
+        rows.append({"run": t.name, "ms": round(t.ms or 0, 1), "spans": len(t.spans),
+                     "queries": len(queries),
+                     "cached": sum(bool(s.attrs.get("cached")) for s in queries),
+                     "rows": sum(s.attrs.get("rows", 0) for s in queries)})
+    return rows
+
+
+def breakdown(trace_):
+    """The spans of one trace as indented rows for a table."""
+    return [{"span": "  " * r["depth"] + r["name"], "ms": r["ms"], "rows": r.get("rows"),
+             "detail": r.get("sql") or r.get("panel") or r.get("page") or ""}
+            for r in records(trace_)]
+
+
+def main():
+    import argparse
+
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Summarize PULSE_TRACE_FILE JSON lines per span name.")
+    parser.add_argument("files", nargs="+", help="JSON lines files written with PULSE_TRACE_FILE")
+    args = parser.parse_args()
+
+    df = pd.concat([pd.read_json(path, lines=True) for path in args.files], ignore_index=True)
+    if "rows" not in df:
+        df["rows"] = None
+    stats = df.groupby("name").agg(count=("ms", "size"), p50=("ms", "median"),
+                                   p95=("ms", lambda ms: ms.quantile(0.95)), total=("ms", "sum"),
+                                   rows=("rows", lambda rows: rows.sum(min_count=1)))
+    print(f"{df['trace'].nunique()} traces, {len(df)} spans")
+    print(stats.sort_values("total", ascending=False).round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
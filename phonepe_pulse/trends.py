@@ -0,0 +1,133 @@
+"""Quarterly trends of every state and district, as dense NumPy matrices.
+
+One query reads a section's district rollup (built from Map_Trans,
+Map_Users or Map_Ins, see `phonepe_pulse.rollups`) for all quarters at
+once, and `trend_matrix` reshapes it into a District x Quarter matrix; `by_state`
+sums its rows into the State x Quarter matrix. Quarters with no data are
+NaN. Growth, CAGR and rolling averages are then whole-matrix operations:
+
+    df = run_query(TREND_SQL["Transactions"])
+    districts = trend_matrix(df, ["State", "District"], "Transaction_amount")
+    states = by_state(districts)
+    yoy(states.values)[:, -1]  # every state's year-over-year growth, latest quarter
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Every district and quarter of a section; the metric columns follow the keys
+TREND_SQL = {
+    "Transactions": """SELECT State, District, Year, Quater, Transaction_count, Transaction_amount
+                       FROM Trans_District_Quarter""",
+    "Users": """SELECT State, District, Year, Quater, Registered_users, App_opens
+                FROM Users_District_Quarter""",
+    "Insurance": """SELECT State, District, Year, Quater, Insurance_count, Insurance_amount
+                    FROM Ins_District_Quarter""",
+}
+
+# keys: DataFrame of the row keys; quarters: Year * 4 + Quater - 1 of each
+# column, consecutive; values: float matrix of keys x quarters, NaN = no data
+Trend = namedtuple("Trend", "keys quarters values")
+
+
+def trend_matrix(df, keys, column):
+    """Reshapes long (keys..., Year, Quater, column) rows into a Trend.
+
+    Rows are the distinct keys in sorted order; columns are every quarter
+    from the first to the last one in `df`, gaps included.
+    """
+    # Factorize each key column, then the combined codes: sorted by the
+    # first key, then the second, ...
+    combined = np.zeros(len(df), dtype=np.int64)
+    levels = []
+    for key in keys:
+        key_codes, uniques = pd.factorize(df[key], sort=True)
+        combined = combined * len(uniques) + key_codes
+        levels.append(uniques)
+    used, codes = np.unique(combined, return_inverse=True)
+    n = len(used)
+    rows = {}
+    for key, uniques in zip(keys[::-1], levels[::-1]):
+        used, key_codes = np.divmod(used, len(uniques))
+        rows[key] = np.asarray(uniques)[key_codes]
+    quarter = df["Year"].to_numpy(np.int64) * 4 + df["Quater"].to_numpy(np.int64) - 1
+    first, width = quarter.min(), quarter.max() - quarter.min() + 1
+    values = np.full((n, width), np.nan)
+    values[codes, quarter - first] = df[column].to_numpy(np.float64)
+    return Trend(pd.DataFrame({key: rows[key] for key in keys}), np.arange(first, first + width), values)
+
+
+def by_state(trend):
+    """Sums a district Trend's rows per state; all-NaN columns stay NaN."""
+    states = trend.keys["State"].to_numpy()
+    # Rows are sorted by state, so each state's districts are contiguous
+    starts = np.flatnonzero(np.r_[True, states[1:] != states[:-1]])
+    has_data = ~np.isnan(trend.values)
+    values = np.add.reduceat(np.where(has_data, trend.values, 0), starts, axis=0)
+    values[np.add.reduceat(has_data, starts, axis=0) == 0] = np.nan
+    return Trend(pd.DataFrame({"State": states[starts]}), trend.quarters, values)
+
+
+def quarter_labels(quarters):
+    """"2018 Q1"-style labels of quarter numbers."""
+    return [f"{q // 4} Q{q % 4 + 1}" for q in quarters]
+
+
+def growth(values, lag):
+    """Growth over `lag` columns, (now / then - 1); NaN without a positive base."""
+    out = np.full(values.shape, np.nan)
+    then, now = values[:, :-lag], values[:, lag:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, lag:] = np.where(then > 0, now / then - 1, np.nan)
+    return out
+
+
+def qoq(values):
+    """Quarter-over-quarter growth of every cell."""
+    return growth(values, 1)
+
+
+def yoy(values):
+    """Year-over-year growth of every cell (against the same quarter a year earlier)."""
+    return growth(values, 4)
+
+
+def rolling_mean(values, window=4):
+    """Mean of each cell and the `window - 1` before it; NaN until the window fills."""
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] >= window:
+        out[:, window - 1:] = sliding_window_view(values, window, axis=1).mean(axis=-1)
+    return out
+
+
+def cagr(values):
+    """Compound annual growth of each row, from its first to its last positive quarter.
+
+    NaN for rows with fewer than two positive quarters.
+    """
+    valid = values > 0
+    rows = np.arange(len(values))
+    first = valid.argmax(axis=1)
+    last = values.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+    years = (last - first) / 4
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = (values[rows, last] / values[rows, first]) ** (1 / years) - 1
+    return np.where(valid.any(axis=1) & (years > 0), rate, np.nan)
+
+
+def summary(trend):
+    """Latest value, its QoQ and YoY growth and the CAGR of every row.
+
+    Returns:
+        The Trend's keys with "Latest", "QoQ", "YoY" and "CAGR" columns;
+        growth is a fraction (0.05 = 5%).
+    """
+    df = trend.keys.copy()
+    df["Latest"] = trend.values[:, -1]
+    df["QoQ"] = qoq(trend.values)[:, -1]
+    df["YoY"] = yoy(trend.values)[:, -1]
+    df["CAGR"] = cagr(trend.values)
+    return df